@@ -64,10 +64,56 @@ POSTGRES_DB=dedaena_db
 POSTGRES_USER=postgres
 POSTGRES_PASSWORD=your_password_here
 
+# Connection pool (არჩევითი)
+DB_POOL_MIN_SIZE=1
+DB_POOL_MAX_SIZE=10
+DB_POOL_TIMEOUT=10
+DB_POOL_HEALTHCHECK_INTERVAL=30
+
+# Audit log writer (არჩევითი)
+AUDIT_QUEUE_SIZE=10000
+AUDIT_BATCH_SIZE=200
+AUDIT_FLUSH_INTERVAL=1.0
+AUDIT_WRITE_ATTEMPTS=3
+
 # JWT Secret - MUST BE CHANGED!
 SECRET_KEY=GENERATE_NEW_SECRET_KEY_HERE
 JWT_ALGORITHM=HS256
 ACCESS_TOKEN_EXPIRE_MINUTES=10080
+PASSWORD_HASH_WORKERS=2
+PASSWORD_HASH_MAX_PENDING=32
+TOKEN_CACHE_TTL=300
+PRINCIPAL_CACHE_TTL=5        # admin/moderator-ის როლის და სტატუსის ქეში (წამი)
+
+# Rate limiting (მოთხოვნები წუთში). ლიმიტი worker-ებს შორის საერთოა მხოლოდ
+# საერთო backend-ით: gunicorn_conf.py default-ად რთავს RATE_LIMIT_SQLITE_PATH-ს
+# (დროებითი SQLite ფაილი, ერთი ჰოსტი); რამდენიმე ჰოსტისთვის - RATE_LIMIT_REDIS_URL
+# (საჭიროა redis პაკეტი). მათ გარეშე ლიმიტი worker-ზეა (ფაქტობრივად x WEB_CONCURRENCY)
+# და startup-ზე ჩნდება warning
+ADMIN_RATE_LIMIT=10
+AUTH_RATE_LIMIT=10        # login - IP + username წყვილზე
+AUTH_IP_RATE_LIMIT=300    # login/register - IP-ზე (NAT-ის უკან ბევრი მომხმარებელი)
+# ⚠️ ახალი შეზღუდვები: /api/dedaena/progress და /api/moderator route-ებს აქამდე ლიმიტი არ ჰქონდათ -
+# აქტიური კლიენტებისთვის საჭიროების მიხედვით გაზარდეთ
+PROGRESS_RATE_LIMIT=60
+MODERATOR_RATE_LIMIT=120
+# RATE_LIMIT_SQLITE_PATH=/tmp/dedaena-rate-limits.sqlite3
+# RATE_LIMIT_REDIS_URL=redis://localhost:6379/0
+# X-Forwarded-For მხოლოდ ამ proxy-ებიდან (IP/CIDR, მძიმით)
+TRUSTED_PROXIES=127.0.0.1,::1
+
+# პროგრესის შენახვების გაერთიანების ფანჯარა (მილიწამი)
+PROGRESS_COALESCE_MS=250
+# user_progress-ის ფორმატი: array (Postgres მასივები) ან bitmap (კომპაქტური bytea, migration 004)
+PROGRESS_ENCODING=array
+
+# საჯარო დედაენის ცხრილები (სხვა table_name-ზე 400) და snapshot ქეშის ზომა
+DEDAENA_TABLES=gogebashvili_1,gogebashvili_1_test,gogebashvili_1_with_ids
+SNAPSHOT_CACHE_MAX_ENTRIES=256
+# სხვა worker-ების ცვლილებების შემოწმება (content_changes-ის MAX(version), წამი)
+SNAPSHOT_VERSION_CHECK_INTERVAL=1
+# delta sync: since-ის მაქსიმალური ჩამორჩენა version-ებში (უფრო ძველზე full_resync)
+SYNC_MAX_LAG=1000
 
 # Application
 DEBUG=True
@@ -88,6 +134,26 @@ python -c "import secrets; print(secrets.token_urlsafe(64))"
 python run.py
 ```
 
+**Production გაშვება** (რამდენიმე worker, worker-ების რაოდენობა `WEB_CONCURRENCY`-დან ან CPU-ებიდან; Dockerfile-ის default):
+
+```bash
+gunicorn -c gunicorn_conf.py app.main:app
+```
+
+ყველა worker-ს საკუთარი DB pool აქვს - `POSTGRES max_connections` უნდა იყოს მინიმუმ workers × (`ASYNC_DB_POOL_SIZE` + `ASYNC_DB_MAX_OVERFLOW` + `DB_POOL_MAX_SIZE`). `DEDAENA_WARMUP_TABLES` - ცხრილები, რომელთა snapshot worker-ის startup-ზე აიგება (brotli `SNAPSHOT_WARM_BROTLI_QUALITY`, default 11; request-ის დროს აგებული snapshot-ები - `SNAPSHOT_BROTLI_QUALITY`, default 5); `GRACEFUL_TIMEOUT` - SIGTERM-ზე მიმდინარე request-ების დასრულების ვადა (წამი).
+
+კონფიგურაცია (`SECRET_KEY`, `DATABASE_URL`, `ACCESS_TOKEN_EXPIRE_MINUTES`, pool-ის ზომები) მოწმდება worker-ის startup-ზე - შეცდომისას worker არ ეშვება და ყველა პრობლემა ერთად იწერება ლოგში.
+
+Health probe-ები:
+- `GET /health/live` - liveness (ბაზას არ ეხება)
+- `GET /health/ready` - readiness: 200 მხოლოდ startup-ის (warmup) დასრულების შემდეგ და თუ ბაზა პასუხობს `READINESS_DB_TIMEOUT` წამში (default 2), სხვა შემთხვევაში 503; პასუხში pool-ების მდგომარეობა და warmup ცხრილების ქეშის სტატუსი
+
+მეტრიკები: `GET /metrics` (Prometheus text format) - request-ების latency route template-ის მიხედვით, in-flight request-ები, SQL query-ების რაოდენობა და დრო თითოეულ request-ზე, DB pool-ების დატვირთვა და ქეშების hit ratio. gunicorn-ით გაშვებისას `/metrics` ყველა worker-ის ჯამს აბრუნებს (worker-ები მდგომარეობას `METRICS_FLUSH_INTERVAL` წამში ერთხელ წერენ `METRICS_MULTIPROC_DIR`-ში; default - დროებითი საქაღალდე). endpoint მუშაობს მხოლოდ `METRICS_TOKEN`-ის მითითებისას და საჭიროებს `Authorization: Bearer <METRICS_TOKEN>`-ს (მის გარეშე 404).
+
+SQL-ის დიაგნოსტიკა: `SQL_DEBUG_HEADERS=true`-ისას (მხოლოდ development) პასუხს ემატება `X-DB-Query-Count`, `X-DB-Query-Time-Ms` და `X-DB-Top-Query` (ყველაზე ხშირი ნორმალიზებული statement). ტესტებში `app.core.instrumentation.query_budget(n)` ამოწმებს, რომ ბლოკში შესრულებულ request-ებს n-ზე მეტი query არ აქვთ (N+1-ის დაბრუნების წინააღმდეგ).
+
+ტექსტის ანალიზი: `POST /api/moderator/dedaena/{table_name}/analyze` (`{"sentences": [...], "words": [...]}`, თითოეულში მაქსიმუმ `MAX_ANALYZE_BATCH`, default 500) - `frontend/src/utils/textAnalysis.js`-ის იგივე ნორმალიზაციით აბრუნებს თითო წინადადების ტურს და სიტყვების ტურებს. სიტყვების ინდექსი (ნორმალიზებული სიტყვა → ტურები) worker-ში ერთხელ იგება და `content_changes`-იდან ინკრემენტულად ახლდება.
+
 API ხელმისაწვდომია: `http://localhost:8000`  
 Swagger Docs: `http://localhost:8000/api/docs`
 
@@ -142,7 +208,23 @@ docker-compose down
 
 **Migration-ები:**
 
-Database schema განახლება მოხდება migration scripts-ის საშუალებით (განვითარების პროცესში).
+Schema-ს ცვლილებები ინახება `backend/migrations/` საქაღალდეში დანომრილი SQL ფაილების სახით. გაუშვით რიგის მიხედვით:
+
+```bash
+psql -U postgres -d dedaena_db -f backend/migrations/001_audit_logs_keyset_index.sql
+psql -U postgres -d dedaena_db -f backend/migrations/002_audit_stats_hourly.sql
+psql -U postgres -d dedaena_db -f backend/migrations/003_content_changes.sql
+psql -U postgres -d dedaena_db -f backend/migrations/004_user_progress_bitmaps.sql
+psql -U postgres -d dedaena_db -f backend/migrations/005_content_hash.sql
+```
+
+ზოგიერთ migration-ს სჭირდება არსებული მონაცემების შევსება (backend საქაღალდიდან):
+
+```bash
+python -m scripts.rebuild_audit_rollups   # 002: audit_stats_hourly
+python -m scripts.convert_progress_encoding bitmap   # 004: PROGRESS_ENCODING=bitmap-ზე გადასვლისას
+python -m scripts.backfill_content_hash   # 005: words/sentences/proverbs/toreads.content_hash
+```
 
 ---
 
@@ -164,6 +246,58 @@ VALUES ('admin', 'admin@example.com', 'hashed_password_here', true, true);
 
 ---
 
+## 📈 Load Testing
+
+`backend/benchmarks/` - კონკურენტული სცენარები:
+- `full_book` - მთელი წიგნის ჩატვირთვა
+- `position_step` - ტურებზე გადასვლა
+- `progress` - პროგრესის შენახვა და ჩატვირთვა
+- `login_burst` - login-ების ტალღა
+- `moderator_add_delete` - მოდერატორის add/delete
+
+შედეგი: p50/p95/p99 და RPS, შედარებული `benchmarks/baselines.json`-თან. baseline-ის არმქონე სცენარი ვერ შედარდება - runner ამაზე აფრთხილებს და exit code 1-ს აბრუნებს (`--allow-missing-baseline` - მხოლოდ გაფრთხილება). baseline-ები საცნობარო გარემოში `--save-baseline`-ით იქმნება და repository-ში ინახება.
+
+```bash
+# Backend folder-ში (ბაზა - docker-compose-ის postgres ან ლოკალური, დედაენის შიგთავსით)
+pip install -r requirements-dev.txt
+python -m benchmarks.seed --users 20          # bench_user_* და bench_moderator
+python -m benchmarks.run --start-server       # gunicorn + ყველა სცენარი, exit 1 რეგრესიისას
+python -m benchmarks.run --start-server --save-baseline   # baseline-ის განახლება deploy-ის შემდეგ
+```
+
+**პირველი გაშვება (baseline-ის გარეშე).** `benchmarks/baselines.json`-ში სცენარები ჯერ ცარიელია, ამიტომ `python -m benchmarks.run --start-server` ყოველთვის exit code 1-ს აბრუნებს, სანამ baseline არ ჩაიწერება:
+
+```bash
+# 1. საცნობარო გარემოში (იგივე მანქანა/CPU, WEB_CONCURRENCY და მონაცემები, რაც შემდგომ შედარებებში)
+python -m benchmarks.run --start-server --allow-missing-baseline   # შემოწმება: შეცდომები არ არის, exit 0
+python -m benchmarks.run --start-server --save-baseline            # შედეგების ჩაწერა baselines.json-ში
+# 2. baselines.json-ის commit (commit message-ში - გარემოს აღწერა: CPU, workers, ცხრილი, --concurrency)
+git add benchmarks/baselines.json
+```
+
+CI-ში ან სხვა მანქანაზე, სადაც საცნობარო baseline ჯერ არ არის, runner-ი `--allow-missing-baseline`-ით გაუშვით - შეცდომების წილი (>1%) მაინც რეგრესიაა, latency/RPS კი არ შედარდება. baseline სხვა გარემოში ჩაწერილი რიცხვებით არ შეადაროთ - ზღვრები (`thresholds`) ერთი და იმავე გარემოსთვისაა.
+
+დიდი სინთეზური წიგნი (სატესტო ბაზაზე; დეტერმინისტული `--seed`-ით, COPY-ით):
+
+```bash
+python -m scripts.generate_corpus --table gogebashvili_synth --tours 2000 --words 2000000 --sentences 1000000 --seed 42
+python -m benchmarks.run --start-server --table gogebashvili_synth -s full_book -s position_step
+```
+
+`--start-server` rate limit-ებს ზრდის. გაშვებულ სერვერზე (`--base-url`) ლიმიტები მოქმედებს და 429/503 "rejected"-ად ითვლება.
+
+## 🧪 ტესტები
+
+```bash
+# Backend folder-ში
+pip install -r requirements-dev.txt
+python -m pytest -q
+```
+
+`tests/api/` - საჯარო route-ების SQL query-ების ბიუჯეტი (`query_budget`); საჭიროებს `DATABASE_URL`-ით მისაწვდომ ბაზას კონტენტით (`TEST_DEDAENA_TABLE`, default `gogebashvili_1_with_ids`), მის გარეშე გამოტოვებულია. `tests/core/` ბაზას არ საჭიროებს.
+
+---
+
 ## 🛠️ ტექნოლოგიები
 
 ### Backend
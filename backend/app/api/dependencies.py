@@ -2,63 +2,113 @@
 FastAPI Dependencies - ავტორიზაცია და authentication
 """
 
-from fastapi import Depends, HTTPException, status, Header
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
-from jose import JWTError, jwt   # ✅ შეიცვალა: jwt → jose
+from fastapi import Depends, HTTPException, Header
+from fastapi.security import HTTPBearer
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 import os
-from app.core.security import decode_access_token
+from app.core.security import decode_access_token, invalidate_user_tokens
+from app.core.ttl_cache import TTLCache
 
 
 # ✅ Bearer Token-ის scheme (Authorization: Bearer <token>)
 security = HTTPBearer()
 
 
-async def get_current_moderator_user(
-    authorization: str = Header(None)
-):
-    """JWT token-დან moderator user-ის ამოღება"""
+# ✅ admin/moderator principal: user id -> როლი და is_active users ცხრილიდან
+# (არა JWT-დან). ჩვეულებრივი მომხმარებლის route-ები (progress) მხოლოდ JWT-ს
+# იყენებენ და ბაზას არ ეკითხებიან. ქეში თითო worker-შია, ამიტომ TTL მოკლეა:
+# ბლოკირება/როლის შეცვლა სხვა worker-ებზეც მაქსიმუმ PRINCIPAL_CACHE_TTL
+# წამში ვრცელდება (0 - ქეშის გარეშე)
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 5))  # წამი
+principal_cache = TTLCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+
+def invalidate_principal(user_id: int):
+    """მომხმარებლის ქეშირებული principal-ის და token payload-ების წაშლა (მიმდინარე worker-ში)"""
+    principal_cache.pop(user_id)
+    invalidate_user_tokens(user_id)
+
+
+async def load_principal(user_id: int, db: AsyncSession) -> dict:
+    """users ცხრილიდან მომხმარებლის როლი და სტატუსი (ქეშით)"""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        result = await db.execute(
+            text("""
+                SELECT id, username, is_admin, is_moder, is_active
+                FROM users
+                WHERE id = :id
+            """),
+            {"id": user_id}
+        )
+        row = result.fetchone()
+        if row:
+            is_admin, is_moder = bool(row[2]), bool(row[3])
+            principal = {
+                "id": row[0],
+                "username": row[1],
+                "role": "admin" if is_admin else "moderator" if is_moder else "user",
+                "is_admin": is_admin,
+                "is_moder": is_moder,
+                "is_active": bool(row[4])
+            }
+        else:
+            # ✅ წაშლილი მომხმარებელიც ქეშდება (უარყოფითი პასუხი)
+            principal = {"id": user_id, "is_active": False}
+        if PRINCIPAL_CACHE_TTL > 0:
+            principal_cache.set(user_id, principal)
+    return principal
+
+
+def _token_payload(authorization: str) -> dict:
+    """Authorization header-იდან შემოწმებული JWT payload (ან 401)"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid token")
     
     token = authorization.replace("Bearer ", "")
     payload = decode_access_token(token)
     
-    if not payload:
+    if not payload or payload.get("id") is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return payload
+
+
+async def get_current_principal(
+    authorization: str = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+) -> dict:
+    """JWT token-ის შემოწმება და admin/moderator-ის მიმდინარე უფლებების ჩატვირთვა DB-დან"""
+    payload = _token_payload(authorization)
+    principal = await load_principal(payload["id"], db)
     
-    # ✅ ᲓᲐᲐᲛᲐᲢᲔ: moderator/admin შემოწმება
-    is_admin = payload.get("is_admin", False)
-    is_moder = payload.get("is_moder", False)
+    # ✅ დაბლოკილი ან წაშლილი მომხმარებლის token აღარ მოქმედებს
+    if not principal["is_active"]:
+        raise HTTPException(status_code=401, detail="User is inactive or no longer exists")
     
-    if not (is_admin or is_moder):
+    return {key: value for key, value in principal.items() if key != "is_active"}
+
+
+async def get_current_moderator_user(
+    principal: dict = Depends(get_current_principal)
+):
+    """moderator/admin მომხმარებელი (როლი DB-დან)"""
+    if not (principal["is_admin"] or principal["is_moder"]):
         raise HTTPException(
             status_code=403, 
             detail="Access denied: moderator privileges required"
         )
     
-    return {
-        "id": payload.get("id"),
-        "username": payload.get("username"),
-        "role": payload.get("role"),
-        "is_admin": is_admin,
-        "is_moder": is_moder
-    }
+    return principal
 
 
 async def get_current_user(
     authorization: str = Header(None)
 ):
-    """JWT token-დან მომხმარებლის ამოღება (ნებისმიერი ავტორიზებული user)"""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid token")
-    
-    token = authorization.replace("Bearer ", "")
-    payload = decode_access_token(token)
-    
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    """JWT token-დან მომხმარებლის ამოღება (ნებისმიერი ავტორიზებული user, DB-ის გარეშე)"""
+    payload = _token_payload(authorization)
     
     return {
         "id": payload.get("id"),
@@ -66,4 +116,4 @@ async def get_current_user(
         "role": payload.get("role"),
         "is_admin": payload.get("is_admin", False),
         "is_moder": payload.get("is_moder", False)
-    }
\ No newline at end of file
+    }
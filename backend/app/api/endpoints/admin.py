@@ -1,17 +1,17 @@
 import os
+import json
+import base64
 import logging
 from fastapi import APIRouter, HTTPException, Depends, Header, Query
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from app.schemas.user import UserResponse
-from app.core.security import decode_access_token
-from app.config import get_db_connection
-from dotenv import load_dotenv
-from time import time
-
-# ✅ .env ფაილის ჩატვირთვა
-load_dotenv()
+from app.api.dependencies import get_current_principal, invalidate_principal
+from app.core.rate_limit import RateLimiter
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 
 router = APIRouter()
 
@@ -23,53 +23,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger("admin_api")
 
-# ✅ Rate limiting (მარტივი in-memory, მხოლოდ მაგალითისთვის)
+# ✅ Rate limiting (sliding window, app.core.rate_limit)
 RATE_LIMIT = int(os.getenv("ADMIN_RATE_LIMIT", 10))  # მოთხოვნები წუთში
-rate_limit_cache = {}
+admin_rate_limiter = RateLimiter("admin", RATE_LIMIT, 60)
+
+async def check_rate_limit(user_id):
+    await admin_rate_limiter.check(user_id)
+
 
-def check_rate_limit(user_id):
-    now = int(time())
-    window = now // 60  # წუთის window
-    key = f"{user_id}:{window}"
-    count = rate_limit_cache.get(key, 0)
-    if count >= RATE_LIMIT:
-        raise HTTPException(status_code=429, detail="Too many requests, please wait.")
-    rate_limit_cache[key] = count + 1
+def invalidate_user_caches(user_id: int):
+    """მომხმარებლის ქეშირებული principal-ის და token payload-ების წაშლა"""
+    invalidate_principal(user_id)
 
 
 # ========== HELPER: Get current admin user ==========
-async def get_current_admin(authorization: str = Header(None)):
+async def get_current_admin(
+    principal: dict = Depends(get_current_principal)
+):
     """
-    Dependency: შეამოწმებს JWT token-ს და დაადასტურებს მხოლოდ Admin უფლებას
+    Dependency: შეამოწმებს JWT token-ს და დაადასტურებს მხოლოდ Admin უფლებას (DB-დან)
     """
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid token")
-    token = authorization.replace("Bearer ", "")
-    payload = decode_access_token(token)
-    if not payload:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    username = payload.get("username")
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, username, is_admin
-                FROM users
-                WHERE username = %s AND is_active = TRUE;
-            """, (username,))
-            user_row = cur.fetchone()
-            if not user_row:
-                raise HTTPException(status_code=404, detail="User not found")
-            # ✅ მხოლოდ admin
-            if not user_row[2]:
-                raise HTTPException(status_code=403, detail="Admin access required")
-            return {
-                "id": user_row[0],
-                "username": user_row[1],
-                "is_admin": user_row[2]
-            }
-    finally:
-        conn.close()
+    # ✅ მხოლოდ admin
+    if not principal["is_admin"]:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return principal
 
 
 # ========== 1. GET /api/admin/users - ყველა მომხმარებელი ==========
@@ -79,61 +56,60 @@ class UsersListResponse(BaseModel):
 
 
 @router.get("/users", response_model=UsersListResponse)
-async def get_all_users(current_user: dict = Depends(get_current_admin)):
+async def get_all_users(
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     ყველა მომხმარებლის სია
     
     Requires: Admin or Moderator
     """
-    check_rate_limit(current_user['id'])
+    await check_rate_limit(current_user['id'])
     logger.info(f"Admin request: Get all users by {current_user['username']}")
     
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, username, email, is_admin, is_moder, is_active, created_at
-                FROM users
-                ORDER BY created_at DESC;
-            """)
-            
-            rows = cur.fetchall()
-            users = [
-                UserResponse(
-                    id=row[0],
-                    username=row[1],
-                    email=row[2],
-                    is_admin=row[3],
-                    is_moder=row[4],
-                    is_active=row[5],
-                    created_at=row[6]
-                )
-                for row in rows
-            ]
-            logger.info(f"Returned {len(users)} users")
-            # ✅ Audit log
-            logger.info(f"AUDIT: {current_user['username']} viewed all users")
-
-            return UsersListResponse(
-                total=len(users),
-                users=users
-            )
-    finally:
-        conn.close()
+    result = await db.execute(text("""
+        SELECT id, username, email, is_admin, is_moder, is_active, created_at
+        FROM users
+        ORDER BY created_at DESC
+    """))
+    
+    rows = result.fetchall()
+    users = [
+        UserResponse(
+            id=row[0],
+            username=row[1],
+            email=row[2],
+            is_admin=row[3],
+            is_moder=row[4],
+            is_active=row[5],
+            created_at=row[6]
+        )
+        for row in rows
+    ]
+    logger.info(f"Returned {len(users)} users")
+    # ✅ Audit log
+    logger.info(f"AUDIT: {current_user['username']} viewed all users")
+
+    return UsersListResponse(
+        total=len(users),
+        users=users
+    )
 
 
 # ========== 2. PATCH /api/admin/users/{user_id}/toggle-active ==========
 @router.patch("/users/{user_id}/toggle-active")
 async def toggle_user_active(
     user_id: int,
-    current_user: dict = Depends(get_current_admin)
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     მომხმარებლის აქტივაცია/დეაქტივაცია
     
     Requires: Admin
     """
-    check_rate_limit(current_user['id'])
+    await check_rate_limit(current_user['id'])
     if not current_user['is_admin']:
         raise HTTPException(status_code=403, detail="Admin access required")
     
@@ -143,44 +119,47 @@ async def toggle_user_active(
     
     logger.info(f"Toggling active status for user {user_id} by {current_user['username']}")
     
-    conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
-            # Get current status
-            cur.execute("SELECT is_active FROM users WHERE id = %s;", (user_id,))
-            row = cur.fetchone()
-            
-            if not row:
-                raise HTTPException(status_code=404, detail="User not found")
-            
-            new_status = not row[0]
-            
-            # Update status
-            cur.execute("""
+        # Get current status
+        result = await db.execute(
+            text("SELECT is_active FROM users WHERE id = :id"),
+            {"id": user_id}
+        )
+        row = result.fetchone()
+        
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        new_status = not row[0]
+        
+        # Update status
+        await db.execute(
+            text("""
                 UPDATE users 
-                SET is_active = %s, updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s;
-            """, (new_status, user_id))
-            
-            conn.commit()
-            
-            logger.info(f"User {user_id} is now {'active' if new_status else 'inactive'}")
-            # ✅ Audit log
-            logger.info(f"AUDIT: {current_user['username']} toggled active status for user {user_id} to {new_status}")
-            
-            return {
-                "success": True,
-                "user_id": user_id,
-                "is_active": new_status
-            }
+                SET is_active = :is_active, updated_at = CURRENT_TIMESTAMP
+                WHERE id = :id
+            """),
+            {"is_active": new_status, "id": user_id}
+        )
+        
+        await db.commit()
+        invalidate_user_caches(user_id)
+        
+        logger.info(f"User {user_id} is now {'active' if new_status else 'inactive'}")
+        # ✅ Audit log
+        logger.info(f"AUDIT: {current_user['username']} toggled active status for user {user_id} to {new_status}")
+        
+        return {
+            "success": True,
+            "user_id": user_id,
+            "is_active": new_status
+        }
     except HTTPException:
         raise
     except Exception:
-        conn.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error in toggle_user_active")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        conn.close()
 
 
 # ========== 3. PATCH /api/admin/users/{user_id}/role ==========
@@ -193,7 +172,8 @@ class UpdateRoleRequest(BaseModel):
 async def update_user_role(
     user_id: int,
     role_data: UpdateRoleRequest,
-    current_user: dict = Depends(get_current_admin)
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     
     """
@@ -201,7 +181,7 @@ async def update_user_role(
     
     Requires: Admin
     """
-    check_rate_limit(current_user['id'])
+    await check_rate_limit(current_user['id'])
     if not current_user['is_admin']:
         raise HTTPException(status_code=403, detail="Admin access required")
     
@@ -212,61 +192,62 @@ async def update_user_role(
     logger.info(f"Updating role for user {user_id} by {current_user['username']}")
     logger.info(f"   New role: is_admin={role_data.is_admin}, is_moder={role_data.is_moder}")
     
-    conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT id FROM users WHERE id = %s;", (user_id,))
-            if not cur.fetchone():
-                raise HTTPException(status_code=404, detail="User not found")
-            
-            # Build UPDATE query dynamically
-            updates = []
-            params = []
-            
-            if role_data.is_admin is not None:
-                updates.append("is_admin = %s")
-                params.append(role_data.is_admin)
-            
-            if role_data.is_moder is not None:
-                updates.append("is_moder = %s")
-                params.append(role_data.is_moder)
-            
-            if not updates:
-                raise HTTPException(status_code=400, detail="No role changes provided")
-            
-            updates.append("updated_at = CURRENT_TIMESTAMP")
-            params.append(user_id)
-            
-            query = f"UPDATE users SET {', '.join(updates)} WHERE id = %s;"
-            cur.execute(query, params)
-            
-            conn.commit()
-            
-            logger.info(f"User {user_id} role updated")
-            # ✅ Audit log
-            logger.info(f"AUDIT: {current_user['username']} updated role for user {user_id}: {role_data.dict()}")
-            
-            return {
-                "success": True,
-                "user_id": user_id,
-                "is_admin": role_data.is_admin,
-                "is_moder": role_data.is_moder
-            }
+        result = await db.execute(
+            text("SELECT id FROM users WHERE id = :id"),
+            {"id": user_id}
+        )
+        if not result.fetchone():
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        # Build UPDATE query dynamically
+        updates = []
+        params = {}
+        
+        if role_data.is_admin is not None:
+            updates.append("is_admin = :is_admin")
+            params["is_admin"] = role_data.is_admin
+        
+        if role_data.is_moder is not None:
+            updates.append("is_moder = :is_moder")
+            params["is_moder"] = role_data.is_moder
+        
+        if not updates:
+            raise HTTPException(status_code=400, detail="No role changes provided")
+        
+        updates.append("updated_at = CURRENT_TIMESTAMP")
+        params["id"] = user_id
+        
+        query = f"UPDATE users SET {', '.join(updates)} WHERE id = :id"
+        await db.execute(text(query), params)
+        
+        await db.commit()
+        invalidate_user_caches(user_id)
+        
+        logger.info(f"User {user_id} role updated")
+        # ✅ Audit log
+        logger.info(f"AUDIT: {current_user['username']} updated role for user {user_id}: {role_data.dict()}")
+        
+        return {
+            "success": True,
+            "user_id": user_id,
+            "is_admin": role_data.is_admin,
+            "is_moder": role_data.is_moder
+        }
     except HTTPException:
         raise
     except Exception:
-        conn.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error in update_user_role")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        conn.close()
 
 
 # ========== 4. DELETE /api/admin/users/{user_id} ==========
 @router.delete("/users/{user_id}")
 async def delete_user(
     user_id: int,
-    current_user: dict = Depends(get_current_admin)
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     მომხმარებლის წაშლა
@@ -274,7 +255,7 @@ async def delete_user(
     Requires: Admin
     WARNING: შეუქცევადი ოპერაცია!
     """
-    check_rate_limit(current_user['id'])
+    await check_rate_limit(current_user['id'])
     if not current_user['is_admin']:
         raise HTTPException(status_code=403, detail="Admin access required")
     
@@ -284,50 +265,54 @@ async def delete_user(
     
     logger.info(f"Deleting user {user_id} by {current_user['username']}")
     
-    conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
-            cur.execute("SELECT username FROM users WHERE id = %s;", (user_id,))
-            row = cur.fetchone()
-            
-            if not row:
-                raise HTTPException(status_code=404, detail="User not found")
-            
-            username = row[0]
-            
-            # Delete user
-            cur.execute("DELETE FROM users WHERE id = %s;", (user_id,))
-            conn.commit()
-            
-            logger.info(f"User {user_id} ({username}) deleted")
-            # ✅ Audit log
-            logger.info(f"AUDIT: {current_user['username']} deleted user {user_id} ({username})")
-            
-            return {
-                "success": True,
-                "user_id": user_id,
-                "username": username,
-                "message": "User deleted successfully"
-            }
+        result = await db.execute(
+            text("SELECT username FROM users WHERE id = :id"),
+            {"id": user_id}
+        )
+        row = result.fetchone()
+        
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+        
+        username = row[0]
+        
+        # Delete user
+        await db.execute(
+            text("DELETE FROM users WHERE id = :id"),
+            {"id": user_id}
+        )
+        await db.commit()
+        invalidate_user_caches(user_id)
+        
+        logger.info(f"User {user_id} ({username}) deleted")
+        # ✅ Audit log
+        logger.info(f"AUDIT: {current_user['username']} deleted user {user_id} ({username})")
+        
+        return {
+            "success": True,
+            "user_id": user_id,
+            "username": username,
+            "message": "User deleted successfully"
+        }
     except HTTPException:
         raise
     except Exception:
-        conn.rollback()
+        await db.rollback()
         logger.error(f"Unexpected error in delete_user")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        conn.close()
 
 
 # ========== 5. GET /api/admin/audit/logs - Audit Logs ==========
-# მიზანი: ყველა audit log ჩანაწერის წამოღება ფილტრებითა და pagination-ით
+# მიზანი: audit log ჩანაწერების წამოღება ფილტრებითა და pagination-ით
 # რას აკეთებს:
 #   - იღებს საძიებო პარამეტრებს (user_id, username, action, table_name, თარიღები)
 #   - აგებს დინამიურ WHERE clause-ს ფილტრებიდან
-#   - პირველ რიგში ითვლის სულ რამდენი ჩანაწერია (total count)
-#   - შემდეგ იღებს მხოლოდ მოთხოვნილ გვერდს (pagination: LIMIT + OFFSET)
-#   - აბრუნებს logs მასივს, page info-სა და total_pages-ს
+#   - გვერდს იღებს keyset pagination-ით (timestamp, id) - cursor-ით, OFFSET-ის გარეშე
+#   - total არის planner-ის შეფასება; ზუსტი COUNT(*) მხოლოდ include_total=true-ით
+#   - აბრუნებს logs მასივს, next_cursor / prev_cursor-ს და page info-ს
 # გამოყენება: Admin-ის მიერ moderator-ების მოქმედებების თვალყურის დევნებისთვის
+# შენიშვნა: page > 1 (cursor-ის გარეშე) ძველი OFFSET რეჟიმია თავსებადობისთვის
 
 
 
@@ -346,175 +331,253 @@ class AuditLogResponse(BaseModel):
 
 class AuditLogsListResponse(BaseModel):
     total: int
+    total_is_estimate: bool = False
     logs: List[AuditLogResponse]
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_audit_cursor(timestamp: datetime, log_id: int, direction: str) -> str:
+    """(timestamp, id) პოზიციის opaque cursor-ად გარდაქმნა"""
+    raw = json.dumps({"t": timestamp.isoformat(), "i": log_id, "d": direction})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_audit_cursor(cursor: str):
+    """cursor -> (timestamp, id, direction); არასწორ cursor-ზე 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        direction = data["d"]
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(data["t"]), int(data["i"]), direction
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_date_filter(value: Optional[str]) -> Optional[datetime]:
+    """ISO თარიღის ფილტრი -> datetime; არასწორ ფორმატზე 400"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {value}")
+
+
+async def estimate_row_count(db: AsyncSession, where_sql: str, params: dict) -> int:
+    """რიგების სავარაუდო რაოდენობა planner-ის სტატისტიკიდან (ცხრილის სკანირების გარეშე)"""
+    result = await db.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM audit_logs WHERE {where_sql}"), params)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
 
 @router.get("/audit/logs", response_model=AuditLogsListResponse)
 async def get_audit_logs(
     current_user: dict = Depends(get_current_admin),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     user_id: Optional[int] = None,
     username: Optional[str] = None,
     action: Optional[str] = None,
     table_name: Optional[str] = None,
     start_date: Optional[str] = None,
-    end_date: Optional[str] = None
+    end_date: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Audit ლოგების სია ფილტრებით და pagination-ით
+    Audit ლოგების სია ფილტრებით და cursor pagination-ით
     
     Requires: Admin
     """
-    check_rate_limit(current_user['id'])
+    await check_rate_limit(current_user['id'])
     logger.info(f"Admin request: Get audit logs by {current_user['username']}")
+
+    cursor_position = decode_audit_cursor(cursor) if cursor else None
+    start_dt = parse_date_filter(start_date)
+    end_dt = parse_date_filter(end_date)
     
-    conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
-            # Build WHERE clause
-            where_clauses = []
-            params = []
-            
-            if user_id:
-                where_clauses.append("user_id = %s")
-                params.append(user_id)
-            if username:
-                where_clauses.append("username ILIKE %s")
-                params.append(f"%{username}%")
-            if action:
-                where_clauses.append("action = %s")
-                params.append(action)
-            if table_name:
-                where_clauses.append("table_name = %s")
-                params.append(table_name)
-            if start_date:
-                where_clauses.append("timestamp >= %s")
-                params.append(start_date)
-            if end_date:
-                where_clauses.append("timestamp <= %s")
-                params.append(end_date)
-            
-            where_sql = " AND ".join(where_clauses) if where_clauses else "TRUE"
-            
-            # Get total count
-            cur.execute(f"SELECT COUNT(*) FROM audit_logs WHERE {where_sql};", params)
-            total = cur.fetchone()[0]
-            
-            # Get paginated results
+        # Build WHERE clause
+        where_clauses = []
+        params = {}
+        
+        if user_id:
+            where_clauses.append("user_id = :user_id")
+            params["user_id"] = user_id
+        if username:
+            where_clauses.append("username ILIKE :username")
+            params["username"] = f"%{username}%"
+        if action:
+            where_clauses.append("action = :action")
+            params["action"] = action
+        if table_name:
+            where_clauses.append("table_name = :table_name")
+            params["table_name"] = table_name
+        if start_dt:
+            where_clauses.append("timestamp >= :start_date")
+            params["start_date"] = start_dt
+        if end_dt:
+            where_clauses.append("timestamp <= :end_date")
+            params["end_date"] = end_dt
+        
+        where_sql = " AND ".join(where_clauses) if where_clauses else "TRUE"
+        
+        # Total: ზუსტი მხოლოდ მოთხოვნით, სხვა შემთხვევაში planner-ის შეფასება
+        if include_total:
+            result = await db.execute(text(f"SELECT COUNT(*) FROM audit_logs WHERE {where_sql}"), params)
+            total = result.scalar()
+        else:
+            total = await estimate_row_count(db, where_sql, params)
+
+        columns = """id, timestamp, user_id, username, action, table_name,
+                   record_id, old_value, new_value, ip_address"""
+
+        direction = "next"
+        if cursor_position:
+            # ✅ Keyset pagination: (timestamp, id) ინდექსით, OFFSET-ის გარეშე
+            cursor_ts, cursor_id, direction = cursor_position
+            if direction == "next":
+                keyset_sql, order_sql = "(timestamp, id) < (:cursor_ts, :cursor_id)", "timestamp DESC, id DESC"
+            else:
+                keyset_sql, order_sql = "(timestamp, id) > (:cursor_ts, :cursor_id)", "timestamp ASC, id ASC"
+            result = await db.execute(text(f"""
+                SELECT {columns}
+                FROM audit_logs
+                WHERE {where_sql} AND {keyset_sql}
+                ORDER BY {order_sql}
+                LIMIT :limit
+            """), {**params, "cursor_ts": cursor_ts, "cursor_id": cursor_id, "limit": page_size + 1})
+        else:
+            # პირველი გვერდი ან ძველი page-ზე დაფუძნებული მოთხოვნა
             offset = (page - 1) * page_size
-            cur.execute(f"""
-                SELECT id, timestamp, user_id, username, action, table_name, 
-                       record_id, old_value, new_value, ip_address
+            result = await db.execute(text(f"""
+                SELECT {columns}
                 FROM audit_logs
                 WHERE {where_sql}
-                ORDER BY timestamp DESC
-                LIMIT %s OFFSET %s;
-            """, params + [page_size, offset])
-            
-            rows = cur.fetchall()
-            logs = [
-                AuditLogResponse(
-                    id=row[0],
-                    timestamp=row[1],
-                    user_id=row[2],
-                    username=row[3],
-                    action=row[4],
-                    table_name=row[5],
-                    record_id=row[6],
-                    old_value=row[7],
-                    new_value=row[8],
-                    ip_address=row[9]
-                )
-                for row in rows
-            ]
-            
-            total_pages = (total + page_size - 1) // page_size
-            
-            return AuditLogsListResponse(
-                total=total,
-                logs=logs,
-                page=page,
-                page_size=page_size,
-                total_pages=total_pages
+                ORDER BY timestamp DESC, id DESC
+                LIMIT :limit OFFSET :offset
+            """), {**params, "limit": page_size + 1, "offset": offset})
+        
+        rows = result.fetchall()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if direction == "prev":
+            rows.reverse()
+
+        logs = [
+            AuditLogResponse(
+                id=row[0],
+                timestamp=row[1],
+                user_id=row[2],
+                username=row[3],
+                action=row[4],
+                table_name=row[5],
+                record_id=row[6],
+                old_value=row[7],
+                new_value=row[8],
+                ip_address=row[9]
             )
+            for row in rows
+        ]
+
+        # next/prev cursor-ები: next - უფრო ძველი ჩანაწერები, prev - უფრო ახალი
+        if direction == "next":
+            has_next = has_more
+            has_prev = cursor_position is not None or page > 1
+        else:
+            has_next = True
+            has_prev = has_more
+        next_cursor = encode_audit_cursor(rows[-1][1], rows[-1][0], "next") if rows and has_next else None
+        prev_cursor = encode_audit_cursor(rows[0][1], rows[0][0], "prev") if rows and has_prev else None
+        
+        total_pages = (total + page_size - 1) // page_size
+        
+        return AuditLogsListResponse(
+            total=total,
+            total_is_estimate=not include_total,
+            logs=logs,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching audit logs: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        conn.close()
 
 
 # ========== 6. GET /api/admin/audit/stats - Audit Statistics ==========
 # მიზანი: audit logs-ის სტატისტიკური მიმოხილვის მიწოდება
 # რას აკეთებს:
-#   - ითვლის audit_logs ცხრილში სულ რამდენი ჩანაწერია (total_logs)
+#   - კითხულობს მხოლოდ audit_stats_hourly rollup-ს (audit_logs-ს არ სკანირებს)
+#   - ითვლის სულ რამდენი ჩანაწერია (total_logs)
 #   - აჯგუფებს action-ის მიხედვით (CREATE, UPDATE, DELETE, TOGGLE_PLAYABLE) და ითვლის თითოეულს
 #   - აჯგუფებს table_name-ის მიხედვით (words, sentences, proverbs) და ითვლის თითოეულს
-#   - ითვლის ბოლო 24 საათის განმავლობაში რამდენი მოქმედება იყო (recent_activity)
+#   - ითვლის ბოლო 24 საათის აქტივობას (საათის სიზუსტით - მიმდინარე საათის bucket-ის ჩათვლით)
 # გამოყენება: Dashboard-ზე სტატისტიკის ბარათების (stat cards) საჩვენებლად
 
 class AuditStatsResponse(BaseModel):
     total_logs: int
-    actions: dict
-    tables: dict
+    actions: Dict[str, int]
+    tables: Dict[str, int]
     recent_activity: int  # last 24h
 
 @router.get("/audit/stats", response_model=AuditStatsResponse)
 async def get_audit_stats(
-    current_user: dict = Depends(get_current_admin)
+    current_user: dict = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Audit ლოგების სტატისტიკა
+    Audit ლოგების სტატისტიკა (audit_stats_hourly rollup-დან)
     
     Requires: Admin
     """
-    check_rate_limit(current_user['id'])
+    await check_rate_limit(current_user['id'])
     logger.info(f"Admin request: Get audit stats by {current_user['username']}")
     
-    conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
-            # Total logs
-            cur.execute("SELECT COUNT(*) FROM audit_logs;")
-            total_logs = cur.fetchone()[0]
-            
-            # Actions breakdown
-            cur.execute("""
-                SELECT action, COUNT(*) 
-                FROM audit_logs 
-                GROUP BY action 
-                ORDER BY COUNT(*) DESC;
-            """)
-            actions = {row[0]: row[1] for row in cur.fetchall()}
-            
-            # Tables breakdown
-            cur.execute("""
-                SELECT table_name, COUNT(*) 
-                FROM audit_logs 
-                GROUP BY table_name 
-                ORDER BY COUNT(*) DESC;
-            """)
-            tables = {row[0]: row[1] for row in cur.fetchall()}
-            
-            # Recent activity (last 24 hours)
-            cur.execute("""
-                SELECT COUNT(*) 
-                FROM audit_logs 
-                WHERE timestamp >= NOW() - INTERVAL '24 hours';
-            """)
-            recent_activity = cur.fetchone()[0]
-            
-            return AuditStatsResponse(
-                total_logs=total_logs,
-                actions=actions,
-                tables=tables,
-                recent_activity=recent_activity
-            )
+        result = await db.execute(text("""
+            SELECT
+                action,
+                table_name,
+                SUM(count)::bigint,
+                COALESCE(SUM(count) FILTER (
+                    WHERE bucket >= date_trunc('hour', NOW() - INTERVAL '24 hours')
+                ), 0)::bigint
+            FROM audit_stats_hourly
+            GROUP BY action, table_name
+        """))
+        rows = result.fetchall()
+
+        actions = {}
+        tables = {}
+        total_logs = 0
+        recent_activity = 0
+        # SUM(bigint) numeric-ია - ::bigint-ით int ბრუნდება და არა Decimal
+        for action, table_name, count, recent in rows:
+            actions[action] = actions.get(action, 0) + count
+            tables[table_name] = tables.get(table_name, 0) + count
+            total_logs += count
+            recent_activity += recent
+        
+        return AuditStatsResponse(
+            total_logs=total_logs,
+            actions=dict(sorted(actions.items(), key=lambda item: item[1], reverse=True)),
+            tables=dict(sorted(tables.items(), key=lambda item: item[1], reverse=True)),
+            recent_activity=recent_activity
+        )
     except Exception as e:
         logger.error(f"Error fetching audit stats: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
-    finally:
-        conn.close()
\ No newline at end of file
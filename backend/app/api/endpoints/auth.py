@@ -1,87 +1,124 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.user import UserRegister, UserLogin, UserResponse, TokenResponse
-from app.core.security import get_password_hash, verify_password, create_access_token
-from app.config import get_db_connection
+from app.core.security import (
+    get_password_hash_async,
+    verify_password_async,
+    create_access_token,
+    PasswordHashingBusy
+)
+from app.database import get_async_db
+from app.core.rate_limit import RateLimiter, client_ip, rate_limit
+import os
 
 router = APIRouter()
 
-@router.post("/register", status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister):
+# ✅ პაროლის გადარჩევის წინააღმდეგ: მკაცრი ლიმიტი (IP, username) წყვილზე და
+# გაცილებით მაღალი ლიმიტი IP-ზე - სკოლის NAT-ის უკან მთელი კლასი ერთი IP-დან შემოდის
+AUTH_RATE_LIMIT = int(os.getenv("AUTH_RATE_LIMIT", 10))  # მოთხოვნები წუთში (IP + username)
+AUTH_IP_RATE_LIMIT = int(os.getenv("AUTH_IP_RATE_LIMIT", 300))  # მოთხოვნები წუთში (IP)
+auth_rate_limit = rate_limit("auth", AUTH_IP_RATE_LIMIT, 60, key="ip")
+login_rate_limiter = RateLimiter("login", AUTH_RATE_LIMIT, 60)
+
+
+def _hashing_busy_error() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="სერვერი დატვირთულია, სცადეთ რამდენიმე წამში",
+        headers={"Retry-After": "2"}
+    )
+
+@router.post("/register", status_code=status.HTTP_201_CREATED, dependencies=[Depends(auth_rate_limit)])
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """მომხმარებლის რეგისტრაცია"""
-    conn = get_db_connection()
     try:
-        with conn.cursor() as cur:
-            # დღიური ლიმიტი
-            cur.execute("""
-                SELECT COUNT(*) FROM users
-                WHERE created_at >= (NOW() - INTERVAL '1 day')
-            """)
-            daily_count = cur.fetchone()[0]
-            if daily_count >= 100:  # ✅ დღიური ლიმიტი 100 რეგისტრაცია
-                raise HTTPException(status_code=429, detail="დღიური რეგისტრაციების ლიმიტი ამოწურულია. სცადეთ ხვალ.")
+        # დღიური ლიმიტი
+        result = await db.execute(text("""
+            SELECT COUNT(*) FROM users
+            WHERE created_at >= (NOW() - INTERVAL '1 day')
+        """))
+        daily_count = result.scalar()
+        if daily_count >= 100:  # ✅ დღიური ლიმიტი 100 რეგისტრაცია
+            raise HTTPException(status_code=429, detail="დღიური რეგისტრაციების ლიმიტი ამოწურულია. სცადეთ ხვალ.")
 
-            # Username და email უნიკალურობა
-            cur.execute("SELECT id FROM users WHERE username = %s", (user_data.username,))
-            if cur.fetchone():
-                raise HTTPException(status_code=400, detail="ეს მომხმარებელი უკვე არსებობს")
-            cur.execute("SELECT id FROM users WHERE email = %s", (user_data.email,))
-            if cur.fetchone():
-                raise HTTPException(status_code=400, detail="ეს ელ.ფოსტა უკვე გამოყენებულია")
-            # პაროლის ჰეშირება
-            hashed_password = get_password_hash(user_data.password)
-            cur.execute("""
+        # Username და email უნიკალურობა
+        result = await db.execute(
+            text("SELECT id FROM users WHERE username = :username"),
+            {"username": user_data.username}
+        )
+        if result.fetchone():
+            raise HTTPException(status_code=400, detail="ეს მომხმარებელი უკვე არსებობს")
+        result = await db.execute(
+            text("SELECT id FROM users WHERE email = :email"),
+            {"email": user_data.email}
+        )
+        if result.fetchone():
+            raise HTTPException(status_code=400, detail="ეს ელ.ფოსტა უკვე გამოყენებულია")
+        # პაროლის ჰეშირება (bcrypt worker pool-ში, event loop არ იბლოკება)
+        try:
+            hashed_password = await get_password_hash_async(user_data.password)
+        except PasswordHashingBusy:
+            raise _hashing_busy_error()
+        await db.execute(
+            text("""
                 INSERT INTO users (username, email, password, is_active)
-                VALUES (%s, %s, %s, TRUE)
-                RETURNING id, username, email, is_admin, is_moder, created_at;
-            """, (user_data.username, user_data.email, hashed_password))
-            user_row = cur.fetchone()
-            conn.commit()
-            return {"message": "რეგისტრაცია წარმატებით დასრულდა!"}
+                VALUES (:username, :email, :password, TRUE)
+                RETURNING id, username, email, is_admin, is_moder, created_at
+            """),
+            {"username": user_data.username, "email": user_data.email, "password": hashed_password}
+        )
+        await db.commit()
+        return {"message": "რეგისტრაცია წარმატებით დასრულდა!"}
     except HTTPException:
         raise
     except Exception:
-        conn.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="რეგისტრაცია ვერ მოხერხდა")
-    finally:
-        conn.close()
 
-@router.post("/login")
-async def login(credentials: UserLogin):
+@router.post("/login", dependencies=[Depends(auth_rate_limit)])
+async def login(credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
     """მომხმარებლის ავტორიზაცია"""
-    conn = get_db_connection()
+    await login_rate_limiter.check(f"{client_ip(request)}:{credentials.username.lower()}")
+    result = await db.execute(
+        text("""
+            SELECT id, username, password, is_admin, is_moder 
+            FROM users 
+            WHERE username = :username AND is_active = TRUE
+        """),
+        {"username": credentials.username}
+    )
+    user = result.fetchone()
+    await db.close()  # ✅ კავშირი pool-ში ბრუნდება პაროლის შემოწმებამდე
+
+    # ✅ bcrypt worker pool-ში
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, username, password, is_admin, is_moder 
-                FROM users 
-                WHERE username = %s AND is_active = TRUE;
-            """, (credentials.username,))
-            user = cur.fetchone()
-            
-            if not user or not verify_password(credentials.password, user[2]):
-                raise HTTPException(status_code=401, detail="Invalid credentials")
-            
-            # ✅ Token payload-ში ID-ს ჩართვა
-            access_token = create_access_token(data={
-                "id": user[0],              # ✅ user ID
-                "username": user[1],
-                "is_admin": user[3],
-                "is_moder": user[4],
-                "role": "admin" if user[3] else "moderator" if user[4] else "user"
-            })
-            
-            return {
-                "access_token": access_token,
-                "token_type": "bearer",
-                "user": {
-                    "id": user[0],          # ✅ ID
-                    "username": user[1],
-                    "is_admin": user[3],
-                    "is_moder": user[4]
-                }
-            }
-    finally:
-        conn.close()
+        password_ok = bool(user) and await verify_password_async(credentials.password, user[2])
+    except PasswordHashingBusy:
+        raise _hashing_busy_error()
+
+    if not password_ok:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    # ✅ Token payload-ში ID-ს ჩართვა
+    access_token = create_access_token(data={
+        "id": user[0],              # ✅ user ID
+        "username": user[1],
+        "is_admin": user[3],
+        "is_moder": user[4],
+        "role": "admin" if user[3] else "moderator" if user[4] else "user"
+    })
+    
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": {
+            "id": user[0],          # ✅ ID
+            "username": user[1],
+            "is_admin": user[3],
+            "is_moder": user[4]
+        }
+    }
 
 # უსაფრთხოების რეკომენდაციები:
 # - პაროლი არასდროს ინახება ან იგზავნება დაუშიფრავად
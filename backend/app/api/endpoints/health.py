@@ -0,0 +1,64 @@
+"""
+Health Endpoints - liveness და readiness probe-ები
+
+- /health/live: პროცესი ცოცხალია (ბაზას არ ეხება) - გადატვირთვის კრიტერიუმი
+- /health/ready: worker-ს შეუძლია ტრაფიკის მიღება - startup დასრულებულია,
+  ბაზა პასუხობს READINESS_DB_TIMEOUT წამში; 503 სხვა შემთხვევაში.
+  პასუხში ასევე pool-ების მდგომარეობა და warmup ცხრილების ქეშის სტატუსი.
+"""
+
+import asyncio
+import os
+import time
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from app.config import get_pool_stats
+from app.database import AsyncSessionLocal, get_pool_status
+from app.core.snapshot_cache import dedaena_cache
+
+router = APIRouter()
+
+READINESS_DB_TIMEOUT = float(os.getenv("READINESS_DB_TIMEOUT", 2))
+
+
+async def _check_database() -> dict:
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            await asyncio.wait_for(db.execute(text("SELECT 1")), READINESS_DB_TIMEOUT)
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+
+@router.get("/live")
+def liveness():
+    """Liveness probe"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness(request: Request):
+    """Readiness probe"""
+    started = getattr(request.app.state, "ready", False)
+    database = await _check_database() if started else {"ok": False, "error": "startup not finished"}
+    warmup_tables = getattr(request.app.state, "warmup_tables", [])
+
+    ready = started and database["ok"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "database": database,
+            "pools": {
+                "sqlalchemy": get_pool_status(),
+                "psycopg2": get_pool_stats(),
+            },
+            # ცივი ქეში არ აჩერებს ტრაფიკს - snapshot პირველ request-ზე აიგება
+            "cache": {
+                "version": dedaena_cache.version,
+                "warm": {table: dedaena_cache.is_warm(table) for table in warmup_tables},
+            },
+        }
+    )
@@ -0,0 +1,61 @@
+"""
+Metrics Endpoint - /metrics (Prometheus scrape)
+
+request-ების მეტრიკებს (app.core.metrics) ემატება component-ების
+მიმდინარე მდგომარეობა: DB pool-ები, ქეშები, rate limiter, progress
+coalescer, audit writer და პაროლის ჰეშირების რიგი.
+
+scrape-ს სჭირდება Authorization: Bearer <METRICS_TOKEN>. METRICS_TOKEN-ის
+გარეშე endpoint გამორთულია (404) - მეტრიკები route-ებს და დატვირთვას აჩენს.
+"""
+
+import hmac
+import os
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.config import get_pool_stats
+from app.database import get_pool_status
+from app.core import metrics
+from app.core.audit import audit_writer
+from app.core.progress import progress_coalescer
+from app.core.rate_limit import get_rate_limit_stats
+from app.core.security import get_password_hash_stats, get_token_cache_stats
+from app.core.snapshot_cache import dedaena_cache
+from app.api.dependencies import principal_cache
+
+router = APIRouter()
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+def collect_component_metrics():
+    """component-ების stats() -> Prometheus gauge-ები"""
+    return [
+        *metrics.render_stats("dedaena_db_pool", "Database connection pool state", {
+            "sqlalchemy_async": get_pool_status(),
+            "psycopg2": get_pool_stats(),
+        }, label="pool"),
+        *metrics.render_stats("dedaena_cache", "In-process cache state", {
+            "dedaena_snapshot": dedaena_cache.stats(),
+            "token": get_token_cache_stats(),
+            "principal": principal_cache.stats(),
+        }, label="cache"),
+        *metrics.render_stats("dedaena_rate_limit", "Rate limiter state", {"rate_limit": get_rate_limit_stats()}),
+        *metrics.render_stats("dedaena_progress", "Progress coalescer state", {"coalescer": progress_coalescer.stats()}),
+        *metrics.render_stats("dedaena_audit", "Audit writer state", {"writer": audit_writer.stats()}),
+        *metrics.render_stats("dedaena_password_hash", "Password hashing pool state", {"hash": get_password_hash_stats()}),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus text format"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(
+        metrics.render(collect_component_metrics()),
+        media_type="text/plain; version=0.0.4"
+    )
@@ -3,9 +3,9 @@
 # """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas.sentence import SentenceUpdate, SentenceUpdateResponse
 from app.schemas.word import AddWordToTourRequest
 from app.schemas.story import StoryCreateRequest, StoryUpdateRequest, StoryTogglePlayableRequest
@@ -16,6 +16,14 @@ import re
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from app.core.audit import log_audit_event
+from app.core.tour_content import load_tour_content
+from app.core.letter_index import get_letter_index
+from app.core.text_analysis import analyze_batch
+from app.core.content_hash import content_hash, find_by_content
+from app.core.snapshot_cache import dedaena_cache
+from app.core.content_changes import record_changes, UPSERT, DELETE
+from app.core.rate_limit import rate_limit
+import os
 
 def split_text_into_paragraphs(text: str) -> List[str]:
     """ტექსტის აბზაცებად დაყოფა (ფრონტენდის ლოგიკის იდენტური)"""
@@ -33,20 +41,27 @@ def split_story_into_sentences(story_text: str) -> list:
 
 
 def insert_sentences_for_story(db, sentences: list, user_id: int) -> list:
-    """წინადადებების ჩასმა sentences ცხრილში, დაბრუნებული ID-ების სია"""
-    sentence_ids = []
-    for sentence in sentences:
-        result = db.execute(
-            text("""
-                INSERT INTO sentences (sentence, created_by, updated_by, is_playable)
-                VALUES (:sentence, :user_id, :user_id, false)
-                RETURNING id
-            """),
-            {"sentence": sentence, "user_id": user_id}
-        ).fetchone()
-        if result:
-            sentence_ids.append(result.id)
-    return sentence_ids
+    """
+    წინადადებების ჩასმა sentences ცხრილში ერთი multi-row INSERT-ით
+
+    unnest(...) WITH ORDINALITY ... ORDER BY ord - sequence-ის მნიშვნელობები
+    რიგების თანმიმდევრობით ენიჭება, ამიტომ დალაგებული ID-ები ემთხვევა
+    sentences-ის რიგს.
+    """
+    if not sentences:
+        return []
+    result = db.execute(
+        text("""
+            INSERT INTO sentences (sentence, content_hash, created_by, updated_by, is_playable)
+            SELECT s.sentence, s.content_hash, :user_id, :user_id, false
+            FROM unnest(CAST(:sentences AS text[]), CAST(:hashes AS bytea[]))
+                 WITH ORDINALITY AS s(sentence, content_hash, ord)
+            ORDER BY s.ord
+            RETURNING id
+        """),
+        {"sentences": list(sentences), "hashes": [content_hash(s) for s in sentences], "user_id": user_id}
+    ).fetchall()
+    return sorted(row.id for row in result)
 
 
 def delete_sentences_by_ids(db, sentence_ids: list):
@@ -62,53 +77,67 @@ def delete_sentences_by_ids(db, sentence_ids: list):
 DEDAENA_TABLE = "gogebashvili_1_with_ids"
 
 
-def assign_sentences_to_tours(db, sentence_ids: list, sentences: list):
-    """წინადადებების ID-ების მინიჭება შესაბამის ტურებს gogebashvili ცხრილში"""
+def assign_sentences_to_tours(db, sentence_ids: list, sentences: list) -> list:
+    """წინადადებების ID-ების მინიჭება შესაბამის ტურებს gogebashvili ცხრილში (აბრუნებს შეცვლილი ტურების position-ებს)"""
     if not sentence_ids or not sentences:
-        return
-    # ტურების წამოღება (მაღალი position-იდან დაბალისკენ - იდენტური ფრონტენდის ლოგიკასთან)
-    tours = db.execute(
-        text(f"SELECT position, letter, sentences_ids FROM {DEDAENA_TABLE} ORDER BY position DESC")
-    ).fetchall()
+        return []
+    # ✅ ასო -> ტური ინდექსი ქეშიდან (მაღალი position-ის წესი - იდენტური ფრონტენდის ლოგიკასთან)
+    letter_index = get_letter_index(db, DEDAENA_TABLE)
 
-    # ყოველი წინადადისთვის ტურის გამოცნობა
-    tour_new_ids = {}  # position -> [new sentence ids]
+    # ყოველი წინადადისთვის ტურის გამოცნობა (ერთი გავლა სიმბოლოებზე)
+    positions = []
+    assigned_ids = []
     for sentence, sid in zip(sentences, sentence_ids):
-        for tour in tours:
-            if tour.letter in sentence:
-                tour_new_ids.setdefault(tour.position, []).append(sid)
-                break
-
-    # თითოეული ტურის sentences_ids განახლება
-    for tour in tours:
-        if tour.position in tour_new_ids:
-            current_ids = list(tour.sentences_ids or [])
-            updated_ids = current_ids + tour_new_ids[tour.position]
-            db.execute(
-                text(f"UPDATE {DEDAENA_TABLE} SET sentences_ids = :ids WHERE position = :position"),
-                {"ids": updated_ids, "position": tour.position}
-            )
+        position = letter_index.resolve_position(sentence)
+        if position is not None:
+            positions.append(position)
+            assigned_ids.append(sid)
+
+    if not assigned_ids:
+        return []
 
+    # ✅ ყველა ტურის sentences_ids ერთი UPDATE-ით (ახალი ID-ები ემატება რიგის შენარჩუნებით)
+    db.execute(
+        text(f"""
+            UPDATE {DEDAENA_TABLE} AS t
+            SET sentences_ids = COALESCE(t.sentences_ids, '{{}}') || n.ids
+            FROM (
+                SELECT p.position, array_agg(p.sid ORDER BY p.ord) AS ids
+                FROM unnest(CAST(:positions AS int[]), CAST(:ids AS int[]))
+                     WITH ORDINALITY AS p(position, sid, ord)
+                GROUP BY p.position
+            ) AS n
+            WHERE t.position = n.position
+        """),
+        {"positions": positions, "ids": assigned_ids}
+    )
+    return sorted(set(positions))
 
-def remove_sentences_from_tours(db, sentence_ids: list):
-    """წინადადებების ID-ების ამოღება gogebashvili ცხრილის ტურებიდან"""
+
+def remove_sentences_from_tours(db, sentence_ids: list) -> list:
+    """წინადადებების ID-ების ამოღება gogebashvili ცხრილის ტურებიდან (ერთი UPDATE-ით, აბრუნებს შეცვლილი ტურების position-ებს)"""
     if not sentence_ids:
-        return
-    ids_set = set(sentence_ids)
-    tours = db.execute(
-        text(f"SELECT position, sentences_ids FROM {DEDAENA_TABLE} WHERE sentences_ids && :ids"),
+        return []
+    rows = db.execute(
+        text(f"""
+            UPDATE {DEDAENA_TABLE}
+            SET sentences_ids = ARRAY(
+                SELECT u.id
+                FROM unnest(sentences_ids) WITH ORDINALITY AS u(id, ord)
+                WHERE u.id <> ALL(CAST(:ids AS int[]))
+                ORDER BY u.ord
+            )
+            WHERE sentences_ids && CAST(:ids AS int[])
+            RETURNING position
+        """),
         {"ids": sentence_ids}
     ).fetchall()
-    for tour in tours:
-        current_ids = list(tour.sentences_ids or [])
-        updated_ids = [i for i in current_ids if i not in ids_set]
-        db.execute(
-            text(f"UPDATE {DEDAENA_TABLE} SET sentences_ids = :ids WHERE position = :position"),
-            {"ids": updated_ids, "position": tour.position}
-        )
+    return [row.position for row in rows]
 
 
-router = APIRouter()
+# ✅ ყველა მოდერატორის route-ის ლიმიტი მომხმარებელზე
+MODERATOR_RATE_LIMIT = int(os.getenv("MODERATOR_RATE_LIMIT", 120))  # მოთხოვნები წუთში
+router = APIRouter(dependencies=[Depends(rate_limit("moderator", MODERATOR_RATE_LIMIT, 60))])
 # Allowable table names for dedaena data
 allowed_tables = ["gogebashvili_1", "gogebashvili_1_test", "gogebashvili_1_with_ids"]
 
@@ -120,7 +149,7 @@ allowed_tables = ["gogebashvili_1", "gogebashvili_1_test", "gogebashvili_1_with_
 @router.get("/dedaena/{table_name}")
 async def get_dedaena_data(
     table_name: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_moderator_user)
 ):
     """
@@ -133,54 +162,9 @@ async def get_dedaena_data(
         raise HTTPException(status_code=500, detail="Invalid table name")
     
     try:
-        # ვიღებთ ყველა ტურს
-        result = db.execute(
-            text(f"""
-                SELECT 
-                    id, 
-                    position, 
-                    letter, 
-                    words_ids, 
-                    sentences_ids, 
-                    proverbs_ids, 
-                    toreads_ids
-                FROM {table_name} 
-                ORDER BY position
-            """)
-        ).fetchall()
-        
-        data = []
-        for r in result:
-            def fetch_items(table, column, ids):
-                if not ids:
-                    return []
-                # ids შეიძლება იყოს array ან სტრინგი
-                if isinstance(ids, str):
-                    ids = [int(i) for i in ids.split(',') if i.strip().isdigit()]
-                items = db.execute(
-                    text(f"SELECT * FROM {table} WHERE id = ANY(:ids)"),
-                    {"ids": ids}
-                ).fetchall()
-                # აქ გამოიყენეთ ._mapping რომ მიიღოთ dict
-                return [dict(item._mapping) for item in items]
-                # return
-
-            words = fetch_items("words","word", r.words_ids)
-            sentences = fetch_items("sentences", "sentence", r.sentences_ids)
-            proverbs = fetch_items("proverbs", "proverb", r.proverbs_ids)
-            toreads = fetch_items("toreads", "toread", r.toreads_ids)
-
-
-            data.append({
-                "id": r.id,
-                "position": r.position,
-                "letter": r.letter,
-                "words": words,
-                "sentences": sentences,
-                "proverbs": proverbs,
-                "toreads": toreads
-            })
-        
+        # ✅ ყველა ტური ერთიანი loader-ით (query-ების რაოდენობა მუდმივია)
+        data = await db.run_sync(load_tour_content, table_name)
+
         return {
             "success": True,
             "table_name": table_name,
@@ -199,6 +183,46 @@ async def get_dedaena_data(
 
 
 
+# # ============================================
+# # ✅ BATCH TEXT ANALYSIS
+# # ============================================
+
+MAX_ANALYZE_BATCH = int(os.getenv("MAX_ANALYZE_BATCH", 500))
+
+
+class AnalyzeTextRequest(BaseModel):
+    sentences: List[str] = Field(default_factory=list, max_length=MAX_ANALYZE_BATCH)
+    words: List[str] = Field(default_factory=list, max_length=MAX_ANALYZE_BATCH)
+
+
+@router.post("/dedaena/{table_name}/analyze")
+async def analyze_texts(
+    table_name: str,
+    request: AnalyzeTextRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_moderator_user)
+):
+    """
+    ბევრი წინადადების ანალიზი ერთ მოთხოვნაში (utils/textAnalysis.js-ის სემანტიკით):
+    თითო წინადადებაზე ტური (detectTourForText) და სიტყვები (analyzeSentence),
+    words-ზე - detectWordTour
+    """
+    if table_name not in allowed_tables:
+        raise HTTPException(status_code=500, detail="Invalid table name")
+
+    try:
+        # ✅ სიტყვების ინდექსი ქეშიდან, content_changes-ით ინკრემენტულად განახლებული
+        result = await db.run_sync(analyze_batch, table_name, request.sentences, request.words)
+        return {"success": True, "table_name": table_name, **result}
+
+    except Exception as e:
+        print(f"   ❌ Error analyzing texts: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"An internal server error occurred: {str(e)}"
+        )
+
+
 class TogglePlayableRequest(BaseModel):
     content: str
     is_playable: bool
@@ -209,7 +233,7 @@ async def toggle_is_playable(
     table_name: str,
     content_type: str,
     request: TogglePlayableRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_moderator_user)
 ):
     table_map = {
@@ -222,21 +246,22 @@ async def toggle_is_playable(
         raise HTTPException(status_code=400, detail="Invalid content_type")
     table_name_db, column_name = table_map[content_type]
 
-    # მოძებნე ჩანაწერი content-ით
-    row = db.execute(
-        text(f"SELECT id, is_playable FROM {table_name_db} WHERE {column_name} = :content"),
-        {"content": request.content}
-    ).fetchone()
+    # მოძებნე ჩანაწერი content-ით (content_hash-ის ინდექსით)
+    row = await db.run_sync(
+        find_by_content, table_name_db, column_name, request.content, "id, is_playable"
+    )
     if not row:
         raise HTTPException(status_code=404, detail="Content not found")
 
     old_value = str(row.is_playable) if row.is_playable is not None else "None"
     
-    db.execute(
+    await db.execute(
         text(f"UPDATE {table_name_db} SET is_playable = :is_playable, updated_by = :user_id WHERE id = :id"),
         {"is_playable": request.is_playable, "id": row.id, "user_id": current_user["id"]}
     )
-    db.commit()
+    await db.run_sync(record_changes, [(table_name_db, row.id, UPSERT)])
+    await db.commit()
+    dedaena_cache.invalidate()
     
     # ✅ Audit log
     try:
@@ -279,7 +304,7 @@ async def handle_dynamic_content_action(
     content_type: str, # 'word', 'sentence', 'proverb', 'reading'
     action: str,       # 'add', 'update', 'delete'
     request: DynamicContentRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_moderator_user)
 ):
     print(f"⚡️ Dynamic action request by moderator: {current_user}")
@@ -300,10 +325,10 @@ async def handle_dynamic_content_action(
     ids_column = f"{db_column}_ids"
     try:
         # 1. ამოიღე ids array
-        ids_result = db.execute(
+        ids_result = (await db.execute(
             text(f"SELECT {ids_column}, letter FROM {table_name} WHERE position = :pos"),
             {"pos": request.position}
-        ).fetchone()
+        )).fetchone()
         current_ids = ids_result[0] or []
         tour_letter = ids_result[1]
 
@@ -321,15 +346,27 @@ async def handle_dynamic_content_action(
             if not insert_column:
                 raise HTTPException(status_code=400, detail="Invalid content type for insert.")
 
+            # ✅ დუბლიკატი იმავე ტურში (content_hash-ის ინდექსით)
+            duplicate = await db.run_sync(
+                find_by_content, db_column, insert_column, request.content.strip(), "id", list(current_ids)
+            )
+            if duplicate:
+                raise HTTPException(status_code=409, detail=f"Content already exists in this tour (id {duplicate.id}).")
+
             insert_query = text(f"""
-                INSERT INTO {db_column} ({insert_column}, created_by, updated_by)
-                VALUES (:content, :user_id, :user_id)
+                INSERT INTO {db_column} ({insert_column}, content_hash, created_by, updated_by)
+                VALUES (:content, :hash, :user_id, :user_id)
                 RETURNING id
             """)
-            inserted = db.execute(insert_query, {"content": request.content.strip(), "user_id": current_user["id"]}).fetchone()
+            inserted = (await db.execute(insert_query, {
+                "content": request.content.strip(),
+                "hash": content_hash(request.content.strip()),
+                "user_id": current_user["id"]
+            })).fetchone()
             if not inserted:
                 raise HTTPException(status_code=500, detail="Failed to insert content.")
             new_id = inserted.id
+            changed_id = new_id
 
             updated_ids = current_ids + [new_id]
             message = f"'{request.content[:20]}...' წარმატებით დაემატა {db_column} და {ids_column}-ში."
@@ -351,7 +388,7 @@ async def handle_dynamic_content_action(
             # განახლება id-ით (content ან id უნდა იყოს მოწოდებული)
             update_id = None
             if hasattr(request, "id") and request.id is not None:
-                update_id = request.id
+                update_id = int(request.id)
             elif request.content is not None:
                 # მოძებნე id content-ით
                 # მოძებნე შესაბამისი ჩანაწერი
@@ -359,13 +396,13 @@ async def handle_dynamic_content_action(
                                 "proverb" if content_type == "proverb" else \
                                 "word" if content_type == "word" else \
                                 "toread" if content_type == "reading" else None
-                # row = db.execute(
+                # row = (await db.execute(
                 #     text(f"SELECT id FROM {db_column} WHERE {update_column} = :content"),
                 #     {"content": request.content.strip()}
-                # ).fetchone()
+                # )).fetchone()
                 # if not row:
                 #     raise HTTPException(status_code=404, detail="Content not found for update.")
-                update_id = request.id
+                update_id = int(request.id)
             else:
                 raise HTTPException(status_code=400, detail="id or content is required for updating.")
 
@@ -375,21 +412,28 @@ async def handle_dynamic_content_action(
                             "toread" if content_type == "reading" else None
             
             # Get old value before update
-            old_row = db.execute(
+            old_row = (await db.execute(
                 text(f"SELECT {update_column} FROM {db_column} WHERE id = :id"),
                 {"id": update_id}
-            ).fetchone()
+            )).fetchone()
             old_value = old_row[0] if old_row else None
             
             update_query = text(f"""
                 UPDATE {db_column}
                 SET 
                     {update_column} = :content,
+                    content_hash = :hash,
                     updated_by = :user_id
                 WHERE id = :id
             """)
-            db.execute(update_query, {"content": request.content.strip(), "user_id": current_user["id"], "id": update_id})
+            await db.execute(update_query, {
+                "content": request.content.strip(),
+                "hash": content_hash(request.content.strip()),
+                "user_id": current_user["id"],
+                "id": update_id
+            })
             updated_ids = current_ids
+            changed_id = update_id
             message = f"ელემენტი განახლდა {db_column} ცხრილში და {ids_column}-ში."
             
             # Audit log for UPDATE
@@ -410,17 +454,16 @@ async def handle_dynamic_content_action(
             # წაშლა id-ით (content ან id უნდა იყოს მოწოდებული)
             delete_id = None
             if hasattr(request, "id") and request.id is not None:
-                delete_id = request.id
+                delete_id = int(request.id)
             elif request.content is not None:
                 # მოძებნე id content-ით
                 delete_column = "sentence" if content_type == "sentence" else \
                                 "proverb" if content_type == "proverb" else \
                                 "word" if content_type == "word" else \
                                 "toread" if content_type == "reading" else None
-                row = db.execute(
-                    text(f"SELECT id FROM {db_column} WHERE {delete_column} = :content"),
-                    {"content": request.content.strip()}
-                ).fetchone()
+                row = await db.run_sync(
+                    find_by_content, db_column, delete_column, request.content.strip(), "id", list(current_ids)
+                )
                 if not row:
                     raise HTTPException(status_code=404, detail="Content not found for delete.")
                 delete_id = row.id
@@ -432,19 +475,20 @@ async def handle_dynamic_content_action(
                            "proverb" if content_type == "proverb" else \
                            "word" if content_type == "word" else \
                            "toread" if content_type == "reading" else None
-            old_row = db.execute(
+            old_row = (await db.execute(
                 text(f"SELECT {delete_column} FROM {db_column} WHERE id = :id"),
                 {"id": delete_id}
-            ).fetchone()
+            )).fetchone()
             old_value = old_row[0] if old_row else None
             
             # წაშალე შესაბამის ცხრილში
-            db.execute(
+            await db.execute(
                 text(f"DELETE FROM {db_column} WHERE id = :id"),
                 {"id": delete_id}
             )
             # ids-იდან ამოიღე ეს id
             updated_ids = [i for i in current_ids if i != delete_id]
+            changed_id = delete_id
             message = f"ელემენტი წაიშალა {db_column} ცხრილიდან და {ids_column}-დან."
             
             # Audit log for DELETE
@@ -464,7 +508,7 @@ async def handle_dynamic_content_action(
             raise HTTPException(status_code=400, detail=f"Invalid action: {action}")
 
         # 3. განაახლე ids array
-        db.execute(
+        await db.execute(
             text(f"""
                 UPDATE {table_name}
                 SET {ids_column} = :ids
@@ -472,16 +516,21 @@ async def handle_dynamic_content_action(
             """),
             {"ids": updated_ids, "position": request.position}
         )
+        await db.run_sync(record_changes, [
+            (db_column, changed_id, DELETE if action == "delete" else UPSERT),
+            (table_name, request.position, UPSERT)
+        ])
 
-        db.commit()
+        await db.commit()
+        dedaena_cache.invalidate()
         print(f"   ✅ წარმატება: {message}")
         return {"success": True, "message": message, "position": request.position, "letter": tour_letter}
 
     except HTTPException as e:
-        db.rollback()
+        await db.rollback()
         raise e
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"   ❌ Error in dynamic action: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
 
@@ -492,13 +541,13 @@ async def handle_dynamic_content_action(
 
 @router.get("/stories")
 async def get_stories(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_moderator_user)
 ):
     try:
-        result = db.execute(
+        result = (await db.execute(
             text("SELECT * FROM stories ORDER BY id DESC")
-        ).fetchall()
+        )).fetchall()
         stories = [dict(row._mapping) for row in result]
         return {"success": True, "count": len(stories), "data": stories}
     except Exception as e:
@@ -509,12 +558,12 @@ async def get_stories(
 @router.post("/stories")
 async def create_story(
     request: StoryCreateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_moderator_user)
 ):
     try:
         # 1. ისტორიის ჩასმა
-        result = db.execute(
+        result = (await db.execute(
             text("""
                 INSERT INTO stories (title, story, story_type, source, created_by, updated_by, is_playable)
                 VALUES (:title, :story, :story_type, :source, :user_id, :user_id, false)
@@ -527,25 +576,31 @@ async def create_story(
                 "source": request.source.strip() if request.source else None,
                 "user_id": current_user["id"],
             }
-        ).fetchone()
+        )).fetchone()
         story = dict(result._mapping)
 
         # 2. ტექსტის აბზაცებად დაშლა და sentences ცხრილში ჩასმა
         paragraphs = split_text_into_paragraphs(request.story.strip())
-        sentence_ids = insert_sentences_for_story(db, paragraphs, current_user["id"])
+        sentence_ids = await db.run_sync(insert_sentences_for_story, paragraphs, current_user["id"])
 
         # 3. sentences_ids განახლება stories ცხრილში
         if sentence_ids:
-            db.execute(
+            await db.execute(
                 text("UPDATE stories SET sentences_ids = :ids WHERE id = :id"),
                 {"ids": sentence_ids, "id": story["id"]}
             )
             story["sentences_ids"] = sentence_ids
 
         # 4. წინადადებების მინიჭება შესაბამის ტურებს gogebashvili ცხრილში
-        assign_sentences_to_tours(db, sentence_ids, paragraphs)
+        positions = await db.run_sync(assign_sentences_to_tours, sentence_ids, paragraphs)
 
-        db.commit()
+        await db.run_sync(record_changes, [
+            ("stories", story["id"], UPSERT),
+            *[("sentences", sid, UPSERT) for sid in sentence_ids],
+            *[(DEDAENA_TABLE, position, UPSERT) for position in positions]
+        ])
+        await db.commit()
+        dedaena_cache.invalidate()
 
         try:
             log_audit_event(
@@ -562,7 +617,7 @@ async def create_story(
         return {"success": True, "message": f"ისტორია წარმატებით შეიქმნა ({len(sentence_ids)} წინადადება)", "data": story}
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"   ❌ Error creating story: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
 
@@ -571,14 +626,14 @@ async def create_story(
 async def update_story(
     story_id: int,
     request: StoryUpdateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_moderator_user)
 ):
     try:
-        existing = db.execute(
+        existing = (await db.execute(
             text("SELECT * FROM stories WHERE id = :id"),
             {"id": story_id}
-        ).fetchone()
+        )).fetchone()
         if not existing:
             raise HTTPException(status_code=404, detail="ისტორია ვერ მოიძებნა")
 
@@ -597,31 +652,37 @@ async def update_story(
         if not fields_to_update:
             raise HTTPException(status_code=400, detail="განახლებისთვის ველები არ არის მითითებული")
 
+        changes = [("stories", story_id, UPSERT)]
         # თუ ტექსტი შეიცვალა, ძველი წინადადებები წაიშლება და ახლები ჩაემატება
         if request.story is not None:
             old_sentence_ids = old_data.get("sentences_ids") or []
-            remove_sentences_from_tours(db, old_sentence_ids)
-            delete_sentences_by_ids(db, old_sentence_ids)
+            positions = await db.run_sync(remove_sentences_from_tours, old_sentence_ids)
+            await db.run_sync(delete_sentences_by_ids, old_sentence_ids)
             new_paragraphs = split_text_into_paragraphs(request.story.strip())
-            new_sentence_ids = insert_sentences_for_story(db, new_paragraphs, current_user["id"])
+            new_sentence_ids = await db.run_sync(insert_sentences_for_story, new_paragraphs, current_user["id"])
             fields_to_update["sentences_ids"] = new_sentence_ids
-            assign_sentences_to_tours(db, new_sentence_ids, new_paragraphs)
+            positions += await db.run_sync(assign_sentences_to_tours, new_sentence_ids, new_paragraphs)
+            changes += [("sentences", sid, DELETE) for sid in old_sentence_ids]
+            changes += [("sentences", sid, UPSERT) for sid in new_sentence_ids]
+            changes += [(DEDAENA_TABLE, position, UPSERT) for position in set(positions)]
 
         fields_to_update["updated_by"] = current_user["id"]
 
         set_clause = ", ".join(f"{k} = :{k}" for k in fields_to_update)
         fields_to_update["id"] = story_id
 
-        db.execute(
+        await db.execute(
             text(f"UPDATE stories SET {set_clause}, updated_at = NOW() WHERE id = :id"),
             fields_to_update
         )
-        db.commit()
+        await db.run_sync(record_changes, changes)
+        await db.commit()
+        dedaena_cache.invalidate()
 
-        updated = db.execute(
+        updated = (await db.execute(
             text("SELECT * FROM stories WHERE id = :id"),
             {"id": story_id}
-        ).fetchone()
+        )).fetchone()
         story = dict(updated._mapping)
 
         try:
@@ -642,7 +703,7 @@ async def update_story(
     except HTTPException as e:
         raise e
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"   ❌ Error updating story: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
 
@@ -650,14 +711,14 @@ async def update_story(
 @router.delete("/stories/{story_id}")
 async def delete_story(
     story_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_moderator_user)
 ):
     try:
-        existing = db.execute(
+        existing = (await db.execute(
             text("SELECT * FROM stories WHERE id = :id"),
             {"id": story_id}
-        ).fetchone()
+        )).fetchone()
         if not existing:
             raise HTTPException(status_code=404, detail="ისტორია ვერ მოიძებნა")
 
@@ -665,14 +726,20 @@ async def delete_story(
 
         # ისტორიის წინადადებების წაშლა sentences ცხრილიდან და gogebashvili ტურებიდან
         old_sentence_ids = old_data.get("sentences_ids") or []
-        remove_sentences_from_tours(db, old_sentence_ids)
-        delete_sentences_by_ids(db, old_sentence_ids)
+        positions = await db.run_sync(remove_sentences_from_tours, old_sentence_ids)
+        await db.run_sync(delete_sentences_by_ids, old_sentence_ids)
 
-        db.execute(
+        await db.execute(
             text("DELETE FROM stories WHERE id = :id"),
             {"id": story_id}
         )
-        db.commit()
+        await db.run_sync(record_changes, [
+            ("stories", story_id, DELETE),
+            *[("sentences", sid, DELETE) for sid in old_sentence_ids],
+            *[(DEDAENA_TABLE, position, UPSERT) for position in positions]
+        ])
+        await db.commit()
+        dedaena_cache.invalidate()
 
         try:
             log_audit_event(
@@ -691,7 +758,7 @@ async def delete_story(
     except HTTPException as e:
         raise e
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"   ❌ Error deleting story: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
 
@@ -700,20 +767,20 @@ async def delete_story(
 async def toggle_story_playable(
     story_id: int,
     request: StoryTogglePlayableRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_moderator_user)
 ):
     try:
-        existing = db.execute(
+        existing = (await db.execute(
             text("SELECT id, is_playable, sentences_ids FROM stories WHERE id = :id"),
             {"id": story_id}
-        ).fetchone()
+        )).fetchone()
         if not existing:
             raise HTTPException(status_code=404, detail="ისტორია ვერ მოიძებნა")
 
         old_value = str(existing.is_playable) if existing.is_playable is not None else "None"
 
-        db.execute(
+        await db.execute(
             text("UPDATE stories SET is_playable = :is_playable, updated_by = :user_id, updated_at = NOW() WHERE id = :id"),
             {"is_playable": request.is_playable, "user_id": current_user["id"], "id": story_id}
         )
@@ -721,12 +788,17 @@ async def toggle_story_playable(
         # შესაბამისი წინადადებების is_playable-ც განახლდეს
         story_sentence_ids = existing.sentences_ids or []
         if story_sentence_ids:
-            db.execute(
+            await db.execute(
                 text("UPDATE sentences SET is_playable = :is_playable, updated_by = :user_id WHERE id = ANY(:ids)"),
                 {"is_playable": request.is_playable, "user_id": current_user["id"], "ids": story_sentence_ids}
             )
 
-        db.commit()
+        await db.run_sync(record_changes, [
+            ("stories", story_id, UPSERT),
+            *[("sentences", sid, UPSERT) for sid in story_sentence_ids]
+        ])
+        await db.commit()
+        dedaena_cache.invalidate()
 
         try:
             log_audit_event(
@@ -746,7 +818,7 @@ async def toggle_story_playable(
     except HTTPException as e:
         raise e
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"   ❌ Error toggling story playable: {str(e)}")
         raise HTTPException(status_code=500, detail=f"An internal server error occurred: {str(e)}")
 
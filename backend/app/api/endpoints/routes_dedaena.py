@@ -1,19 +1,37 @@
 """
 Dedaena Routes
 """
-from sqlalchemy import text, bindparam
+from sqlalchemy import text
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
-from app.api.dependencies import get_db, get_current_moderator_user, get_current_user
+from app.api.dependencies import get_async_db, get_current_moderator_user, get_current_user
 import json
+import logging
 from typing import List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from app.config import get_db_connection
-from app.schemas.progress import SaveProgressRequest
+from app.schemas.progress import SaveProgressRequest, UpdateProgressRequest
+from app.core.tour_content import load_tour_content
+from app.core.snapshot_cache import dedaena_cache, snapshot_response, SNAPSHOT_WARM_BROTLI_QUALITY
+from app.core.letter_index import get_letter_index
+from app.database import AsyncSessionLocal, new_async_session
+from app.core.content_changes import (
+    build_sync_payload, current_version, full_resync_payload, needs_full_resync, version_range
+)
+from app.core.rate_limit import rate_limit
+from app.core.progress import progress_coalescer, load_progress_sets, save_progress_sets
+from app.config import DEDAENA_TABLES
+import os
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# ✅ პროგრესის ლიმიტი მომხმარებელზე
+PROGRESS_RATE_LIMIT = int(os.getenv("PROGRESS_RATE_LIMIT", 60))  # მოთხოვნები წუთში
+progress_rate_limit = rate_limit("progress", PROGRESS_RATE_LIMIT, 60)
+
 
 class StaticInfo(BaseModel):
     position: int
@@ -29,192 +47,320 @@ async def dedaena_root():
     return {"message": "Dedaena API", "version": "1.0.0"}
 
 
-@router.post("/progress/save")
+@router.post("/progress/save", dependencies=[Depends(progress_rate_limit)])
 async def save_progress(
     data: SaveProgressRequest,
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """მომხმარებლის პროგრესის შენახვა (UPSERT)"""
-    conn = get_db_connection()
+    """მომხმარებლის პროგრესის შენახვა (UPSERT, PROGRESS_ENCODING ფორმატით)"""
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO user_progress (user_id, dedaena_table, found_word_ids, found_sentence_ids, found_proverb_ids, updated_at)
-                VALUES (%s, %s, %s, %s, %s, NOW())
-                ON CONFLICT (user_id, dedaena_table)
-                DO UPDATE SET
-                    found_word_ids = EXCLUDED.found_word_ids,
-                    found_sentence_ids = EXCLUDED.found_sentence_ids,
-                    found_proverb_ids = EXCLUDED.found_proverb_ids,
-                    updated_at = NOW()
-            """, (
-                current_user["id"],
-                data.dedaena_table,
-                data.found_word_ids,
-                data.found_sentence_ids,
-                data.found_proverb_ids,
-            ))
-            conn.commit()
+        await save_progress_sets(db, current_user["id"], data.dedaena_table, {
+            "word": data.found_word_ids,
+            "sentence": data.found_sentence_ids,
+            "proverb": data.found_proverb_ids,
+        })
+        await db.commit()
         return {"success": True, "message": "პროგრესი შენახულია"}
-    except Exception as e:
-        conn.rollback()
-        print(f"❌ პროგრესის შენახვის შეცდომა: {e}")
+    except Exception:
+        await db.rollback()
+        logger.exception(f"Progress save failed for user {current_user['id']}")
         raise HTTPException(status_code=500, detail="პროგრესის შენახვა ვერ მოხერხდა")
-    finally:
-        conn.close()
 
 
-@router.get("/progress/{table_name}")
+@router.post("/progress/update", dependencies=[Depends(progress_rate_limit)])
+async def update_progress(
+    data: UpdateProgressRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    პროგრესის ინკრემენტული განახლება (მხოლოდ ცვლილება, merge SQL-ში)
+
+    სწრაფად მიმდევრობითი განახლებები ერთ ჩაწერად ერთიანდება.
+    """
+    try:
+        counts = await progress_coalescer.submit(current_user["id"], data.dedaena_table, {
+            "word": (data.add_word_ids, data.remove_word_ids),
+            "sentence": (data.add_sentence_ids, data.remove_sentence_ids),
+            "proverb": (data.add_proverb_ids, data.remove_proverb_ids),
+        })
+        return {
+            "success": True,
+            "message": "პროგრესი შენახულია",
+            "found_word_count": counts["word"],
+            "found_sentence_count": counts["sentence"],
+            "found_proverb_count": counts["proverb"]
+        }
+    except Exception:
+        logger.exception(f"Progress update failed for user {current_user['id']}")
+        raise HTTPException(status_code=500, detail="პროგრესის შენახვა ვერ მოხერხდა")
+
+
+@router.get("/progress/{table_name}", dependencies=[Depends(progress_rate_limit)])
 async def load_progress(
     table_name: str,
+    db: AsyncSession = Depends(get_async_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """მომხმარებლის შენახული პროგრესის ჩატვირთვა"""
-    conn = get_db_connection()
+    """მომხმარებლის შენახული პროგრესის ჩატვირთვა (array ან bitmap ფორმატიდან)"""
     try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT found_word_ids, found_sentence_ids, found_proverb_ids, updated_at
-                FROM user_progress
-                WHERE user_id = %s AND dedaena_table = %s
-            """, (current_user["id"], table_name))
-            row = cur.fetchone()
-            if not row:
-                return {
-                    "success": True,
-                    "found_word_ids": [],
-                    "found_sentence_ids": [],
-                    "found_proverb_ids": [],
-                    "updated_at": None
-                }
+        sets, updated_at = await load_progress_sets(db, current_user["id"], table_name)
+        if sets is None:
             return {
                 "success": True,
-                "found_word_ids": row[0] or [],
-                "found_sentence_ids": row[1] or [],
-                "found_proverb_ids": row[2] or [],
-                "updated_at": row[3].isoformat() if row[3] else None
+                "found_word_ids": [],
+                "found_sentence_ids": [],
+                "found_proverb_ids": [],
+                "updated_at": None
             }
-    except Exception as e:
-        print(f"❌ პროგრესის ჩატვირთვის შეცდომა: {e}")
+        return {
+            "success": True,
+            "found_word_ids": sets["word"],
+            "found_sentence_ids": sets["sentence"],
+            "found_proverb_ids": sets["proverb"],
+            "updated_at": updated_at.isoformat() if updated_at else None
+        }
+    except Exception:
+        logger.exception(f"Progress load failed for user {current_user['id']}")
         raise HTTPException(status_code=500, detail="პროგრესის ჩატვირთვა ვერ მოხერხდა")
-    finally:
-        conn.close()
+
+
+def build_dedaena_payload(db: Session, table_name: str) -> dict:
+    """სრული წიგნის payload: ყველა ტური (მხოლოდ playable ელემენტებით) და ისტორიები"""
+    # version კონტენტამდე იკითხება - პარალელური ცვლილება შემდეგ sync-ში მოვა
+    version = current_version(db)
+
+    # ✅ ყველა ტური ერთიანი loader-ით (query-ების რაოდენობა მუდმივია)
+    dedaenaData = load_tour_content(db, table_name, playable_only=True)
+
+    # ყველა ისტორიის ამოღება
+    stories_result = db.execute(
+        text("SELECT id, title, story, story_type, source, sentences_ids, is_playable FROM stories ORDER BY id")
+    ).fetchall()
+    stories = [dict(row._mapping) for row in stories_result]
+
+    return {
+        "success": True,
+        "table_name": table_name,
+        "version": version,
+        "count": len(dedaenaData),
+        "data": dedaenaData,
+        "stories": stories
+    }
+
+
+async def warm_dedaena_cache(table_names: List[str]):
+    """
+    snapshot-ების და letter index-ის წინასწარ აგება (worker-ის startup-ზე)
+
+    შეცდომა არ აჩერებს worker-ს - snapshot პირველ request-ზე აიგება.
+    """
+    for table_name in table_names:
+        try:
+            async with AsyncSessionLocal() as db:
+                await dedaena_cache.get_or_build_async(
+                    table_name, lambda: db.run_sync(build_dedaena_payload, table_name),
+                    brotli_quality=SNAPSHOT_WARM_BROTLI_QUALITY
+                )
+                await db.run_sync(get_letter_index, table_name)
+            logger.info(f"Dedaena snapshot warmed: {table_name}")
+        except Exception:
+            logger.exception(f"Dedaena snapshot warmup failed for {table_name}")
+
+
+def check_table(table_name: str):
+    """table_name SQL-ში იდენტიფიკატორად ჩაისმება და ქეშის key-შიც შედის - მხოლოდ DEDAENA_TABLES"""
+    if table_name not in DEDAENA_TABLES:
+        raise HTTPException(status_code=400, detail="Invalid table")
+
+
+async def run_sync_in_session(fn, *args):
+    """sync loader ცალკე session-ში - snapshot-ის საერთო აგება request-ის session-ს არ იყენებს"""
+    async with new_async_session() as db:
+        return await db.run_sync(fn, *args)
 
 
 @router.get("/{table_name}")
 async def get_dedaena_data(
+    request: Request,
     table_name: str,
-    db: Session = Depends(get_db),
     # current_user: dict = Depends(get_current_moderator_user)
 ):
-    # ...existing code...
-    print(f"Fetching data for table: {table_name}")
-    try:
-        result = db.execute(
-            text(f"""
-                SELECT 
-                    id, 
-                    position, 
-                    letter, 
-                    words_ids, 
-                    sentences_ids, 
-                    proverbs_ids, 
-                    toreads_ids
-                FROM {table_name} 
-                ORDER BY position
-            """)
-        ).fetchall()
-        
-        dedaenaData = []
-        for r in result:
-            def fetch_items(table, column, ids):
-                if not ids:
-                    return []
-                if isinstance(ids, str):
-                    ids = [int(i) for i in ids.split(',') if i.strip().isdigit()]
-                if not isinstance(ids, list):
-                    ids = list(ids)
-                if not ids:
-                    return []
-                # ✅ გამოიყენეთ tuple(ids) და IN :ids
-                items = db.execute(
-                    text(f"SELECT * FROM {table} WHERE id IN :ids AND is_playable = true").bindparams(bindparam("ids", expanding=True)),
-                    {"ids": tuple(ids)}
-                ).fetchall()
-                return [dict(item._mapping) for item in items]
-
-            words = fetch_items("words", "word", r.words_ids)
-            sentences = fetch_items("sentences", "sentence", r.sentences_ids)
-            proverbs = fetch_items("proverbs", "proverb", r.proverbs_ids)
-            toreads = fetch_items("toreads", "toread", r.toreads_ids)
-
-            dedaenaData.append({
-                "id": r.id,
-                "position": r.position,
-                "letter": r.letter,
-                "words": words,
-                "sentences": sentences,
-                "proverbs": proverbs,
-                "toreads": toreads
-            })
-        # ყველა ისტორიის ამოღება
-        stories_result = db.execute(
-            text("SELECT id, title, story, story_type, source, sentences_ids, is_playable FROM stories ORDER BY id")
-        ).fetchall()
-        stories = [dict(row._mapping) for row in stories_result]
+    check_table(table_name)
+    # ✅ payload ქეშიდან; ბაზა იკითხება მხოლოდ მოდერატორის ცვლილების შემდეგ
+    snapshot = await dedaena_cache.get_or_build_async(
+        table_name, lambda: run_sync_in_session(build_dedaena_payload, table_name)
+    )
+    # ✅ წინასწარ შეკუმშული body / 304 If-None-Match-ზე
+    return snapshot_response(snapshot, request)
+
+
+@router.get("/{table_name}/sync")
+async def sync_dedaena_data(
+    request: Request,
+    table_name: str,
+    since: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Delta sync: since version-ის შემდეგ შეცვლილი ტურები და ისტორიები
+
+    კლიენტი ინახავს სრული payload-ის (ან წინა sync-ის) version-ს და
+    აგზავნის ?since=<version>. full_resync=True-ზე სრული წიგნი თავიდან.
+
+    ქეშირდება მხოლოდ დასაშვები since ([oldest - 1, current version]) - სხვა
+    მნიშვნელობებზე full_resync ბრუნდება ქეშის და delta-ს აგების გარეშე.
+    """
+    check_table(table_name)
+    oldest, latest = await db.run_sync(version_range)
+    if needs_full_resync(since, oldest, latest):
+        return full_resync_payload(table_name, since, latest)
+
+    snapshot = await dedaena_cache.get_or_build_async(
+        ("sync", table_name, since),
+        lambda: run_sync_in_session(build_sync_payload, table_name, since)
+    )
+    return snapshot_response(snapshot, request)
+
 
-        return {
-            "success": True,
-            "table_name": table_name,
-            "count": len(dedaenaData),
-            "data": dedaenaData,
-            "stories": stories
-        }
-    except Exception as e:
-        # ...error handling...
-        raise
 @router.get("/{table_name}/position/{position}")
-def get_position_data(table_name: str, position: int):
+async def get_position_data(
+    request: Request,
+    table_name: str,
+    position: int,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get position data"""
-    
-    # allowed_tables = ["gogebashvili_1", "gogebashvili_test1"]
-    # if table_name not in allowed_tables:
-    #     raise HTTPException(status_code=400, detail="Invalid table")
-    
+    check_table(table_name)
+    # ✅ ქეშირდება მხოლოდ არსებული position (letter index-ით, query-ის გარეშე)
+    letter_index = await db.run_sync(get_letter_index, table_name)
+    if not letter_index.has_position(position):
+        raise HTTPException(status_code=404, detail="Not found")
 
+    async def build():
+        async with new_async_session() as session:
+            return await build_position_payload(session, table_name, position)
 
-    print(f"table_name: {table_name}, position: {position}")
-    
-    conn = get_db_connection()
+    snapshot = await dedaena_cache.get_or_build_async(("position", table_name, position), build)
+    return snapshot_response(snapshot, request)
+
+
+MAX_BATCH_POSITIONS = 20
+
+
+def parse_positions(positions: str) -> List[int]:
+    """"3,4,5" -> [3, 4, 5] (დუბლიკატების გარეშე, მოთხოვნის რიგით)"""
     try:
-        with conn.cursor() as cur:
-            cur.execute(f"SELECT letter, word_count, sentence_count, has_proverbs, has_reading FROM {table_name} WHERE position <= %s ORDER BY position ASC;", (position,))
-            letters = [row[0] for row in cur.fetchall()]  # ასოების სიის შექმნა
-            
-            cur.execute(f"SELECT * FROM {table_name} WHERE position = %s;", (position,))
-            current_position_data = cur.fetchone()
-            print(f"row: {current_position_data}")
-
-            if not current_position_data:
-                raise HTTPException(status_code=404, detail="Not found")
-            
-            position_info = {
-                "id": current_position_data[0],                                    # უნიკალური ID
-                "position": current_position_data[1],                              # პოზიცია ანბანში
-                "letter": current_position_data[2],                                # ასო
-                "words": safe_json_parse(current_position_data[3]),                # სიტყვების სია (JSON -> list)
-                "sentences": safe_json_parse(current_position_data[4]),            # წინადადებების სია (JSON -> list)
-                "proverbs": safe_json_parse(current_position_data[5]),             # ანდაზების სია (JSON -> list)
-                "reading": current_position_data[6] if current_position_data[6] else "",  # კითხვის ტექსტი
-                "word_count": current_position_data[7] if current_position_data[7] else 0,  # სიტყვების რაოდენობა
-                "sentence_count": current_position_data[8] if current_position_data[8] else 0,  # წინადადებების რაოდენობა
-                "has_proverbs": current_position_data[9] if current_position_data[9] else False,  # ანდაზების არსებობა
-                "has_reading": current_position_data[10] if current_position_data[10] else False  # კითხვის მასალის არსებობა
-            }
+        parsed = list(dict.fromkeys(int(p) for p in positions.split(",") if p.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="positions must be comma-separated integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="positions is required")
+    if len(parsed) > MAX_BATCH_POSITIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_POSITIONS} positions per request")
+    return parsed
+
 
-            return {"position": position, "letters": letters, "table": table_name, "position_info": position_info}
-    finally:
-        conn.close()
+@router.get("/{table_name}/positions")
+async def get_positions_data(
+    request: Request,
+    table_name: str,
+    positions: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    რამდენიმე პოზიციის მონაცემები ერთ პასუხში (მეზობელი ტურების წინასწარ ჩატვირთვისთვის)
+
+    მაგ: /api/dedaena/gogebashvili_1/positions?positions=3,4,5
+
+    data position-ის ზრდადობითაა. DB-დან აგებული snapshot-ის key - არსებული
+    position-ების დალაგებული სია (მოთხოვნის რიგი ახალ snapshot-ს არ ქმნის);
+    missing - არარსებული position-ები. არარსებული position-ების შემცველ
+    მოთხოვნას საკუთარი (DB-ის გარეშე აგებული) snapshot აქვს, ამიტომ ყველა
+    პასუხს აქვს ETag, 304 და შეკუმშვა.
+    """
+    check_table(table_name)
+    requested = parse_positions(positions)
+    letter_index = await db.run_sync(get_letter_index, table_name)
+    existing = sorted(p for p in requested if letter_index.has_position(p))
+    missing = sorted(p for p in requested if not letter_index.has_position(p))
+
+    async def build():
+        async with new_async_session() as session:
+            payloads = await build_position_payloads(session, table_name, existing)
+        return {
+            "table": table_name,
+            "count": len(payloads),
+            "data": [payloads[p] for p in existing if p in payloads],
+            "missing": [p for p in existing if p not in payloads]
+        }
+
+    if not missing:
+        snapshot = await dedaena_cache.get_or_build_async(("positions", table_name, tuple(existing)), build)
+        return snapshot_response(snapshot, request)
+
+    async def build_with_missing():
+        payload = {"table": table_name, "count": 0, "data": [], "missing": []}
+        if existing:
+            existing_snapshot = await dedaena_cache.get_or_build_async(
+                ("positions", table_name, tuple(existing)), build
+            )
+            payload = existing_snapshot.payload
+        return {**payload, "missing": sorted(payload["missing"] + missing)}
+
+    snapshot = await dedaena_cache.get_or_build_async(
+        ("positions", table_name, tuple(existing), tuple(missing)), build_with_missing
+    )
+    return snapshot_response(snapshot, request)
+
+
+async def build_position_payload(db: AsyncSession, table_name: str, position: int) -> dict:
+    """ერთი პოზიციის მონაცემები და მანამდე ნასწავლი ასოების სია"""
+    payloads = await build_position_payloads(db, table_name, [position])
+    if position not in payloads:
+        raise HTTPException(status_code=404, detail="Not found")
+    return payloads[position]
+
+
+async def build_position_payloads(db: AsyncSession, table_name: str, positions: List[int]) -> dict:
+    """
+    {position: payload} - ყველა პოზიციის რიგი ერთი query-ით
+
+    ნასწავლი ასოების სია (position <= N) ქეშირებული letter index-ის slice-ია.
+    """
+    letter_index = await db.run_sync(get_letter_index, table_name)
+    result = await db.execute(
+        text(f"""
+            SELECT id, position, letter, words, sentences, proverbs, reading,
+                   word_count, sentence_count, has_proverbs, has_reading
+            FROM {table_name}
+            WHERE position = ANY(:positions)
+        """),
+        {"positions": positions}
+    )
+
+    payloads = {}
+    for row in result.fetchall():
+        position_info = {
+            "id": row.id,                                        # უნიკალური ID
+            "position": row.position,                            # პოზიცია ანბანში
+            "letter": row.letter,                                # ასო
+            "words": safe_json_parse(row.words),                 # სიტყვების სია (JSON -> list)
+            "sentences": safe_json_parse(row.sentences),         # წინადადებების სია (JSON -> list)
+            "proverbs": safe_json_parse(row.proverbs),           # ანდაზების სია (JSON -> list)
+            "reading": row.reading or "",                        # კითხვის ტექსტი
+            "word_count": row.word_count or 0,                   # სიტყვების რაოდენობა
+            "sentence_count": row.sentence_count or 0,           # წინადადებების რაოდენობა
+            "has_proverbs": row.has_proverbs or False,           # ანდაზების არსებობა
+            "has_reading": row.has_reading or False              # კითხვის მასალის არსებობა
+        }
+        payloads[row.position] = {
+            "position": row.position,
+            "letters": letter_index.letters_up_to(row.position),
+            "table": table_name,
+            "position_info": position_info
+        }
+    return payloads
 
 
 
@@ -1,10 +1,35 @@
 import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+from typing import List
 from dotenv import load_dotenv
 
-# ✅ .env ფაილის ჩატვირთვა
+# ✅ .env ფაილის ჩატვირთვა - ერთადერთი ადგილი; დანარჩენი მოდულები
+# პარამეტრებს app.config-ის იმპორტის შემდეგ კითხულობენ
 load_dotenv()
 
+# SQLAlchemy (sync და async engine-ები, app.database)
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# JWT (app.core.security)
+SECRET_KEY = os.getenv("SECRET_KEY")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
+
+# ✅ დედაენის ცხრილები, რომლებსაც საჯარო endpoint-ები ემსახურება - table_name
+# URL-იდან მოდის და SQL-ში იდენტიფიკატორად ჩაისმება, ამიტომ მხოლოდ ეს სია
+DEDAENA_TABLES = [
+    t.strip() for t in os.getenv(
+        "DEDAENA_TABLES", "gogebashvili_1,gogebashvili_1_test,gogebashvili_1_with_ids"
+    ).split(",") if t.strip()
+]
+
 # Database configuration (ყველა მნიშვნელობა .env-დან, default-ების გარეშე)
 DB_HOST = os.getenv("POSTGRES_HOST")
 DB_PORT = os.getenv("POSTGRES_PORT")
@@ -12,18 +37,306 @@ DB_NAME = os.getenv("POSTGRES_DB")
 DB_USER = os.getenv("POSTGRES_USER")
 DB_PASS = os.getenv("POSTGRES_PASSWORD")
 
+# ✅ Connection pool-ის პარამეტრები
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))  # წამი - თავისუფალი კავშირის ლოდინი
+DB_POOL_HEALTHCHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTHCHECK_INTERVAL", 30))  # წამი
+
+
+def validate_settings():
+    """
+    კონფიგურაციის შემოწმება აპლიკაციის startup-ზე (lifespan)
+
+    ყველა პრობლემა ერთად ბრუნდება, რომ deploy-ისას ერთი გაშვებით გამოჩნდეს.
+    """
+    errors: List[str] = []
+    if not DATABASE_URL:
+        errors.append("DATABASE_URL must be set")
+    if not SECRET_KEY or len(SECRET_KEY) < 32:
+        errors.append("SECRET_KEY must be set and be at least 32 characters long")
+    if not (ACCESS_TOKEN_EXPIRE_MINUTES or "").isdigit() or int(ACCESS_TOKEN_EXPIRE_MINUTES) <= 0:
+        errors.append("ACCESS_TOKEN_EXPIRE_MINUTES must be a positive integer")
+    invalid_tables = [t for t in DEDAENA_TABLES if not re.fullmatch(r"[a-z_][a-z0-9_]*", t)]
+    if invalid_tables:
+        errors.append(f"DEDAENA_TABLES contains invalid table names: {', '.join(invalid_tables)}")
+    if DB_POOL_MIN_SIZE > DB_POOL_MAX_SIZE:
+        errors.append("DB_POOL_MIN_SIZE must not exceed DB_POOL_MAX_SIZE")
+    if errors:
+        raise RuntimeError("Invalid configuration:\n  - " + "\n  - ".join(errors))
+
+
+class PoolTimeoutError(psycopg2.pool.PoolError):
+    """pool ამოწურულია და DB_POOL_TIMEOUT-ის განმავლობაში კავშირი არ გათავისუფლდა"""
+
+
+class PooledConnection:
+    """
+    psycopg2 connection-ის proxy
+
+    close() კავშირს არ ხურავს - აბრუნებს pool-ში, ამიტომ არსებული კოდი
+    (conn = get_db_connection() ... finally: conn.close()) უცვლელად მუშაობს.
+
+    `with conn:` - როგორც psycopg2-ში: წარმატებისას commit, შეცდომისას
+    rollback; კავშირი pool-ში არ ბრუნდება (იხ. pooled_connection()).
+    """
+
+    def __init__(self, pool: "ConnectionPool", conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+    def __enter__(self):
+        if self._conn is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe psycopg2 connection pool
+
+    - checkout-ზე: დახურული კავშირი იცვლება, დიდხანს უმოქმედო კავშირი
+      მოწმდება SELECT 1-ით, დაუსრულებელი ტრანზაქცია rollback-დება
+    - pool-ის ამოწურვისას ლოდინი timeout-მდე, შემდეგ PoolTimeoutError
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float,
+                 healthcheck_interval: float, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.healthcheck_interval = healthcheck_interval
+        self._connect_kwargs = connect_kwargs
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, last_used)
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "created": 0,
+            "discarded": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0,
+        }
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    def _connect(self):
+        conn = psycopg2.connect(**self._connect_kwargs)
+        self._stats["created"] += 1
+        return conn
+
+    def _discard(self, conn):
+        self._stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, last_used: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.healthcheck_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _reset(conn):
+        """კავშირის სუფთა მდგომარეობაში დაბრუნება"""
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+        if conn.autocommit:
+            conn.autocommit = False
+
+    def getconn(self) -> PooledConnection:
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            conn = None
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"connection pool exhausted (max {self.maxconn}) after {self.timeout}s"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                if self._idle:
+                    conn, last_used = self._idle.pop()  # LIFO - "თბილი" კავშირი
+                else:
+                    self._size += 1  # ადგილის დაჯავშნა ახალი კავშირისთვის
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(conn, last_used):
+                self._discard(conn)
+                with self._cond:
+                    self._size -= 1
+                continue
+
+            try:
+                self._reset(conn)
+            except psycopg2.Error:
+                self._discard(conn)
+                with self._cond:
+                    self._size -= 1
+                continue
+
+            with self._cond:
+                self._stats["checkouts"] += 1
+                self._stats["wait_time_total"] += time.monotonic() - started
+            return PooledConnection(self, conn)
+
+    def putconn(self, conn):
+        """კავშირის დაბრუნება pool-ში (ან გაუქმება, თუ გამოუსადეგარია)"""
+        keep = not conn.closed and not self._closed
+        if keep:
+            try:
+                self._reset(conn)
+            except psycopg2.Error:
+                keep = False
+        if not keep:
+            self._discard(conn)
+        with self._cond:
+            if keep:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._size -= 1
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._discard(conn)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "waiting": self._waiting,
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                **self._stats,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """პროცესის connection pool (იქმნება პირველივე გამოყენებისას)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # ✅ query-ების აღრიცხვა (app.core.instrumentation); import აქ -
+                # app.core იმპორტავს app.config-ს
+                from app.core.instrumentation import InstrumentedCursor
+                _pool = ConnectionPool(
+                    DB_POOL_MIN_SIZE,
+                    DB_POOL_MAX_SIZE,
+                    DB_POOL_TIMEOUT,
+                    DB_POOL_HEALTHCHECK_INTERVAL,
+                    host=DB_HOST,
+                    port=DB_PORT,
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASS,
+                    cursor_factory=InstrumentedCursor
+                )
+    return _pool
+
+
+def close_pool():
+    """pool-ის დახურვა (shutdown-ზე)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+def reset_pool_after_fork():
+    """
+    fork-ის შემდეგ (შვილ პროცესში): მშობლის pool-ის დავიწყება
+
+    კავშირები არ იხურება - socket-ები მშობელს ეკუთვნის; შვილი პირველივე
+    გამოყენებისას საკუთარ pool-ს შექმნის.
+    """
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+def get_pool_stats() -> dict:
+    return _pool.stats() if _pool is not None else {}
+
 
 def get_db_connection():
-    """Get a database connection"""
+    """Get a pooled database connection (conn.close() აბრუნებს მას pool-ში)"""
     try:
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASS
-        )
-        return conn
+        return get_pool().getconn()
     except psycopg2.Error as e:
         print(f"❌ Database connection error: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+@contextmanager
+def pooled_connection():
+    """
+    კავშირი ბლოკის განმავლობაში: წარმატებისას commit, შეცდომისას rollback,
+    ბოლოს pool-ში დაბრუნება
+
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(...)
+    """
+    conn = get_db_connection()
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
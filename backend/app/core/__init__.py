@@ -1,13 +1,21 @@
 from .security import (
     get_password_hash,
     verify_password,
+    get_password_hash_async,
+    verify_password_async,
+    PasswordHashingBusy,
     create_access_token,
-    decode_access_token
+    decode_access_token,
+    invalidate_user_tokens
 )
 
 __all__ = [
     "get_password_hash",
     "verify_password",
+    "get_password_hash_async",
+    "verify_password_async",
+    "PasswordHashingBusy",
     "create_access_token",
-    "decode_access_token"
+    "decode_access_token",
+    "invalidate_user_tokens"
 ]
\ No newline at end of file
@@ -1,13 +1,208 @@
 """
 Audit Logging Utility
+
+log_audit_event მოვლენას არ წერს პირდაპირ ბაზაში - აგდებს შეზღუდულ
+in-memory რიგში, რომელსაც ფონური writer thread ცლის და ერთი multi-row
+INSERT-ით წერს (AUDIT_BATCH_SIZE ჩანაწერი ან AUDIT_FLUSH_INTERVAL წამი).
+
+იმავე ტრანზაქციაში ახლდება audit_stats_hourly rollup (საათობრივი
+მრიცხველები action/table_name-ის მიხედვით), რომელსაც stats endpoint კითხულობს.
 """
 
+import atexit
 import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
 from typing import Optional
+from psycopg2.extras import execute_values
 from app.config import get_db_connection
 
 logger = logging.getLogger("audit")
 
+# ✅ Audit pipeline-ის პარამეტრები
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 200))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))  # წამი
+AUDIT_WRITE_ATTEMPTS = int(os.getenv("AUDIT_WRITE_ATTEMPTS", 3))
+
+
+class AuditWriter:
+    """
+    ფონური audit writer
+
+    - submit() არასდროს ბლოკავს request-ს: სავსე რიგისას მოვლენა იკარგება
+      და dropped მრიცხველი იზრდება
+    - ჩაწერის შეცდომისას (მაგ. deadlock, კავშირის გაწყვეტა) batch თავიდან
+      იწერება AUDIT_WRITE_ATTEMPTS-ჯერ; ამის შემდეგ მოვლენები ითვლება
+      failed-ად და სრულად იწერება ERROR ლოგში (ხელით აღდგენისთვის)
+    - stop() ცლის რიგს და წერს დარჩენილ მოვლენებს (shutdown-ზე)
+    """
+
+    def __init__(self, queue_size: int, batch_size: int, flush_interval: float):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self.write_attempts = AUDIT_WRITE_ATTEMPTS
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "retries": 0, "batches": 0}
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            # fork-ის შემდეგ მშობლის thread შვილ პროცესში აღარ არსებობს
+            if self._pid != os.getpid():
+                self._reset()
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, event: tuple) -> bool:
+        if self._thread is None or self._pid != os.getpid():
+            self.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            logger.warning("Audit queue is full, event dropped")
+            return False
+        with self._lock:
+            self._stats["enqueued"] += 1
+        return True
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            # batch-ის შევსება AUDIT_BATCH_SIZE-მდე ან flush_interval-ის ამოწურვამდე
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0 and not self._stop.is_set():
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch: list):
+        for attempt in range(1, self.write_attempts + 1):
+            try:
+                self._write_once(batch)
+            except Exception as e:
+                if attempt == self.write_attempts:
+                    self._record_failure(batch, e)
+                    return
+                with self._lock:
+                    self._stats["retries"] += 1
+                logger.warning(f"Audit batch write failed (attempt {attempt}/{self.write_attempts}): {e}")
+                time.sleep(min(0.5 * 2 ** (attempt - 1), 5.0))
+            else:
+                with self._lock:
+                    self._stats["written"] += len(batch)
+                    self._stats["batches"] += 1
+                return
+
+    def _write_once(self, batch: list):
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO audit_logs
+                    (user_id, username, action, table_name, record_id, old_value, new_value, ip_address)
+                    VALUES %s
+                """, batch, page_size=self.batch_size)
+                update_audit_rollups(cur, batch)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _record_failure(self, batch: list, error: Exception):
+        with self._lock:
+            self._stats["failed"] += len(batch)
+        logger.error(f"Failed to write {len(batch)} audit events after {self.write_attempts} attempts: {error}")
+        for event in batch:
+            logger.error(f"Lost audit event: {event!r}")
+
+    def stop(self, timeout: float = 10.0):
+        """რიგის დაცლა და writer-ის გაჩერება"""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.error(f"Audit writer did not finish in {timeout}s, {self._queue.qsize()} events pending")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": self._queue.qsize(), **self._stats}
+
+
+def update_audit_rollups(cur, batch: list):
+    """
+    audit_stats_hourly მრიცხველების გაზრდა batch-ის მოვლენებით
+
+    bucket = date_trunc('hour', NOW()) - იგივე NOW(), რასაც audit_logs.timestamp
+    იღებს default-ად იმავე ტრანზაქციაში. რიგები (action, table_name)-ით
+    დალაგებულია - პარალელური writer-ები row lock-ებს ერთი რიგით იღებენ
+    და ON CONFLICT DO UPDATE deadlock-ში არ ვარდება.
+    """
+    counts = Counter((event[2], event[3]) for event in batch)  # (action, table_name)
+    execute_values(cur, """
+        INSERT INTO audit_stats_hourly (bucket, action, table_name, count)
+        VALUES %s
+        ON CONFLICT (bucket, action, table_name)
+        DO UPDATE SET count = audit_stats_hourly.count + EXCLUDED.count
+    """, [(action, table_name, n) for (action, table_name), n in sorted(counts.items())],
+        template="(date_trunc('hour', NOW()), %s, %s, %s)")
+
+
+def rebuild_audit_rollups(conn) -> int:
+    """
+    audit_stats_hourly-ის თავიდან აგება audit_logs-დან (backfill)
+
+    TRUNCATE ცხრილს ბლოკავს commit-მდე, ამიტომ პარალელური writer-ები
+    ელოდებიან და მათი მრიცხველები rebuild-ის შემდეგ ემატება.
+
+    Returns:
+        rollup-ის რიგების რაოდენობა
+    """
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE audit_stats_hourly;")
+        cur.execute("""
+            INSERT INTO audit_stats_hourly (bucket, action, table_name, count)
+            SELECT date_trunc('hour', timestamp), action, table_name, COUNT(*)
+            FROM audit_logs
+            GROUP BY 1, 2, 3;
+        """)
+        rows = cur.rowcount
+    conn.commit()
+    return rows
+
+
+audit_writer = AuditWriter(AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL)
+atexit.register(audit_writer.stop)
+
 
 def log_audit_event(
     user_id: int,
@@ -20,8 +215,8 @@ def log_audit_event(
     ip_address: Optional[str] = None
 ):
     """
-    Log audit event to database
-    
+    Log audit event (asynchronously, via the background audit writer)
+
     Args:
         user_id: ID of user performing action
         username: Username of user
@@ -32,18 +227,5 @@ def log_audit_event(
         new_value: New value (for creates/updates)
         ip_address: IP address of request
     """
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO audit_logs 
-                (user_id, username, action, table_name, record_id, old_value, new_value, ip_address)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (user_id, username, action, table_name, record_id, old_value, new_value, ip_address))
-            conn.commit()
-            logger.info(f"Audit: {username} performed {action} on {table_name} (record_id: {record_id})")
-    except Exception as e:
-        logger.error(f"Failed to log audit event: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+    if audit_writer.submit((user_id, username, action, table_name, record_id, old_value, new_value, ip_address)):
+        logger.info(f"Audit: {username} performed {action} on {table_name} (record_id: {record_id})")
@@ -0,0 +1,164 @@
+"""
+Content Changes - კონტენტის ვერსია და delta sync
+
+მოდერატორის ყოველი ჩაწერა იმავე ტრანზაქციაში ამატებს content_changes-ში
+რიგებს (source, record_id, op). BIGSERIAL version არის წიგნის კონტენტის
+ვერსია: კლიენტი ინახავს ბოლოს მიღებულ version-ს და sync endpoint-ს
+სთხოვს მხოლოდ მის შემდეგ შეცვლილ ტურებს და ისტორიებს.
+
+ჩაწერამდე აიღება transaction-level advisory lock, ამიტომ version-ები
+commit-ის რიგით ენიჭება - კლიენტი, რომელმაც version N ნახა, N-ზე ნაკლებ
+ახალ ცვლილებას ვეღარ გამოტოვებს.
+
+sync helper-ები sync Session-ზეა (AsyncSession-იდან run_sync-ით).
+"""
+
+import os
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import text
+from app.core.tour_content import CONTENT_COLUMNS, load_tour_content
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# pg_advisory_xact_lock-ის გასაღები content_changes-ის ჩაწერებისთვის
+CONTENT_CHANGES_LOCK = 0x64656461  # "deda"
+
+# since-ის მაქსიმალური ჩამორჩენა version-ებში; უფრო ძველზე full_resync
+# (დიდი delta სრულ წიგნზე იაფი არ არის და ქეშის key-ებიც შეზღუდულია)
+SYNC_MAX_LAG = int(os.getenv("SYNC_MAX_LAG", 1000))
+
+
+def record_changes(db, changes: Iterable[Tuple[str, int, str]]):
+    """
+    ცვლილებების ჩაწერა ერთი INSERT-ით (commit-ს აკეთებს გამომძახებელი)
+
+    Args:
+        changes: (source, record_id, op) - op არის UPSERT ან DELETE
+    """
+    changes = [(source, int(record_id), op) for source, record_id, op in changes if record_id is not None]
+    if not changes:
+        return
+    sources, record_ids, ops = zip(*changes)
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CONTENT_CHANGES_LOCK})
+    db.execute(
+        text("""
+            INSERT INTO content_changes (source, record_id, op)
+            SELECT c.source, c.record_id, c.op
+            FROM unnest(CAST(:sources AS text[]), CAST(:record_ids AS int[]), CAST(:ops AS text[]))
+                 WITH ORDINALITY AS c(source, record_id, op, ord)
+            ORDER BY c.ord
+        """),
+        {"sources": list(sources), "record_ids": list(record_ids), "ops": list(ops)}
+    )
+
+
+def current_version(db) -> int:
+    """კონტენტის მიმდინარე version (0 - ცვლილება ჯერ არ ყოფილა)"""
+    return db.execute(text("SELECT COALESCE(MAX(version), 0) FROM content_changes")).scalar()
+
+
+def version_range(db) -> Tuple[int, int]:
+    """(ყველაზე ძველი შენახული version, მიმდინარე version); ცარიელ ლოგზე (0, 0)"""
+    row = db.execute(
+        text("SELECT COALESCE(MIN(version), 0), COALESCE(MAX(version), 0) FROM content_changes")
+    ).fetchone()
+    return row[0], row[1]
+
+
+def needs_full_resync(since: int, oldest: int, latest: int) -> bool:
+    """
+    since-იდან delta შეუძლებელია: since=0, მომავალი version, ან since-ის
+    შემდეგი ცვლილებები ლოგიდან უკვე წაშლილია (since < oldest - 1), ან
+    since SYNC_MAX_LAG-ზე მეტად ჩამორჩება
+    """
+    return since <= 0 or since > latest or since < oldest - 1 or latest - since > SYNC_MAX_LAG
+
+
+def changes_since(db, since: int) -> Tuple[int, Dict[str, Dict[int, str]]]:
+    """
+    since-ის შემდეგ შეცვლილი ჩანაწერები
+
+    Returns:
+        (version, {source: {record_id: ბოლო op}})
+    """
+    rows = db.execute(
+        text("""
+            SELECT version, source, record_id, op
+            FROM content_changes
+            WHERE version > :since
+            ORDER BY version
+        """),
+        {"since": since}
+    ).fetchall()
+    version = rows[-1].version if rows else since
+    changed: Dict[str, Dict[int, str]] = {}
+    for row in rows:
+        changed.setdefault(row.source, {})[row.record_id] = row.op
+    return version, changed
+
+
+def full_resync_payload(table_name: str, since: int, latest: int) -> dict:
+    return {"success": True, "table_name": table_name, "since": since,
+            "version": latest, "full_resync": True}
+
+
+def build_sync_payload(db, table_name: str, since: int) -> dict:
+    """
+    delta sync payload: since-ის შემდეგ შეცვლილი ტურები (სრული payload-ის
+    ფორმატით, მხოლოდ playable ელემენტებით) და ისტორიები
+
+    ტური ითვლება შეცვლილად, თუ თვითონ შეიცვალა ან შეიცავს შეცვლილ
+    ელემენტს. full_resync=True ნიშნავს, რომ კლიენტმა სრული წიგნი
+    თავიდან უნდა ჩამოტვირთოს (since=0, უცნობი version ან ლოგში აღარ არსებული ისტორია).
+    """
+    oldest, latest = version_range(db)
+    if needs_full_resync(since, oldest, latest):
+        return full_resync_payload(table_name, since, latest)
+
+    version, changed = changes_since(db, since)
+
+    # 1. შეცვლილი ელემენტების შემცველი ტურები
+    positions = set(changed.get(table_name, {}))
+    overlap_sql = []
+    params = {}
+    for column, key in CONTENT_COLUMNS:
+        if changed.get(key):
+            overlap_sql.append(f"{column} && CAST(:{key} AS int[])")
+            params[key] = list(changed[key])
+    if overlap_sql:
+        rows = db.execute(
+            text(f"SELECT position FROM {table_name} WHERE {' OR '.join(overlap_sql)}"),
+            params
+        ).fetchall()
+        positions.update(row.position for row in rows)
+
+    tours = load_tour_content(db, table_name, playable_only=True, positions=sorted(positions)) if positions else []
+    found = {tour["position"] for tour in tours}
+
+    # 2. ისტორიები
+    story_changes = changed.get("stories", {})
+    story_ids = [i for i, op in story_changes.items() if op == UPSERT]
+    stories: List[dict] = []
+    if story_ids:
+        rows = db.execute(
+            text("""
+                SELECT id, title, story, story_type, source, sentences_ids, is_playable
+                FROM stories WHERE id = ANY(:ids) ORDER BY id
+            """),
+            {"ids": story_ids}
+        ).fetchall()
+        stories = [dict(row._mapping) for row in rows]
+    found_stories = {story["id"] for story in stories}
+
+    return {
+        "success": True,
+        "table_name": table_name,
+        "since": since,
+        "version": version,
+        "full_resync": False,
+        "tours": tours,
+        "deleted_tours": sorted(positions - found),
+        "stories": stories,
+        "deleted_stories": sorted(i for i in story_changes if i not in found_stories)
+    }
@@ -0,0 +1,69 @@
+"""
+Content Hash - შიგთავსის ცხრილების ინდექსირებული ძებნა ტექსტით
+
+words, sentences, proverbs და toreads ინახავს content_hash-ს (migration
+005): ნორმალიზებული ტექსტის (NFC, whitespace-ის გაერთიანება, trim) md5
+bytea-დ. content_hash-ზე btree ინდექსია, ამიტომ ტექსტით ძებნა
+(toggle_playable, delete content-ით, დუბლიკატის შემოწმება) ინდექსს
+იყენებს და არა seq scan-ს თავისუფალ ტექსტურ სვეტზე.
+
+content_hash ყოველ INSERT/UPDATE-ზე აპლიკაციაში ითვლება (content_hash()).
+არსებული რიგები: python -m scripts.backfill_content_hash
+
+sync helper-ები sync Session-ზეა (AsyncSession-იდან run_sync-ით).
+"""
+
+import hashlib
+import unicodedata
+from typing import List, Optional
+from sqlalchemy import text
+
+# ✅ შიგთავსის ცხრილი -> ტექსტის სვეტი
+CONTENT_TABLES = {
+    "words": "word",
+    "sentences": "sentence",
+    "proverbs": "proverb",
+    "toreads": "toread",
+}
+
+
+def normalize_content(content: str) -> str:
+    """NFC, ყველა whitespace-ის მიმდევრობა -> ერთი space, trim"""
+    return " ".join(unicodedata.normalize("NFC", content).split())
+
+
+def content_hash(content: Optional[str]) -> Optional[bytes]:
+    """ნორმალიზებული ტექსტის md5 (16 ბაიტი) ან None"""
+    if content is None:
+        return None
+    return hashlib.md5(normalize_content(content).encode("utf-8"), usedforsecurity=False).digest()
+
+
+def find_by_content(db, table: str, column: str, content: str, columns: str = "id",
+                    ids: Optional[List[int]] = None):
+    """
+    ჩანაწერი ტექსტით: content_hash-ის ინდექსით, ზუსტი დამთხვევის უპირატესობით
+
+    content_hash-ის გარეშე რიგები (backfill-მდე) მოიძებნება ზუსტი ტოლობით
+    partial ინდექსიდან (WHERE content_hash IS NULL) - backfill-ის შემდეგ ცარიელია.
+
+    Args:
+        ids: მხოლოდ ამ ID-ებს შორის (მაგ. ტურის *_ids)
+    """
+    ids_sql = " AND id = ANY(:ids)" if ids is not None else ""
+    params = {"hash": content_hash(content), "content": content, "ids": ids}
+    row = db.execute(
+        text(f"""
+            SELECT {columns} FROM {table}
+            WHERE content_hash = :hash{ids_sql}
+            ORDER BY ({column} = :content) DESC, id
+            LIMIT 1
+        """),
+        params
+    ).fetchone()
+    if row is None:
+        row = db.execute(
+            text(f"SELECT {columns} FROM {table} WHERE content_hash IS NULL AND {column} = :content{ids_sql} LIMIT 1"),
+            params
+        ).fetchone()
+    return row
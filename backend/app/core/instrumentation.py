@@ -0,0 +1,220 @@
+"""
+SQL Instrumentation - query-ების აღრიცხვა request-ის (ან კოდის ბლოკის) დონეზე
+
+ორი hook, ერთი აღრიცხვა (record_query):
+  - SQLAlchemy: before/after_cursor_execute event-ები ყველა Engine-ზე
+    (app.database-ის sync და asyncpg engine-ები, run_sync-ის ჩათვლით)
+  - psycopg2: InstrumentedCursor - app.config-ის pool-ის კავშირების
+    cursor_factory (get_db_connection())
+
+აქტიური QueryRecorder-ები contextvar-შია: track_queries() ბლოკში (და
+MetricsMiddleware-ის request-ში) შესრულებული ყველა statement ითვლება -
+რაოდენობა, დრო და ნორმალიზებული SQL (literal-ები და პარამეტრები -> ?),
+რომ N+1 ერთნაირი statement-ების განმეორებად გამოჩნდეს.
+
+SQL_DEBUG_HEADERS=true-ისას პასუხს ემატება X-DB-Query-Count,
+X-DB-Query-Time-Ms და X-DB-Top-Query (ყველაზე ხშირი statement).
+
+ტესტებში:
+    with query_budget(3):
+        client.get("/api/dedaena/gogebashvili_1_with_ids")
+"""
+
+import contextvars
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+import psycopg2.extensions
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_DEBUG_HEADERS = os.getenv("SQL_DEBUG_HEADERS", "false").lower() == "true"
+
+MAX_DISTINCT_STATEMENTS = 200  # recorder-ზე (დანარჩენი ერთიანდება "<other>"-ში)
+MAX_STATEMENT_LENGTH = 500
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """literal-ები და bind პარამეტრები -> ?, IN სიები -> (?), ზედმეტი space-ების გარეშე"""
+    statement = _STRING.sub("?", statement)
+    statement = _PARAM.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _LIST.sub("(?)", statement)
+    return _SPACE.sub(" ", statement).strip()[:MAX_STATEMENT_LENGTH]
+
+
+class QueryRecorder:
+    """statement-ების რაოდენობა, დრო და ნორმალიზებული SQL"""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # run_sync/threadpool - სხვა thread-იდან ჩაწერა
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, List] = {}  # normalized -> [count, seconds]
+
+    def add(self, statement: str, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            key = statement if (
+                statement in self.statements or len(self.statements) < MAX_DISTINCT_STATEMENTS
+            ) else "<other>"
+            entry = self.statements.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def top(self, n: int = 5) -> List[Tuple[str, int, float]]:
+        """ყველაზე ხშირი statement-ები: (sql, count, seconds)"""
+        with self._lock:
+            items = sorted(self.statements.items(), key=lambda item: (-item[1][0], -item[1][1]))
+            return [(sql, count, seconds) for sql, (count, seconds) in items[:n]]
+
+    def summary(self, n: int = 5) -> str:
+        lines = [f"{self.count} queries, {self.seconds * 1000:.1f} ms"]
+        lines += [f"  {count}x {seconds * 1000:.1f} ms  {sql}" for sql, count, seconds in self.top(n)]
+        return "\n".join(lines)
+
+
+_recorders: contextvars.ContextVar[Tuple[QueryRecorder, ...]] = contextvars.ContextVar("query_recorders", default=())
+_query_observers: List[Callable[[str, str, float], None]] = []
+_request_observers: List[Callable[[str, str, QueryRecorder], None]] = []
+_observers_lock = threading.Lock()
+
+
+def add_query_observer(observer: Callable[[str, str, float], None]):
+    """observer(source, normalized_sql, seconds) - ყოველ statement-ზე (მაგ. metrics)"""
+    _query_observers.append(observer)
+
+
+def record_query(source: str, statement, seconds: float):
+    """ერთი statement-ის აღრიცხვა ყველა აქტიურ recorder-ში და observer-ში"""
+    normalized = normalize_sql(statement if isinstance(statement, str) else str(statement))
+    for recorder in _recorders.get():
+        recorder.add(normalized, seconds)
+    for observer in _query_observers:
+        observer(source, normalized, seconds)
+
+
+@contextmanager
+def track_queries():
+    """ბლოკში შესრულებული query-ების აღრიცხვა (ჩადგმული ბლოკები გარე recorder-საც ავსებენ)"""
+    recorder = QueryRecorder()
+    token = _recorders.set(_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _recorders.reset(token)
+
+
+def notify_request(method: str, route: str, recorder: QueryRecorder):
+    """request-ის დასრულება (MetricsMiddleware) - query_budget()-ისთვის"""
+    with _observers_lock:
+        observers = list(_request_observers)
+    for observer in observers:
+        observer(method, route, recorder)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """
+    ტესტის helper: ბლოკში შესრულებულ კოდს და ბლოკის განმავლობაში
+    დასრულებულ თითოეულ HTTP request-ს (TestClient სხვა thread-შია, ამიტომ
+    request-ები middleware-იდან მოდის) არ უნდა ჰქონდეს max_queries-ზე მეტი
+    statement. გადაჭარბებისას QueryBudgetExceeded ყველაზე ხშირი statement-ებით.
+    """
+    requests: List[Tuple[str, str, QueryRecorder]] = []
+
+    def observe(method: str, route: str, recorder: QueryRecorder):
+        requests.append((method, route, recorder))
+
+    with _observers_lock:
+        _request_observers.append(observe)
+    try:
+        with track_queries() as recorder:
+            yield recorder
+    finally:
+        with _observers_lock:
+            _request_observers.remove(observe)
+
+    failures = [f"block: {recorder.summary()}"] if recorder.count > max_queries else []
+    failures += [
+        f"{method} {route}: {request_recorder.summary()}"
+        for method, route, request_recorder in requests
+        if request_recorder.count > max_queries
+    ]
+    if failures:
+        raise QueryBudgetExceeded(f"query budget of {max_queries} exceeded\n" + "\n".join(failures))
+
+
+def debug_headers(recorder: QueryRecorder) -> List[Tuple[bytes, bytes]]:
+    """SQL_DEBUG_HEADERS-ის header-ები (ASGI ფორმატი)"""
+    headers = [
+        (b"x-db-query-count", str(recorder.count).encode()),
+        (b"x-db-query-time-ms", f"{recorder.seconds * 1000:.2f}".encode()),
+    ]
+    top = recorder.top(1)
+    if top:
+        sql, count, _ = top[0]
+        headers.append((b"x-db-top-query", f"{count}x {sql[:200]}".encode("latin-1", "replace")))
+    return headers
+
+
+# ✅ SQLAlchemy hook
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if starts:
+        record_query("sqlalchemy", statement, time.perf_counter() - starts.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    starts = conn.info.get("query_start") if conn is not None else None
+    if starts:
+        record_query("sqlalchemy", exception_context.statement or "", time.perf_counter() - starts.pop())
+
+
+# ✅ psycopg2 hook
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """psycopg2 cursor, რომელიც execute/executemany-ს აღრიცხავს"""
+
+    def _statement(self, query) -> str:
+        if isinstance(query, bytes):
+            return query.decode("utf-8", "replace")
+        if not isinstance(query, str) and hasattr(query, "as_string"):
+            return query.as_string(self)  # psycopg2.sql.Composed
+        return str(query)
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            record_query("psycopg2", self._statement(query), time.perf_counter() - started)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            record_query("psycopg2", self._statement(query), time.perf_counter() - started)
+
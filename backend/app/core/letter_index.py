@@ -0,0 +1,113 @@
+"""
+Letter Index - ასო -> ტურის position ინდექსი
+
+წინადადების ტური არის იმ ტურებიდან ყველაზე მაღალი position, რომლის ასოც
+წინადადებაში გვხვდება (იგივე წესი, რაც ფრონტენდის detectTourForText-ში).
+ინდექსით ეს ერთ გავლაში გამოითვლება წინადადების სიმბოლოებზე, ყველა
+ტურის გადარჩევის გარეშე.
+
+იგივე ინდექსი ინახავს ასოების სრულ სიას position-ის მიხედვით, ამიტომ
+"მანამდე ნასწავლი ასოები" (position <= N) არის სიის slice და არა query.
+
+ინდექსი ქეშირდება ცხრილის მიხედვით; უქმდება invalidate_letter_index()-ით
+(მხოლოდ ტურების ცხრილის letter/position-ის შეცვლისას - სიტყვების,
+წინადადებების და ისტორიების ცვლილება ინდექსზე არ მოქმედებს) ან
+LETTER_INDEX_TTL-ის გასვლისას (ბაზაში ხელით შესწორებისთვის).
+"""
+
+import bisect
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+
+LETTER_INDEX_TTL = float(os.getenv("LETTER_INDEX_TTL", 300))  # წამი
+
+
+class LetterIndex:
+    """ერთი დედაენის ცხრილის ასოების ინდექსი"""
+
+    def __init__(self, tours: List[Tuple[int, Optional[str]]]):
+        # ყველა ტური position-ის ზრდადობით (letters_up_to-სთვის, ცარიელი ასოს ჩათვლით)
+        ordered = sorted(tours, key=lambda tour: tour[0])
+        self.positions: List[int] = [position for position, _ in ordered]
+        self.letters: List[Optional[str]] = [letter for _, letter in ordered]
+        # (position, letter) position-ის ზრდადობით
+        self.tours = sorted((position, letter) for position, letter in tours if letter)
+        self.letter_by_position: Dict[int, str] = dict(self.tours)
+        # ერთსიმბოლოიანი ასო -> მაქსიმალური position
+        self.char_positions: Dict[str, int] = {}
+        # მრავალსიმბოლოიანი "ასოები" (თუ არსებობს) - substring შემოწმებით, position-ის კლებით
+        self.multi_char: List[Tuple[int, str]] = []
+        for position, letter in self.tours:
+            if len(letter) == 1:
+                self.char_positions[letter] = max(position, self.char_positions.get(letter, position))
+            else:
+                self.multi_char.append((position, letter))
+        self.multi_char.sort(reverse=True)
+        self.built_at = time.monotonic()
+
+    def resolve_position(self, sentence: str) -> Optional[int]:
+        """წინადადების ტურის position ან None, თუ არცერთი ასო არ გვხვდება"""
+        if not sentence:
+            return None
+        char_positions = self.char_positions
+        best = None
+        for ch in sentence:
+            position = char_positions.get(ch)
+            if position is not None and (best is None or position > best):
+                best = position
+        for position, letter in self.multi_char:
+            if best is not None and position <= best:
+                break
+            if letter in sentence:
+                best = position
+                break
+        return best
+
+    def has_position(self, position: int) -> bool:
+        index = bisect.bisect_left(self.positions, position)
+        return index < len(self.positions) and self.positions[index] == position
+
+    def letters_up_to(self, position: int) -> List[Optional[str]]:
+        """ასოები position-მდე (ჩათვლით) - იგივე, რაც WHERE position <= N ORDER BY position"""
+        return self.letters[:bisect.bisect_right(self.positions, position)]
+
+    def resolve(self, sentence: str) -> Optional[Tuple[int, str]]:
+        """(position, letter) ან None"""
+        position = self.resolve_position(sentence)
+        if position is None:
+            return None
+        return position, self.letter_by_position[position]
+
+
+_indexes: Dict[str, LetterIndex] = {}
+_generation = 0  # იზრდება ყოველ invalidate-ზე
+_lock = threading.Lock()
+
+
+def get_letter_index(db, table_name: str) -> LetterIndex:
+    """ცხრილის ინდექსი ქეშიდან, ან ერთი query-ით აგება"""
+    index = _indexes.get(table_name)
+    if index is not None and time.monotonic() - index.built_at < LETTER_INDEX_TTL:
+        return index
+    generation = _generation
+    rows = db.execute(text(f"SELECT position, letter FROM {table_name}")).fetchall()
+    index = LetterIndex([(row.position, row.letter) for row in rows])
+    with _lock:
+        # აგების დროს გაუქმებული ინდექსი ქეშში არ ინახება
+        if generation == _generation:
+            _indexes[table_name] = index
+    return index
+
+
+def invalidate_letter_index(table_name: Optional[str] = None):
+    """ინდექსის გაუქმება (ტურების ცხრილის ცვლილებისას)"""
+    global _generation
+    with _lock:
+        _generation += 1
+        if table_name is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(table_name, None)
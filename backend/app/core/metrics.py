@@ -0,0 +1,304 @@
+"""
+Metrics - Prometheus text format-ის მეტრიკები გარე დამოკიდებულების გარეშე
+
+- MetricsMiddleware: request-ების latency histogram-ი route template-ის
+  მიხედვით (მაგ. /api/dedaena/{table_name}, არა ნამდვილი path - label-ების
+  რაოდენობა შეზღუდულია), in-flight gauge და DB query-ების რაოდენობა/დრო
+  თითოეულ request-ზე
+- query-ები ითვლება app.core.instrumentation-ის hook-ებით (SQLAlchemy
+  და psycopg2); request-ის recorder contextvar-შია, ამიტომ run_sync-ში და
+  threadpool-ში შესრულებული query-ებიც ითვლება
+- render() აბრუნებს ყველა რეგისტრირებულ მეტრიკას; component-ების stats()
+  (ქეშები, pool-ები) /metrics endpoint-ში ემატება render_stats()-ით
+
+მეტრიკები პროცესის შიგნით გროვდება. METRICS_MULTIPROC_DIR-ის მითითებისას
+(gunicorn_conf.py ამას default-ად აკეთებს) render() ყველა worker-ის ჯამს
+აბრუნებს (app.core.metrics_multiprocess) - counter-ები scrape-ებს შორის
+არ მცირდება, რომელ worker-საც არ უნდა მოხვდეს scrape. component-ების
+stats() scrape-ის დამმუშავებელი worker-ისაა.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from starlette.routing import Match
+from app.core import instrumentation, metrics_multiprocess
+
+logger = logging.getLogger("metrics")
+
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))  # წამი
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_INF_BUCKET = 'le="+Inf"'
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+    def dump(self) -> dict:
+        """მდგომარეობა JSON-ისთვის (label-ები სტრიქონებად)"""
+        with self._lock:
+            values = [
+                [[str(label) for label in labels], list(value) if isinstance(value, list) else value]
+                for labels, value in self._values.items()
+            ]
+        return {"type": self.type, "values": values}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = {labels: list(value) if isinstance(value, list) else value
+                      for labels, value in self._values.items()}
+        return self.render_values(values)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render_values(self, values: Dict[Tuple, float]) -> List[str]:
+        return self._header() + [
+            f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+            for labels, value in values.items()
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def render_values(self, values: Dict[Tuple, list]) -> List[str]:
+        lines = self._header()
+        for labels, entry in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, _INF_BUCKET)} {entry[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(float(entry[-2]))}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {entry[-1]}")
+        return lines
+
+
+_registry: List[_Metric] = []
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being processed", ("method",))
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request", ("method", "route")
+)
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed", ("source",))
+DB_QUERY_LATENCY = Histogram("db_query_duration_seconds", "SQL statement latency", ("source",))
+
+
+def _observe_query(source: str, statement: str, seconds: float):
+    DB_QUERIES.inc(source)
+    DB_QUERY_LATENCY.observe(seconds, source)
+
+
+instrumentation.add_query_observer(_observe_query)
+
+
+def route_template(scope) -> str:
+    """request-ის route-ის path template (ნამდვილი path label-ად არ გამოიყენება)"""
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware: latency, in-flight და DB query-ები request-ზე"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        with instrumentation.track_queries() as recorder:
+
+            async def send_with_status(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if instrumentation.SQL_DEBUG_HEADERS:
+                        message = {**message, "headers": [
+                            *message.get("headers", []), *instrumentation.debug_headers(recorder)
+                        ]}
+                await send(message)
+
+            HTTP_IN_FLIGHT.inc(method)
+            started = time.perf_counter()
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - started
+                HTTP_IN_FLIGHT.dec(method)
+                route = route_template(scope)
+                HTTP_REQUESTS.inc(method, route, status)
+                HTTP_LATENCY.observe(elapsed, method, route)
+                REQUEST_DB_QUERIES.observe(recorder.count, method, route)
+                REQUEST_DB_SECONDS.observe(recorder.seconds, method, route)
+                instrumentation.notify_request(method, route, recorder)
+
+
+def render_stats(name: str, documentation: str, stats: Dict[str, dict], label: str = "component") -> List[str]:
+    """
+    component-ების stats() -> gauge-ები name_<key>{label="..."}
+
+    stats: {label-ის მნიშვნელობა: stats() dict}; არარიცხვითი მნიშვნელობები
+    გამოტოვებულია.
+    """
+    series: Dict[str, List[str]] = {}
+    for label_value, values in stats.items():
+        for key, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            series.setdefault(key, []).append(
+                f"{name}_{key}{_labels((label,), (label_value,))} {_number(value)}"
+            )
+    lines = []
+    for key, samples in series.items():
+        lines += [f"# HELP {name}_{key} {documentation}: {key}", f"# TYPE {name}_{key} gauge", *samples]
+    return lines
+
+
+def _dump() -> Dict[str, dict]:
+    return {metric.name: metric.dump() for metric in _registry}
+
+
+_flusher: Optional[threading.Thread] = None
+_flusher_stop = threading.Event()
+
+
+def flush():
+    """მიმდინარე worker-ის მეტრიკების ჩაწერა METRICS_MULTIPROC_DIR-ში"""
+    directory = metrics_multiprocess.multiproc_dir()
+    if not directory:
+        return
+    try:
+        metrics_multiprocess.write_worker_state(directory, _dump())
+    except OSError as e:
+        logger.warning(f"Metrics flush failed: {e}")
+
+
+def _flush_loop():
+    while not _flusher_stop.wait(METRICS_FLUSH_INTERVAL):
+        flush()
+
+
+def start_multiprocess():
+    """worker-ის startup-ზე (fork-ის შემდეგ): მეტრიკების პერიოდული ჩაწერა საერთო საქაღალდეში"""
+    global _flusher
+    directory = metrics_multiprocess.multiproc_dir()
+    if not directory or (_flusher is not None and _flusher.is_alive()):
+        return
+    os.makedirs(directory, exist_ok=True)
+    _flusher_stop.clear()
+    flush()
+    _flusher = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+    _flusher.start()
+
+
+def stop_multiprocess():
+    """worker-ის shutdown: ბოლო ჩაწერა (child_exit მას archive-ში გადაიტანს)"""
+    _flusher_stop.set()
+    flush()
+
+
+def render(extra: Sequence[str] = ()) -> str:
+    """Prometheus text exposition format (0.0.4); multiprocess რეჟიმში - ყველა worker-ის ჯამი"""
+    lines: List[str] = []
+    directory = metrics_multiprocess.multiproc_dir()
+    if directory:
+        total = metrics_multiprocess.collect(directory, _dump())
+        for metric in _registry:
+            lines += metric.render_values(total.get(metric.name, {}).get("values", {}))
+    else:
+        for metric in _registry:
+            lines += metric.render()
+    lines += extra
+    return "\n".join(lines) + "\n"
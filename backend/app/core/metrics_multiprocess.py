@@ -0,0 +1,159 @@
+"""
+Metrics Multiprocess - worker-ების მეტრიკების აგრეგაცია საერთო საქაღალდით
+
+gunicorn-ის ყოველ worker-ს საკუთარი მრიცხველები აქვს, scrape კი ერთ
+შემთხვევით worker-ზე ხვდება - counter-ები scrape-ებს შორის "უკან მიდიოდა".
+METRICS_MULTIPROC_DIR-ის მითითებისას:
+
+  - ყოველი worker METRICS_FLUSH_INTERVAL წამში ერთხელ (და shutdown-ზე)
+    წერს თავის მდგომარეობას ფაილში <dir>/worker_<pid>.json
+  - /metrics აჯამებს ყველა ფაილს: counter-ები და histogram-ები ყველა
+    worker-იდან (გარდაცვლილის ჩათვლით), gauge-ები - მხოლოდ ცოცხალი
+    worker-ებიდან
+  - gunicorn-ის master (child_exit) გარდაცვლილი worker-ის counter-ებს
+    archive.json-ში გადაიტანს და მის ფაილს შლის, ამიტომ worker-ების
+    გადატვირთვისას ჯამი არ მცირდება და ფაილები არ გროვდება
+
+მოდული app-ის სხვა ნაწილებს არ იმპორტავს - gunicorn_conf.py master
+პროცესში იყენებს.
+"""
+
+import fcntl
+import json
+import os
+import shutil
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+ARCHIVE_FILE = "archive.json"
+LOCK_FILE = ".lock"
+WORKER_PREFIX = "worker_"
+
+
+def multiproc_dir() -> Optional[str]:
+    return os.getenv("METRICS_MULTIPROC_DIR") or None
+
+
+def _worker_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"{WORKER_PREFIX}{pid}.json")
+
+
+@contextmanager
+def _locked(directory: str):
+    """archive-ის და worker ფაილების ცვლილება ერთი პროცესით ერთდროულად"""
+    with open(os.path.join(directory, LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: str, state: dict):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def write_worker_state(directory: str, state: dict):
+    """
+    worker-ის მდგომარეობის ჩაწერა
+
+    state: {metric name: {"type": ..., "values": [[labels, value], ...]}};
+    histogram-ის value არის [bucket counts..., sum, count]
+    """
+    _write_atomic(_worker_path(directory, os.getpid()), state)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge_into(total: Dict[str, dict], state: dict, include_gauges: bool):
+    for name, metric in state.items():
+        if metric["type"] == "gauge" and not include_gauges:
+            continue
+        values = total.setdefault(name, {"type": metric["type"], "values": {}})["values"]
+        for labels, value in metric["values"]:
+            key = tuple(labels)
+            current = values.get(key)
+            if current is None:
+                values[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                values[key] = [a + b for a, b in zip(current, value)]
+            else:
+                values[key] = current + value
+
+
+def collect(directory: str, own_state: dict) -> Dict[str, dict]:
+    """
+    ყველა worker-ის (და archive-ის) ჯამი: {name: {"type", "values": {labels: value}}}
+
+    own_state - მიმდინარე worker-ის მეხსიერებაში არსებული მდგომარეობა
+    (მისი ფაილი შეიძლება რამდენიმე წამით ძველი იყოს)
+    """
+    total: Dict[str, dict] = {}
+    own_pid = os.getpid()
+    # lock: archive-ში გადატანის შუაში worker-ის counter-ები არც ორჯერ ითვლება, არც გამოიტოვება
+    with _locked(directory):
+        _merge_into(total, _read(os.path.join(directory, ARCHIVE_FILE)), include_gauges=False)
+        for filename in os.listdir(directory):
+            if not (filename.startswith(WORKER_PREFIX) and filename.endswith(".json")):
+                continue
+            try:
+                pid = int(filename[len(WORKER_PREFIX):-len(".json")])
+            except ValueError:
+                continue
+            if pid == own_pid:
+                continue
+            _merge_into(total, _read(os.path.join(directory, filename)), include_gauges=_pid_alive(pid))
+    _merge_into(total, own_state, include_gauges=True)
+    return total
+
+
+def mark_process_dead(pid: int, directory: Optional[str] = None):
+    """გარდაცვლილი worker-ის counter-ების/histogram-ების archive-ში გადატანა (gunicorn child_exit)"""
+    directory = directory or multiproc_dir()
+    if not directory:
+        return
+    path = _worker_path(directory, pid)
+    with _locked(directory):
+        state = _read(path)
+        if state:
+            archive: Dict[str, dict] = {}
+            archive_path = os.path.join(directory, ARCHIVE_FILE)
+            _merge_into(archive, _read(archive_path), include_gauges=False)
+            _merge_into(archive, state, include_gauges=False)
+            _write_atomic(archive_path, {
+                name: {"type": metric["type"], "values": [[list(labels), value] for labels, value in metric["values"].items()]}
+                for name, metric in archive.items()
+            })
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def reset_directory(directory: Optional[str] = None):
+    """წინა გაშვების ფაილების წაშლა (gunicorn master-ის startup-ზე)"""
+    directory = directory or multiproc_dir()
+    if not directory:
+        return
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
@@ -0,0 +1,309 @@
+"""
+User Progress - ნაპოვნი ელემენტების ინკრემენტული შენახვა
+
+კლიენტი აგზავნის მხოლოდ ცვლილებას (დამატებული/წაშლილი ID-ები). merge
+ხდება SQL-ში ერთი INSERT ... ON CONFLICT-ით: არსებული მასივი ∪ დამატებული,
+წაშლილების გარეშე, დუბლიკატების გარეშე.
+
+PROGRESS_ENCODING=bitmap-ისას სიმრავლეები ინახება *_bitmap (bytea) სვეტებში
+app.core.progress_bitmap-ის ფორმატით, მასივები კი NULL-დება. bytea-ზე
+SQL-ში merge შეუძლებელია, ამიტომ ამ რეჟიმში merge არის SELECT ... FOR
+UPDATE + UPSERT ერთ ტრანზაქციაში. ჩატვირთვა ორივე ფორმატს კითხულობს.
+bitmap-იდან array-ზე დაბრუნებამდე: python -m scripts.convert_progress_encoding array
+
+*_bitmap სვეტები SQL-ში მხოლოდ მაშინ გამოიყენება, როცა ისინი არსებობს:
+startup-ზე init_progress_schema() ამოწმებს migration 004-ს. bitmap რეჟიმში
+მისი არარსებობისას worker არ ეშვება, array რეჟიმში კი SQL-ი მხოლოდ
+მასივებს იყენებს.
+
+ერთი მომხმარებლის სწრაფად მიმდევრობითი შენახვები (PROGRESS_COALESCE_MS
+ფანჯარაში) ერთიანდება ერთ ჩაწერად: პირველი მოთხოვნა ქმნის pending
+ცვლილებას, მომდევნოები მას ემატებიან და ყველა ერთსა და იმავე ჩაწერას ელოდება.
+"""
+
+import asyncio
+import os
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+from sqlalchemy import text
+from app.core import progress_bitmap
+from app.database import AsyncSessionLocal, new_async_session
+
+PROGRESS_COALESCE_MS = int(os.getenv("PROGRESS_COALESCE_MS", 250))
+PROGRESS_ENCODING = os.getenv("PROGRESS_ENCODING", "array")  # array | bitmap
+if PROGRESS_ENCODING not in ("array", "bitmap"):
+    raise RuntimeError("PROGRESS_ENCODING must be 'array' or 'bitmap'")
+
+# payload-ის გასაღები -> user_progress-ის სვეტი
+PROGRESS_COLUMNS = {
+    "word": "found_word_ids",
+    "sentence": "found_sentence_ids",
+    "proverb": "found_proverb_ids",
+}
+
+# payload-ის გასაღები -> bitmap სვეტი (migrations/004_user_progress_bitmaps.sql)
+BITMAP_COLUMNS = {
+    "word": "found_word_bitmap",
+    "sentence": "found_sentence_bitmap",
+    "proverb": "found_proverb_bitmap",
+}
+
+
+class ProgressDelta:
+    """დასამატებელი და წასაშლელი ID-ები თითოეული სვეტისთვის"""
+
+    def __init__(self):
+        self.add: Dict[str, Set[int]] = {kind: set() for kind in PROGRESS_COLUMNS}
+        self.remove: Dict[str, Set[int]] = {kind: set() for kind in PROGRESS_COLUMNS}
+
+    def apply(self, kind: str, add: Iterable[int] = (), remove: Iterable[int] = ()):
+        """მომდევნო ცვლილების დამატება (უახლესი ოპერაცია იმარჯვებს)"""
+        add, remove = set(add), set(remove)
+        self.add[kind] = (self.add[kind] - remove) | add
+        self.remove[kind] = (self.remove[kind] - add) | remove
+
+
+def _merge_sql(kind: str, existing: str) -> str:
+    """(existing ∪ add) \\ remove, დალაგებული და დუბლიკატების გარეშე"""
+    return f"""ARRAY(
+            SELECT DISTINCT x
+            FROM unnest({existing} || CAST(:add_{kind} AS int[])) AS x
+            WHERE x <> ALL(CAST(:remove_{kind} AS int[]))
+            ORDER BY x
+        )"""
+
+
+# migration 004-ის სვეტები არსებობს? (init_progress_schema ადგენს startup-ზე)
+_bitmap_columns_present = PROGRESS_ENCODING == "bitmap"
+
+
+async def init_progress_schema():
+    """
+    user_progress-ის *_bitmap სვეტების შემოწმება (worker-ის startup-ზე)
+
+    Raises:
+        RuntimeError: PROGRESS_ENCODING=bitmap, მაგრამ migration 004 არ არის გაშვებული
+    """
+    global _bitmap_columns_present
+    async with new_async_session() as db:
+        result = await db.execute(
+            text("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'user_progress'
+                  AND column_name = ANY(:columns)
+            """),
+            {"columns": list(BITMAP_COLUMNS.values())}
+        )
+        present = {row[0] for row in result.fetchall()}
+    _bitmap_columns_present = present == set(BITMAP_COLUMNS.values())
+    if PROGRESS_ENCODING == "bitmap" and not _bitmap_columns_present:
+        raise RuntimeError("PROGRESS_ENCODING=bitmap requires migrations/004_user_progress_bitmaps.sql")
+
+
+@lru_cache(maxsize=2)
+def _statements(with_bitmaps: bool) -> Dict[str, object]:
+    """SQL statement-ები - *_bitmap სვეტებით (with_bitmaps) ან მათ გარეშე"""
+    insert_values = ",\n        ".join(
+        _merge_sql(kind, "'{}'::int[]") for kind in PROGRESS_COLUMNS
+    )
+    update_set = ",\n        ".join(
+        f"{column} = " + _merge_sql(kind, f"COALESCE(user_progress.{column}, '{{}}'::int[])")
+        for kind, column in PROGRESS_COLUMNS.items()
+    )
+    # რიგი ჯერ კიდევ bitmap-შია - DO UPDATE არ სრულდება, merge დაბლოკილი read-modify-write-ით
+    merge_where = (
+        "WHERE " + " AND ".join(f"user_progress.{column} IS NULL" for column in BITMAP_COLUMNS.values())
+        if with_bitmaps else ""
+    )
+    null_bitmaps = "".join(f"{column} = NULL, " for column in BITMAP_COLUMNS.values()) if with_bitmaps else ""
+    columns = [*PROGRESS_COLUMNS.values(), *(BITMAP_COLUMNS.values() if with_bitmaps else ())]
+
+    statements = {
+        "columns": ", ".join(columns),
+        "merge": text(f"""
+            INSERT INTO user_progress (user_id, dedaena_table, {", ".join(PROGRESS_COLUMNS.values())}, updated_at)
+            VALUES (
+                :user_id,
+                :dedaena_table,
+                {insert_values},
+                NOW()
+            )
+            ON CONFLICT (user_id, dedaena_table)
+            DO UPDATE SET
+                {update_set},
+                updated_at = NOW()
+            {merge_where}
+            RETURNING {", ".join(f"cardinality({column})" for column in PROGRESS_COLUMNS.values())}
+        """),
+        "upsert_arrays": text(f"""
+            INSERT INTO user_progress (user_id, dedaena_table, {", ".join(PROGRESS_COLUMNS.values())}, updated_at)
+            VALUES (:user_id, :dedaena_table, {", ".join(f":{kind}" for kind in PROGRESS_COLUMNS)}, NOW())
+            ON CONFLICT (user_id, dedaena_table)
+            DO UPDATE SET
+                {", ".join(f"{column} = EXCLUDED.{column}" for column in PROGRESS_COLUMNS.values())},
+                {null_bitmaps}updated_at = NOW()
+        """),
+    }
+    if with_bitmaps:
+        statements["upsert_bitmaps"] = text(f"""
+            INSERT INTO user_progress (user_id, dedaena_table, {", ".join(BITMAP_COLUMNS.values())}, updated_at)
+            VALUES (:user_id, :dedaena_table, {", ".join(f":{kind}" for kind in BITMAP_COLUMNS)}, NOW())
+            ON CONFLICT (user_id, dedaena_table)
+            DO UPDATE SET
+                {", ".join(f"{column} = EXCLUDED.{column}" for column in BITMAP_COLUMNS.values())},
+                {", ".join(f"{column} = NULL" for column in PROGRESS_COLUMNS.values())},
+                updated_at = NOW()
+        """)
+    return statements
+
+
+def _sql() -> Dict[str, object]:
+    return _statements(_bitmap_columns_present)
+
+
+def row_to_sets(row) -> Dict[str, List[int]]:
+    """user_progress-ის რიგი (_sql()["columns"]) -> {kind: ids}; bitmap-ს უპირატესობა აქვს"""
+    if row is None:
+        return {kind: [] for kind in PROGRESS_COLUMNS}
+    values = dict(row._mapping)
+    result = {}
+    for kind in PROGRESS_COLUMNS:
+        bitmap = values.get(BITMAP_COLUMNS[kind])
+        if bitmap is not None:
+            result[kind] = progress_bitmap.decode(bitmap)
+        else:
+            result[kind] = list(values.get(PROGRESS_COLUMNS[kind]) or [])
+    return result
+
+
+async def load_progress_sets(db, user_id: int, dedaena_table: str):
+    """
+    Returns:
+        ({kind: ids}, updated_at) ან (None, None), თუ პროგრესი არ არსებობს
+    """
+    result = await db.execute(
+        text(f"""
+            SELECT {_sql()["columns"]}, updated_at
+            FROM user_progress
+            WHERE user_id = :user_id AND dedaena_table = :dedaena_table
+        """),
+        {"user_id": user_id, "dedaena_table": dedaena_table}
+    )
+    row = result.fetchone()
+    if row is None:
+        return None, None
+    return row_to_sets(row), row.updated_at
+
+
+async def save_progress_sets(db, user_id: int, dedaena_table: str, sets: Dict[str, Iterable[int]]):
+    """სრული სიმრავლეების ჩაწერა მიმდინარე PROGRESS_ENCODING-ით (commit-ს აკეთებს გამომძახებელი)"""
+    params = {"user_id": user_id, "dedaena_table": dedaena_table}
+    if PROGRESS_ENCODING == "bitmap":
+        params.update({kind: progress_bitmap.encode(sets.get(kind, ())) for kind in BITMAP_COLUMNS})
+        await db.execute(_sql()["upsert_bitmaps"], params)
+    else:
+        params.update({kind: sorted(set(sets.get(kind, ()))) for kind in PROGRESS_COLUMNS})
+        await db.execute(_sql()["upsert_arrays"], params)
+
+
+async def _merge_progress_locked(db, user_id: int, dedaena_table: str, delta: ProgressDelta) -> Dict[str, int]:
+    """რიგის დაბლოკვა, merge Python-ში და ჩაწერა მიმდინარე PROGRESS_ENCODING-ით"""
+    result = await db.execute(
+        text(f"""
+            SELECT {_sql()["columns"]}
+            FROM user_progress
+            WHERE user_id = :user_id AND dedaena_table = :dedaena_table
+            FOR UPDATE
+        """),
+        {"user_id": user_id, "dedaena_table": dedaena_table}
+    )
+    current = row_to_sets(result.fetchone())
+    merged = {
+        kind: (set(current[kind]) | delta.add[kind]) - delta.remove[kind]
+        for kind in PROGRESS_COLUMNS
+    }
+    await save_progress_sets(db, user_id, dedaena_table, merged)
+    return {kind: len(ids) for kind, ids in merged.items()}
+
+
+async def merge_progress(db, user_id: int, dedaena_table: str, delta: ProgressDelta) -> Dict[str, int]:
+    """
+    ცვლილების ჩაწერა (commit-ს აკეთებს გამომძახებელი)
+
+    array რეჟიმში - ერთი statement, merge SQL-ში. bitmap რეჟიმში, ან თუ
+    რიგი ჯერ კიდევ bitmap-შია (DO UPDATE-ის WHERE არ სრულდება; მხოლოდ
+    migration 004-ის შემდეგ) - დაბლოკილი read-modify-write.
+
+    Returns:
+        ნაპოვნი ელემენტების რაოდენობა merge-ის შემდეგ: {"word": n, ...}
+    """
+    if PROGRESS_ENCODING == "bitmap":
+        return await _merge_progress_locked(db, user_id, dedaena_table, delta)
+    params = {"user_id": user_id, "dedaena_table": dedaena_table}
+    for kind in PROGRESS_COLUMNS:
+        params[f"add_{kind}"] = sorted(delta.add[kind])
+        params[f"remove_{kind}"] = sorted(delta.remove[kind])
+    row = (await db.execute(_sql()["merge"], params)).fetchone()
+    if row is None:
+        return await _merge_progress_locked(db, user_id, dedaena_table, delta)
+    return dict(zip(PROGRESS_COLUMNS, row))
+
+
+class ProgressCoalescer:
+    """ერთი (user_id, dedaena_table)-ის მოკლე დროში მოსული ცვლილებების გაერთიანება"""
+
+    def __init__(self, window_ms: int):
+        self.window = window_ms / 1000
+        self._pending: Dict[Tuple[int, str], Tuple[ProgressDelta, asyncio.Future]] = {}
+        self._tasks: Set[asyncio.Task] = set()  # flush task-ების მყარი მიმართვა (GC-სგან დაცვა)
+        self.requests = 0
+        self.writes = 0
+
+    async def submit(self, user_id: int, dedaena_table: str, changes: Dict[str, Tuple[Iterable[int], Iterable[int]]]) -> Dict[str, int]:
+        """
+        changes: {kind: (add_ids, remove_ids)}
+
+        Returns:
+            merge_progress-ის შედეგი (ჩაწერის შემდეგ)
+        """
+        self.requests += 1
+        key = (user_id, dedaena_table)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = (ProgressDelta(), asyncio.get_running_loop().create_future())
+            self._pending[key] = pending
+            asyncio.get_running_loop().call_later(self.window, self._schedule_flush, key)
+        delta, future = pending
+        for kind, (add, remove) in changes.items():
+            delta.apply(kind, add, remove)
+        return await asyncio.shield(future)
+
+    def _schedule_flush(self, key: Tuple[int, str]):
+        task = asyncio.ensure_future(self._flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, key: Tuple[int, str]):
+        delta, future = self._pending.pop(key)
+        try:
+            async with AsyncSessionLocal() as db:
+                counts = await merge_progress(db, key[0], key[1], delta)
+                await db.commit()
+            self.writes += 1
+            future.set_result(counts)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # მომლოდინის არარსებობისას warning-ის თავიდან აცილება
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000,
+            "pending": len(self._pending),
+            "requests": self.requests,
+            "writes": self.writes,
+        }
+
+
+progress_coalescer = ProgressCoalescer(PROGRESS_COALESCE_MS)
@@ -0,0 +1,94 @@
+"""
+Progress Bitmap - ID-ების სიმრავლის კომპაქტური (roaring-ის მსგავსი) კოდირება
+
+ID-ები იყოფა 65536-იან ბლოკებად (container) ზედა 16 ბიტის მიხედვით.
+თითოეული container ინახება იმ ფორმით, რომელიც უფრო მცირეა:
+  - array:  დალაგებული uint16 მნიშვნელობები (<= 4096 ელემენტი)
+  - bitmap: 8192 ბაიტიანი bitset (> 4096 ელემენტი)
+
+ფორმატი (little-endian):
+    uint8  VERSION
+    uint16 container-ების რაოდენობა
+    ყოველ container-ზე: uint16 key, uint16 cardinality - 1, შემდეგ მონაცემები
+
+cardinality() თვლის მხოლოდ header-ებიდან, გაშლის გარეშე.
+"""
+
+import struct
+from typing import Dict, Iterable, List
+
+VERSION = 1
+ARRAY_MAX = 4096
+BITMAP_BYTES = 8192  # 65536 ბიტი
+
+_HEADER = struct.Struct("<BH")
+_CONTAINER = struct.Struct("<HH")
+
+
+def encode(ids: Iterable[int]) -> bytes:
+    """ID-ების სიმრავლე -> bytes (დუბლიკატები იშლება)"""
+    containers: Dict[int, List[int]] = {}
+    for i in sorted(set(ids)):
+        if i < 0 or i > 0xFFFFFFFF:
+            raise ValueError(f"id out of range: {i}")
+        containers.setdefault(i >> 16, []).append(i & 0xFFFF)
+
+    parts = [_HEADER.pack(VERSION, len(containers))]
+    for key, lows in containers.items():
+        parts.append(_CONTAINER.pack(key, len(lows) - 1))
+        if len(lows) <= ARRAY_MAX:
+            parts.append(struct.pack(f"<{len(lows)}H", *lows))
+        else:
+            bitset = bytearray(BITMAP_BYTES)
+            for low in lows:
+                bitset[low >> 3] |= 1 << (low & 7)
+            parts.append(bytes(bitset))
+    return b"".join(parts)
+
+
+def _containers(data: bytes):
+    """(key, cardinality, offset) თითოეული container-ისთვის"""
+    version, count = _HEADER.unpack_from(data, 0)
+    if version != VERSION:
+        raise ValueError(f"unsupported progress bitmap version: {version}")
+    offset = _HEADER.size
+    for _ in range(count):
+        key, card = _CONTAINER.unpack_from(data, offset)
+        card += 1
+        offset += _CONTAINER.size
+        yield key, card, offset
+        offset += card * 2 if card <= ARRAY_MAX else BITMAP_BYTES
+
+
+def decode(data: bytes) -> List[int]:
+    """bytes -> დალაგებული ID-ების სია"""
+    if not data:
+        return []
+    data = bytes(data)
+    ids: List[int] = []
+    for key, card, offset in _containers(data):
+        base = key << 16
+        if card <= ARRAY_MAX:
+            ids.extend(base | low for low in struct.unpack_from(f"<{card}H", data, offset))
+        else:
+            bits = int.from_bytes(data[offset:offset + BITMAP_BYTES], "little")
+            while bits:
+                low_bit = bits & -bits
+                ids.append(base | (low_bit.bit_length() - 1))
+                bits ^= low_bit
+    return ids
+
+
+def cardinality(data: bytes) -> int:
+    """ელემენტების რაოდენობა (მხოლოდ header-ებიდან)"""
+    if not data:
+        return 0
+    return sum(card for _, card, _ in _containers(bytes(data)))
+
+
+def merge(data: bytes, add: Iterable[int] = (), remove: Iterable[int] = ()) -> bytes:
+    """(data ∪ add) \\ remove"""
+    ids = set(decode(data))
+    ids.update(add)
+    ids.difference_update(remove)
+    return encode(ids)
@@ -0,0 +1,304 @@
+"""
+Rate Limiting - sliding window counter
+
+ყოველ გასაღებს (მაგ. "login:1.2.3.4", "admin:7") აქვს ორი მრიცხველი:
+მიმდინარე და წინა ფიქსირებული ფანჯარა. შეფასება
+    previous * (ფანჯრის დარჩენილი წილი) + current
+ახლოსაა ნამდვილ sliding window-თან და მეხსიერება O(1)-ია გასაღებზე.
+
+Backend-ები:
+  - MemoryBackend: პროცესის შიგნით, შეზღუდული (RATE_LIMIT_MAX_KEYS) და
+    ვადაგასული გასაღებების გამოდევნით. რამდენიმე worker-ისას ლიმიტი
+    თითოეულ worker-ზე ცალკე მოქმედებს.
+  - SQLiteBackend: RATE_LIMIT_SQLITE_PATH-ის მითითებისას - ერთი ჰოსტის
+    ყველა worker-ისთვის საერთო მრიცხველები ერთ SQLite ფაილში (stdlib,
+    დამატებითი სერვისის გარეშე). gunicorn_conf.py მას default-ად რთავს.
+  - RedisBackend: RATE_LIMIT_REDIS_URL-ის მითითებისას (საჭიროა redis
+    პაკეტი) - საერთო ლიმიტი რამდენიმე ჰოსტისთვისაც.
+  shared backend-ის შეცდომისას მოთხოვნა MemoryBackend-ით მოწმდება.
+
+კლიენტის IP: X-Forwarded-For მხოლოდ მაშინ მიიღება, როცა კავშირი
+TRUSTED_PROXIES-იდან (IP/CIDR სია, default loopback) მოდის - სხვა
+შემთხვევაში header-ის გაყალბებით ლიმიტის გვერდის ავლა შეიძლებოდა.
+
+გამოყენება:
+    @router.post("/register", dependencies=[Depends(rate_limit("register", 300, 60, key="ip"))])
+    ...
+    limiter = RateLimiter("admin", 30, 60)
+    await limiter.check(user_id)
+"""
+
+import ipaddress
+import logging
+import asyncio
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+from fastapi import HTTPException, Request
+from app.core.security import decode_access_token
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis არჩევითია - მის გარეშე მხოლოდ in-memory
+    redis_asyncio = None
+
+logger = logging.getLogger("rate_limit")
+
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(proxy.strip(), strict=False)
+    for proxy in os.getenv("TRUSTED_PROXIES", "127.0.0.1,::1").split(",")
+    if proxy.strip()
+]
+
+
+class MemoryBackend:
+    """in-process მრიცხველები: key -> [window_index, current, previous], LRU გამოდევნით"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._counters: "OrderedDict[str, list]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: int) -> Tuple[bool, float]:
+        now = time.time()
+        index = int(now // window)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = [index, 0, 0]
+            elif counter[0] != index:
+                # ფანჯარა შეიცვალა: current -> previous (თუ მეზობელი ფანჯარაა)
+                previous = counter[1] if counter[0] == index - 1 else 0
+                counter = [index, 0, previous]
+            weight = 1 - (now % window) / window
+            allowed = counter[2] * weight + counter[1] < limit
+            if allowed:
+                counter[1] += 1
+            self._counters[key] = counter
+            self._counters.move_to_end(key)
+            self._evict(index)
+        return allowed, _retry_after(now, window)
+
+    def _evict(self, index: int):
+        # ძველი გასაღებები თავშია (LRU) - ორ ფანჯარაზე ძველი აღარ მოქმედებს
+        while self._counters:
+            key, counter = next(iter(self._counters.items()))
+            if counter[0] >= index - 1 and len(self._counters) <= self.max_keys:
+                break
+            self._counters.popitem(last=False)
+
+    def __len__(self):
+        return len(self._counters)
+
+
+class RedisBackend:
+    """საერთო მრიცხველები Redis-ში (ერთი Lua script - შემოწმება და ზრდა ატომურად)"""
+
+    SCRIPT = """
+        local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+        local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+        if previous * tonumber(ARGV[2]) + current >= tonumber(ARGV[3]) then
+            return 0
+        end
+        if redis.call('INCR', KEYS[1]) == 1 then
+            redis.call('EXPIRE', KEYS[1], ARGV[1])
+        end
+        return 1
+    """
+
+    def __init__(self, url: str):
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def hit(self, key: str, limit: int, window: int) -> Tuple[bool, float]:
+        now = time.time()
+        index = int(now // window)
+        weight = 1 - (now % window) / window
+        allowed = await self._script(
+            keys=[f"ratelimit:{key}:{index}", f"ratelimit:{key}:{index - 1}"],
+            args=[window * 2, weight, limit]
+        )
+        return bool(allowed), _retry_after(now, window)
+
+
+class SQLiteBackend:
+    """
+    საერთო მრიცხველები SQLite ფაილში (ერთი ჰოსტის worker-ებისთვის)
+
+    შემოწმება და ზრდა ერთ BEGIN IMMEDIATE ტრანზაქციაშია (ატომურად ყველა
+    პროცესისთვის); ბლოკირებადი I/O thread-ში სრულდება. ვადაგასული რიგები
+    იშლება არაუმეტეს ერთხელ CLEANUP_INTERVAL წამში.
+    """
+
+    CLEANUP_INTERVAL = 60
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()  # კავშირი thread-ზე (fork-ის შემდეგ იქმნება)
+        self._cleaned_at = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT NOT NULL,
+                    window INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    expires REAL NOT NULL,
+                    PRIMARY KEY (key, window)
+                ) WITHOUT ROWID
+            """)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _hit(self, key: str, limit: int, window: int) -> Tuple[bool, float]:
+        now = time.time()
+        index = int(now // window)
+        weight = 1 - (now % window) / window
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            counts = dict(conn.execute(
+                "SELECT window, count FROM rate_limits WHERE key = ? AND window IN (?, ?)",
+                (key, index, index - 1)
+            ).fetchall())
+            allowed = counts.get(index - 1, 0) * weight + counts.get(index, 0) < limit
+            if allowed:
+                conn.execute(
+                    "INSERT INTO rate_limits (key, window, count, expires) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT (key, window) DO UPDATE SET count = count + 1",
+                    (key, index, now + 2 * window)
+                )
+            if now - self._cleaned_at > self.CLEANUP_INTERVAL:
+                self._cleaned_at = now
+                conn.execute("DELETE FROM rate_limits WHERE expires < ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, _retry_after(now, window)
+
+    async def hit(self, key: str, limit: int, window: int) -> Tuple[bool, float]:
+        return await asyncio.to_thread(self._hit, key, limit, window)
+
+
+def _retry_after(now: float, window: int) -> float:
+    """უარყოფისას: ახალი ფანჯრის დაწყებამდე დარჩენილი წამები"""
+    return window - now % window
+
+
+_memory_backend = MemoryBackend(RATE_LIMIT_MAX_KEYS)
+_shared_backend = None
+if RATE_LIMIT_REDIS_URL:
+    if redis_asyncio is None:
+        logger.warning("RATE_LIMIT_REDIS_URL is set but redis is not installed")
+    else:
+        _shared_backend = RedisBackend(RATE_LIMIT_REDIS_URL)
+if _shared_backend is None and RATE_LIMIT_SQLITE_PATH:
+    _shared_backend = SQLiteBackend(RATE_LIMIT_SQLITE_PATH)
+
+
+def warn_if_not_shared(workers: int):
+    """worker-ის startup: რამდენიმე worker-ისას in-memory ლიმიტი worker-ების რაოდენობაზე მრავლდება"""
+    if workers > 1 and _shared_backend is None:
+        logger.warning(
+            f"Rate limits are per-process with {workers} workers (effective limits x{workers}); "
+            "set RATE_LIMIT_SQLITE_PATH or RATE_LIMIT_REDIS_URL"
+        )
+
+
+class RateLimiter:
+    """სახელდებული ლიმიტი: limit მოთხოვნა window წამში ერთ გასაღებზე"""
+
+    def __init__(self, name: str, limit: int, window: int = 60):
+        self.name = name
+        self.limit = limit
+        self.window = window
+
+    async def hit(self, identity) -> Tuple[bool, float]:
+        key = f"{self.name}:{identity}"
+        if _shared_backend is not None:
+            try:
+                return await _shared_backend.hit(key, self.limit, self.window)
+            except Exception as e:
+                logger.warning(f"Shared rate limit backend failed, falling back to memory: {e}")
+        return await _memory_backend.hit(key, self.limit, self.window)
+
+    async def check(self, identity):
+        """ლიმიტის გადაჭარბებისას 429 Retry-After header-ით"""
+        allowed, retry_after = await self.hit(identity)
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please wait.",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request: Request) -> str:
+    """
+    კლიენტის IP proxy-ის უკან: X-Forwarded-For-ში მარჯვნიდან პირველი
+    მისამართი, რომელიც სანდო proxy არ არის
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded:
+        return peer
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+def client_identity(request: Request, key: str = "user") -> str:
+    """
+    ლიმიტის გასაღები: key="user" - token-ის user id (token-ის გარეშე IP),
+    key="ip" - მხოლოდ კლიენტის IP
+    """
+    if key == "user":
+        authorization = request.headers.get("authorization") or ""
+        if authorization.startswith("Bearer "):
+            payload = decode_access_token(authorization[len("Bearer "):])
+            if payload and payload.get("id") is not None:
+                return f"user:{payload['id']}"
+    return f"ip:{client_ip(request)}"
+
+
+def rate_limit(name: str, limit: int, window: int = 60, key: str = "user"):
+    """FastAPI dependency factory: Depends(rate_limit("progress", 60))"""
+    limiter = RateLimiter(name, limit, window)
+
+    async def dependency(request: Request):
+        await limiter.check(client_identity(request, key))
+
+    return dependency
+
+
+def get_rate_limit_stats() -> dict:
+    return {
+        "backend": {RedisBackend: "redis", SQLiteBackend: "sqlite"}.get(type(_shared_backend), "memory"),
+        "memory_keys": len(_memory_backend),
+        "memory_max_keys": _memory_backend.max_keys,
+    }
@@ -2,22 +2,45 @@ from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
-from dotenv import load_dotenv
-
-# ✅ .env ფაილის ჩატვირთვა
-load_dotenv()
+import threading
+import time
+from app.config import SECRET_KEY, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.ttl_cache import TTLCache
 
 # ✅ Password hashing context (bcrypt)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# ✅ JWT settings .env-დან
-SECRET_KEY = os.getenv("SECRET_KEY")
-if not SECRET_KEY or len(SECRET_KEY) < 32:
-    raise RuntimeError("SECRET_KEY must be set in .env and be at least 32 characters long for security.")
+# ✅ JWT settings app.config-დან (მოწმდება validate_settings()-ით startup-ზე)
+ALGORITHM = JWT_ALGORITHM
+
+# ✅ შემოწმებული token payload-ების ქეში (JWT ხელმოწერის შემოწმება ყოველ request-ზე აღარ ხდება)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+TOKEN_CACHE_TTL = float(os.getenv("TOKEN_CACHE_TTL", 300))  # წამი (token-ის exp-ზე მეტხანს არასდროს)
+_token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+# ✅ bcrypt-ის ცალკე worker pool (event loop არ იბლოკება ჰეშირების დროს)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))  # რიგის მაქს. სიღრმე
 
-ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+_hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_hash_lock = threading.Lock()
+_hash_pending = 0
+_hash_stats = {
+    "count": 0,
+    "rejected": 0,
+    "total_seconds": 0.0,
+    "max_seconds": 0.0,
+}
+
+
+class PasswordHashingBusy(Exception):
+    """ჰეშირების რიგი სავსეა - მოთხოვნა უნდა განმეორდეს მოგვიანებით"""
 
 
 def get_password_hash(password: str) -> str:
@@ -41,6 +64,51 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_hash_job(func, *args):
+    """bcrypt ოპერაციის გაშვება worker pool-ში, რიგის სიღრმის ლიმიტით"""
+    global _hash_pending
+    with _hash_lock:
+        if _hash_pending >= PASSWORD_HASH_MAX_PENDING:
+            _hash_stats["rejected"] += 1
+            raise PasswordHashingBusy()
+        _hash_pending += 1
+
+    started = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        elapsed = time.perf_counter() - started  # რიგში ლოდინი + ჰეშირება
+        with _hash_lock:
+            _hash_pending -= 1
+            _hash_stats["count"] += 1
+            _hash_stats["total_seconds"] += elapsed
+            _hash_stats["max_seconds"] = max(_hash_stats["max_seconds"], elapsed)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash worker pool-ში (async endpoint-ებისთვის)"""
+    return await _run_hash_job(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password worker pool-ში (async endpoint-ებისთვის)"""
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+
+def get_password_hash_stats() -> dict:
+    """ჰეშირების latency და რიგის მდგომარეობა"""
+    with _hash_lock:
+        count = _hash_stats["count"]
+        return {
+            "workers": PASSWORD_HASH_WORKERS,
+            "max_pending": PASSWORD_HASH_MAX_PENDING,
+            "pending": _hash_pending,
+            **_hash_stats,
+            "avg_seconds": _hash_stats["total_seconds"] / count if count else 0.0,
+        }
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     JWT access token-ის შექმნა
@@ -52,7 +120,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.utcnow() + timedelta(minutes=int(ACCESS_TOKEN_EXPIRE_MINUTES))
     
     # ❌ არა data.copy() - ყველაფერს იღებს
     # ✅ მხოლოდ კონკრეტული ველები
@@ -78,8 +146,24 @@ def decode_access_token(token: str) -> Optional[dict]:
     Output: {"sub": "luka", "exp": 1699463200}
             or None (თუ invalid)
     """
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    # ✅ ქეშში მხოლოდ token-ის ვადის ამოწურვამდე
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _token_cache.set(token, payload, ttl=exp - time.time())
+    return payload
+
+
+def invalidate_user_tokens(user_id: int) -> int:
+    """მომხმარებლის ქეშირებული token payload-ების წაშლა (როლის/სტატუსის ცვლილებისას)"""
+    return _token_cache.pop_where(lambda token, payload: payload.get("id") == user_id)
+
+
+def get_token_cache_stats() -> dict:
+    return _token_cache.stats()
\ No newline at end of file
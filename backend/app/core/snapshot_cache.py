@@ -0,0 +1,339 @@
+"""
+Dedaena Snapshot Cache - საჯარო payload-ის in-process ქეში
+
+თითოეული ცხრილისთვის ინახება აწყობილი payload და version, რომლითაც ის
+აიგო. მოდერატორის ყოველი წარმატებული ცვლილება (commit-ის შემდეგ) ზრდის
+version-ს, რის შემდეგაც ძველი snapshot-ები აღარ გამოიყენება.
+
+invalidate() მხოლოდ მიმდინარე worker-ს ეხება. სხვა worker-ები ცვლილებას
+content_changes-ის MAX(version)-ით იგებენ: არაუმეტეს ერთხელ
+SNAPSHOT_VERSION_CHECK_INTERVAL წამში ქეში DB-ის version-ს ამოწმებს და
+მისი შეცვლისას ყველა snapshot-ს აუქმებს.
+
+snapshot აგებისას payload ერთხელ სერიალიზდება JSON-ად და ინახება
+identity, gzip და (თუ brotli დაყენებულია) br ფორმით, strong ETag-ით.
+brotli-ს quality request-ის დროს აგებისას SNAPSHOT_BROTLI_QUALITY-ია
+(სწრაფი), startup-ის warmup-ში კი SNAPSHOT_WARM_BROTLI_QUALITY (მაქსიმალური).
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.core.content_changes import current_version
+from app.database import new_async_session
+
+try:
+    import brotli
+except ImportError:  # brotli არჩევითია - მის გარეშე მხოლოდ gzip
+    brotli = None
+
+SNAPSHOT_BROTLI_QUALITY = int(os.getenv("SNAPSHOT_BROTLI_QUALITY", 5))
+SNAPSHOT_WARM_BROTLI_QUALITY = int(os.getenv("SNAPSHOT_WARM_BROTLI_QUALITY", 11))
+SNAPSHOT_CACHE_MAX_ENTRIES = int(os.getenv("SNAPSHOT_CACHE_MAX_ENTRIES", 256))
+SNAPSHOT_VERSION_CHECK_INTERVAL = float(os.getenv("SNAPSHOT_VERSION_CHECK_INTERVAL", 1))  # წამი
+
+logger = logging.getLogger("snapshot_cache")
+
+
+class Snapshot:
+    """ერთი ცხრილის აწყობილი payload, მისი version და წინასწარ შეკუმშული body"""
+
+    def __init__(self, key: Hashable, version: int, payload: Any,
+                 brotli_quality: int = SNAPSHOT_BROTLI_QUALITY):
+        self.key = key
+        self.version = version
+        self.payload = payload
+
+        self.body = json.dumps(
+            jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        self.etag_base = hashlib.sha256(self.body).hexdigest()[:32]
+        self.encoded = {"identity": self.body}
+        self.encoded["gzip"] = gzip.compress(self.body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            self.encoded["br"] = brotli.compress(self.body, quality=brotli_quality)
+
+    def etag(self, encoding: str) -> str:
+        """strong ETag - ყოველ content-coding-ს საკუთარი validator აქვს"""
+        if encoding == "identity":
+            return f'"{self.etag_base}"'
+        return f'"{self.etag_base}-{encoding}"'
+
+
+class SnapshotCache:
+    """
+    Versioned snapshot ქეში write-driven invalidation-ით
+
+    snapshot-ების რაოდენობა შეზღუდულია (max_entries, LRU) - key-ები
+    საჯარო request-ის პარამეტრებიდანაც იგება.
+
+    version_loader-ის მითითებისას get_or_build_async ყოველ version_check_interval
+    წამში ერთხელ კითხულობს წყაროს version-ს (სხვა worker-ების ცვლილებები).
+
+    გამოყენება:
+        snapshot = dedaena_cache.get_or_build(table_name, lambda: build(table_name))
+        ...
+        db.commit()
+        dedaena_cache.invalidate()
+    """
+
+    def __init__(self, max_entries: int = SNAPSHOT_CACHE_MAX_ENTRIES,
+                 version_loader: Optional[Callable[[], Awaitable[int]]] = None,
+                 version_check_interval: float = SNAPSHOT_VERSION_CHECK_INTERVAL):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._version_loader = version_loader
+        self.version_check_interval = version_check_interval
+        self._source_version: Optional[int] = None  # ბოლოს ნანახი წყაროს version
+        self._checked_at = float("-inf")
+        self._version_check: Optional[asyncio.Task] = None
+        self.version_checks = 0
+        self.version_check_errors = 0
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Snapshot]" = OrderedDict()
+        self.evictions = 0
+        self._inflight: Dict[tuple, asyncio.Task] = {}  # (key, version) -> აგება მიმდინარეობს
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, key: Hashable) -> Optional[Snapshot]:
+        """მიმდინარე version-ის snapshot ან None"""
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None and snapshot.version == self._version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            return None
+
+    def is_warm(self, key: Hashable) -> bool:
+        """არის თუ არა მიმდინარე version-ის snapshot (hit/miss სტატისტიკის გარეშე)"""
+        with self._lock:
+            snapshot = self._entries.get(key)
+            return snapshot is not None and snapshot.version == self._version
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], Any]) -> Snapshot:
+        """
+        snapshot ქეშიდან, ან builder()-ით აგება და შენახვა
+
+        თუ აგების დროს version შეიცვალა (პარალელური ცვლილება), აგებული
+        payload მაინც ბრუნდება, მაგრამ ქეშში არ ინახება.
+        """
+        snapshot = self.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        version = self._version
+        snapshot = Snapshot(key, version, builder())
+        self._store(snapshot)
+        return snapshot
+
+    async def get_or_build_async(self, key: Hashable, builder: Callable[[], Awaitable[Any]],
+                                 brotli_quality: int = SNAPSHOT_BROTLI_QUALITY) -> Snapshot:
+        """
+        get_or_build-ის async ვარიანტი
+
+        - ერთი და იმავე key-ის პარალელური miss-ები ერთ აგებას ელოდებიან
+        - აგება ცალკე asyncio.Task-ია, რომელსაც ყველა მომლოდინე shield-ით
+          ელოდება: ერთი კლიენტის გათიშვა აგებას და სხვა მომლოდინეებს არ
+          აუქმებს. ამიტომ builder-მა request-ის session არ უნდა გამოიყენოს
+          (app.database.new_async_session)
+        - JSON სერიალიზაცია და შეკუმშვა thread-ში სრულდება (event loop არ იბლოკება)
+        """
+        await self.refresh_version()
+        snapshot = self.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        version = self._version
+        task = self._inflight.get((key, version))
+        if task is None:
+            task = asyncio.ensure_future(self._build(key, version, builder, brotli_quality))
+            self._inflight[(key, version)] = task
+            task.add_done_callback(partial(self._build_done, (key, version)))
+        return await asyncio.shield(task)
+
+    async def refresh_version(self):
+        """
+        წყაროს version-ის შემოწმება (არაუმეტეს ერთხელ version_check_interval-ში)
+
+        პარალელური მოთხოვნები ერთ შემოწმებას ელოდებიან; შეცდომისას ქეში
+        არსებული snapshot-ებით აგრძელებს მუშაობას.
+        """
+        if self._version_loader is None:
+            return
+        if time.monotonic() - self._checked_at < self.version_check_interval:
+            return
+        task = self._version_check
+        if task is None:
+            task = asyncio.ensure_future(self._check_version())
+            self._version_check = task
+        await asyncio.shield(task)
+
+    async def _check_version(self):
+        try:
+            source_version = await self._version_loader()
+        except Exception as e:
+            self.version_check_errors += 1
+            logger.warning(f"Snapshot version check failed: {e}")
+            source_version = None
+        finally:
+            self._checked_at = time.monotonic()
+            self._version_check = None
+        self.version_checks += 1
+        with self._lock:
+            if source_version is None or source_version == self._source_version:
+                return
+            if self._source_version is not None:
+                self._version += 1
+                self._entries.clear()
+            self._source_version = source_version
+
+    async def _build(self, key: Hashable, version: int, builder: Callable[[], Awaitable[Any]],
+                     brotli_quality: int) -> Snapshot:
+        payload = await builder()
+        snapshot = await asyncio.to_thread(Snapshot, key, version, payload, brotli_quality)
+        self._store(snapshot)
+        return snapshot
+
+    def _store(self, snapshot: Snapshot):
+        """შენახვა, თუ აგების დროს version არ შეცვლილა; ყველაზე ძველი გამოყენების snapshot-ები იშლება"""
+        with self._lock:
+            if snapshot.version != self._version:
+                return
+            self._entries[snapshot.key] = snapshot
+            self._entries.move_to_end(snapshot.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _build_done(self, inflight_key: tuple, task: asyncio.Task):
+        if self._inflight.get(inflight_key) is task:
+            del self._inflight[inflight_key]
+        if not task.cancelled():
+            task.exception()  # მომლოდინის არარსებობისას warning-ის თავიდან აცილება
+
+    def invalidate(self) -> int:
+        """
+        version-ის გაზრდა და ყველა snapshot-ის გაუქმება (მიმდინარე worker-ში;
+        მომდევნო get_or_build_async წყაროს version-ს თავიდან წაიკითხავს)
+
+        Returns:
+            ახალი version
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._checked_at = float("-inf")
+            return self._version
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "source_version": self._source_version,
+                "evictions": self.evictions,
+                "version_checks": self.version_checks,
+                "version_check_errors": self.version_check_errors,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding header-ის parse: {encoding: q}"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def _choose_encoding(snapshot: Snapshot, accept_encoding: str) -> str:
+    accepted = _accepted_encodings(accept_encoding or "")
+    for encoding in ("br", "gzip"):
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in snapshot.encoded and q > 0:
+            return encoding
+    return "identity"
+
+
+def _etag_matches(snapshot: Snapshot, encoding: str, if_none_match: str) -> bool:
+    """
+    If-None-Match შედარება (weak comparison, RFC 7232 2.3.2) არჩეული
+    encoding-ის სრულ ETag-თან - gzip-ის ETag br პასუხს არ ემთხვევა
+    """
+    etag = snapshot.etag(encoding)
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def snapshot_response(snapshot: Snapshot, request: Request) -> Response:
+    """
+    snapshot-ის HTTP პასუხი: 304 თუ კლიენტის ETag ემთხვევა, წინააღმდეგ
+    შემთხვევაში წინასწარ შეკუმშული body შესაბამისი Content-Encoding-ით
+    """
+    encoding = _choose_encoding(snapshot, request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": snapshot.etag(encoding),
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(snapshot, encoding, if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=snapshot.encoded[encoding],
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+async def load_content_version() -> int:
+    """content_changes-ის MAX(version) - ყველა worker-ისთვის საერთო კონტენტის version"""
+    async with new_async_session() as db:
+        return await db.run_sync(current_version)
+
+
+# ✅ საჯარო დედაენის payload-ის ქეში (words/sentences/stories ცხრილები ყველა
+# დედაენის ცხრილისთვის საერთოა, ამიტომ ცვლილება მთლიან ქეშს აუქმებს)
+dedaena_cache = SnapshotCache(version_loader=load_content_version)
@@ -0,0 +1,237 @@
+"""
+Text Analysis - ფრონტენდის utils/textAnalysis.js-ის სერვერული ვერსია
+
+იგივე ნორმალიზაცია და დაყოფა (normalizeWord, splitTextToSentences,
+analyzeSentence, detectWordTour, detectTourForText), ოღონდ სიტყვების
+მეპი (buildWordsMap) ბრაუზერში ყოველ ჩატვირთვაზე კი არ იგება, არამედ
+სერვერზე ინახება ცხრილის მიხედვით:
+
+    ნორმალიზებული სიტყვა -> {ტურის position: რამდენჯერ გვხვდება}
+
+ინდექსი ერთხელ იგება (ორი query) და შემდეგ ახლდება ინკრემენტულად
+content_changes-იდან: ყოველ გამოყენებაზე მოწმდება მიმდინარე version და
+თავიდან იკითხება მხოლოდ შეცვლილი ტურები (words_ids) და სიტყვები. ასე
+მოდერატორის add/update/delete ყველა worker-ის ინდექსში აისახება.
+
+ტურის გამოცნობა (ასო -> position) app.core.letter_index-ით ხდება.
+sync helper-ები sync Session-ზეა (AsyncSession-იდან run_sync-ით).
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import text
+from app.core.content_changes import changes_since, current_version
+from app.core.letter_index import LetterIndex, get_letter_index
+from app.core.tour_content import fetch_items_by_ids, normalize_ids
+
+_PUNCTUATION = re.compile(r"[.,!?;:()\"'«»—\-]")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_PARAGRAPH_SPLIT = re.compile(r"\n+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_word(word) -> str:
+    """პუნქტუაციის წაშლა, lowercase და trim (normalizeWord)"""
+    if not isinstance(word, str):
+        return ""
+    return _PUNCTUATION.sub("", word).lower().strip()
+
+
+def split_text_to_sentences(content: str) -> List[str]:
+    if not content or not isinstance(content, str):
+        return []
+    return [s for s in _SENTENCE_SPLIT.split(content) if s.strip()]
+
+
+def split_text_to_paragraphs(content: str) -> List[str]:
+    if not content or not isinstance(content, str):
+        return []
+    return [p for p in _PARAGRAPH_SPLIT.split(content) if p.strip()]
+
+
+class WordIndex:
+    """ერთი დედაენის ცხრილის სიტყვების ინდექსი"""
+
+    def __init__(self, version: int):
+        self.version = version
+        self.lock = threading.Lock()
+        self.tour_words: Dict[int, List[int]] = {}       # position -> words_ids
+        self.words: Dict[int, str] = {}                  # word id -> ტექსტი
+        self.word_tours: Dict[int, Dict[int, int]] = {}  # word id -> {position: count}
+        self.positions: Dict[str, Dict[int, int]] = {}   # normalized -> {position: count}
+
+    def _count(self, normalized: str, position: int, delta: int):
+        if not normalized:
+            return
+        counts = self.positions.setdefault(normalized, {})
+        counts[position] = counts.get(position, 0) + delta
+        if counts[position] <= 0:
+            del counts[position]
+            if not counts:
+                del self.positions[normalized]
+
+    def set_tour(self, position: int, word_ids: List[int]):
+        """ტურის words_ids-ის ჩანაცვლება ([] - ტური წაიშალა)"""
+        for word_id in self.tour_words.pop(position, []):
+            self._count(normalize_word(self.words.get(word_id)), position, -1)
+            tours = self.word_tours.get(word_id, {})
+            tours[position] = tours.get(position, 0) - 1
+            if tours.get(position, 0) <= 0:
+                tours.pop(position, None)
+            if not tours:
+                self.word_tours.pop(word_id, None)
+        if not word_ids:
+            return
+        self.tour_words[position] = list(word_ids)
+        for word_id in word_ids:
+            self._count(normalize_word(self.words.get(word_id)), position, 1)
+            tours = self.word_tours.setdefault(word_id, {})
+            tours[position] = tours.get(position, 0) + 1
+
+    def set_word(self, word_id: int, content: Optional[str]):
+        """სიტყვის ტექსტის შეცვლა (None - სიტყვა წაიშალა)"""
+        if word_id not in self.words and word_id not in self.word_tours:
+            return  # ამ ცხრილის ტურებში არ გვხვდება
+        old = normalize_word(self.words.get(word_id))
+        new = normalize_word(content)
+        for position, count in self.word_tours.get(word_id, {}).items():
+            self._count(old, position, -count)
+            self._count(new, position, count)
+        if content is None:
+            self.words.pop(word_id, None)
+        else:
+            self.words[word_id] = content
+
+    def tours_for(self, normalized: str) -> List[int]:
+        return sorted(self.positions.get(normalized, ()))
+
+
+def _load_tours(db, table_name: str, positions: Optional[List[int]] = None) -> Dict[int, List[int]]:
+    positions_sql = "WHERE position = ANY(:positions)" if positions is not None else ""
+    rows = db.execute(
+        text(f"SELECT position, words_ids FROM {table_name} {positions_sql}"),
+        {"positions": positions} if positions is not None else {}
+    ).fetchall()
+    return {row.position: normalize_ids(row.words_ids) for row in rows}
+
+
+def _load_words(db, word_ids: Iterable[int]) -> Dict[int, str]:
+    return {word_id: row.get("word") for word_id, row in fetch_items_by_ids(db, "words", list(word_ids)).items()}
+
+
+def _build_index(db, table_name: str) -> WordIndex:
+    index = WordIndex(current_version(db))
+    tours = _load_tours(db, table_name)
+    index.words = _load_words(db, {word_id for ids in tours.values() for word_id in ids})
+    for position in sorted(tours):
+        index.set_tour(position, tours[position])
+    return index
+
+
+def _refresh_index(db, table_name: str, index: WordIndex, latest: int):
+    """content_changes-იდან მხოლოდ შეცვლილი სიტყვების და ტურების თავიდან წაკითხვა"""
+    version, changed = changes_since(db, index.version)
+    word_ids = list(changed.get("words", {}))
+    if word_ids:
+        texts = _load_words(db, word_ids)
+        for word_id in word_ids:
+            index.set_word(word_id, texts.get(word_id))
+    positions = list(changed.get(table_name, {}))
+    if positions:
+        tours = _load_tours(db, table_name, positions)
+        missing = {i for ids in tours.values() for i in ids if i not in index.words}
+        index.words.update(_load_words(db, missing))
+        for position in positions:
+            index.set_tour(position, tours.get(position, []))
+    index.version = max(version, latest)
+
+
+_indexes: Dict[str, WordIndex] = {}
+_lock = threading.Lock()
+
+
+def get_word_index(db, table_name: str) -> WordIndex:
+    """
+    ცხრილის ინდექსი - ქეშიდან (მიმდინარე version-მდე განახლებული) ან აგება
+
+    ინდექსის დაბლოკვა (index.lock) გამომძახებლის საქმეა, თუ პარალელურად კითხულობს.
+    """
+    latest = current_version(db)
+    index = _indexes.get(table_name)
+    if index is None or latest < index.version:  # content_changes გასუფთავდა
+        index = _build_index(db, table_name)
+        with _lock:
+            _indexes[table_name] = index
+        return index
+    if latest > index.version:
+        with index.lock:
+            if latest > index.version:
+                _refresh_index(db, table_name, index, latest)
+    return index
+
+
+def invalidate_word_index(table_name: Optional[str] = None):
+    with _lock:
+        if table_name is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(table_name, None)
+
+
+def detect_word_tour(word: str, word_index: WordIndex, letter_index: LetterIndex) -> Optional[dict]:
+    """სიტყვის ტურები (existsInTours) და სავარაუდო ტური ასოებით (detectWordTour)"""
+    normalized = normalize_word(word)
+    if not normalized:
+        return None
+    estimated = letter_index.resolve(word)
+    return {
+        "word": normalized,
+        "originalWord": word,
+        "normalized": normalized,
+        "existsInTours": word_index.tours_for(normalized),
+        "estimatedTour": {"position": estimated[0], "letter": estimated[1]} if estimated else None,
+    }
+
+
+def analyze_sentence(sentence: str, word_index: WordIndex, letter_index: LetterIndex) -> List[dict]:
+    """წინადადების სიტყვების ანალიზი (analyzeSentence)"""
+    if not isinstance(sentence, str) or not sentence.strip():
+        return []
+    words = (detect_word_tour(word, word_index, letter_index) for word in _WHITESPACE.split(sentence) if word)
+    return [info for info in words if info is not None]
+
+
+def detect_tour_for_text(content: str, letter_index: LetterIndex) -> Optional[dict]:
+    """ტექსტის ტური: ყველაზე მაღალი position ტექსტში გამოყენებული ასოებიდან (detectTourForText)"""
+    if not content or not content.strip():
+        return None
+    content = content.strip()
+    estimated = letter_index.resolve(content)
+    if not estimated:
+        return None
+    position, letter = estimated
+    return {
+        "position": position,
+        "letter": letter,
+        "confidence": "high" if content[0] == letter else "medium",
+    }
+
+
+def analyze_batch(db, table_name: str, sentences: List[str], words: List[str]) -> dict:
+    """ბევრი წინადადების და სიტყვის ანალიზი ერთი ინდექსით (run_sync helper)"""
+    word_index = get_word_index(db, table_name)
+    letter_index = get_letter_index(db, table_name)
+    with word_index.lock:
+        return {
+            "sentences": [
+                {
+                    "sentence": sentence,
+                    "tour": detect_tour_for_text(sentence, letter_index),
+                    "words": analyze_sentence(sentence, word_index, letter_index),
+                }
+                for sentence in sentences
+            ],
+            "words": [detect_word_tour(word, word_index, letter_index) for word in words],
+            "version": word_index.version,
+        }
@@ -0,0 +1,107 @@
+"""
+Tour Content Loader - დედაენის ტურების შიგთავსის ერთიანი ჩატვირთვა
+
+ყველა ტურის *_ids მასივიდან ID-ები ერთ ჯერზე გროვდება და თითოეული
+შიგთავსის ცხრილი (words, sentences, proverbs, toreads) მხოლოდ ერთხელ
+იკითხება. query-ების რაოდენობა არ არის დამოკიდებული ტურების რაოდენობაზე.
+"""
+
+from typing import Dict, List, Optional
+from sqlalchemy import text
+
+# შიდა სვეტები, რომლებიც payload-ში არ გადის (content_hash - bytea, migrations/005)
+INTERNAL_COLUMNS = {"content_hash"}
+
+# ✅ ტურის ids სვეტი -> (შიგთავსის ცხრილი, payload-ის გასაღები)
+CONTENT_COLUMNS = [
+    ("words_ids", "words"),
+    ("sentences_ids", "sentences"),
+    ("proverbs_ids", "proverbs"),
+    ("toreads_ids", "toreads"),
+]
+
+
+def normalize_ids(ids) -> List[int]:
+    """ids შეიძლება იყოს array, tuple ან comma-separated სტრინგი"""
+    if not ids:
+        return []
+    if isinstance(ids, str):
+        return [int(i) for i in ids.split(',') if i.strip().isdigit()]
+    return [int(i) for i in ids if i is not None]
+
+
+def fetch_items_by_ids(db, table: str, ids, playable_only: bool = False) -> Dict[int, dict]:
+    """ერთი query-ით ამოიღებს ცხრილის ჩანაწერებს და აბრუნებს {id: row} მეპს"""
+    ids = sorted(set(normalize_ids(ids)))
+    if not ids:
+        return {}
+    playable_sql = " AND is_playable = true" if playable_only else ""
+    rows = db.execute(
+        text(f"SELECT * FROM {table} WHERE id = ANY(:ids){playable_sql}"),
+        {"ids": ids}
+    ).fetchall()
+    return {
+        row.id: {key: value for key, value in row._mapping.items() if key not in INTERNAL_COLUMNS}
+        for row in rows
+    }
+
+
+def load_tour_content(db, table_name: str, playable_only: bool = False,
+                      positions: Optional[List[int]] = None) -> List[dict]:
+    """
+    ყველა ტური შესაბამისი ელემენტებით (words, sentences, proverbs, toreads)
+
+    Args:
+        db: SQLAlchemy session
+        table_name: დედაენის ცხრილი (მაგ. gogebashvili_1_with_ids)
+        playable_only: მხოლოდ is_playable = true ელემენტები (საჯარო API)
+        positions: მხოლოდ ეს ტურები (delta sync); None - ყველა
+
+    Returns:
+        ტურების სია position-ის მიხედვით; თითოეული ტურის ელემენტები
+        დალაგებულია მისი *_ids მასივის რიგით
+    """
+    positions_sql = "WHERE position = ANY(:positions)" if positions is not None else ""
+    tours = db.execute(
+        text(f"""
+            SELECT
+                id,
+                position,
+                letter,
+                words_ids,
+                sentences_ids,
+                proverbs_ids,
+                toreads_ids
+            FROM {table_name}
+            {positions_sql}
+            ORDER BY position
+        """),
+        {"positions": list(positions)} if positions is not None else {}
+    ).fetchall()
+
+    # 1. ყველა ტურის ids ერთ სიაში (ცხრილების მიხედვით)
+    tour_ids = [
+        {key: normalize_ids(getattr(tour, column)) for column, key in CONTENT_COLUMNS}
+        for tour in tours
+    ]
+
+    # 2. თითოეული ცხრილი მხოლოდ ერთხელ
+    items_by_table = {}
+    for _, key in CONTENT_COLUMNS:
+        all_ids = [i for ids in tour_ids for i in ids[key]]
+        items_by_table[key] = fetch_items_by_ids(db, key, all_ids, playable_only)
+
+    # 3. ტურების აწყობა მეხსიერებაში, *_ids-ის რიგის შენარჩუნებით
+    data = []
+    for tour, ids in zip(tours, tour_ids):
+        entry = {
+            "id": tour.id,
+            "position": tour.position,
+            "letter": tour.letter,
+        }
+        for _, key in CONTENT_COLUMNS:
+            items = items_by_table[key]
+            # dict.fromkeys - დუბლიკატების მოცილება რიგის შენარჩუნებით
+            entry[key] = [items[i] for i in dict.fromkeys(ids[key]) if i in items]
+        data.append(entry)
+    return data
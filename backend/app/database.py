@@ -3,36 +3,98 @@ Database connection და Session management
 """
 
 import os
-from dotenv import load_dotenv
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from app.config import DATABASE_URL
 
-# ✅ .env ფაილის ჩატვირთვა
-load_dotenv()
+# ✅ Engine-ები იქმნება init_engines()-ით (lifespan / პირველი session),
+# არა import-ისას - კონფიგურაცია ჯერ მოწმდება, fork-ის შემდეგ კი
+# worker-ი საკუთარ pool-ს ქმნის
+engine = None
+async_engine = None
 
-# ✅ Database URL მხოლოდ .env-დან (hardcoded default-ების გარეშე)
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
-
-if not SQLALCHEMY_DATABASE_URL:
-    raise RuntimeError("DATABASE_URL must be set in .env for database connection.")
-
-print(f"📊 Database URL: {SQLALCHEMY_DATABASE_URL}")
-
-# ✅ SQLAlchemy Engine (Database connection pool)
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False
-)
-
-# ✅ Session Factory
+# ✅ Session Factory (bind ემატება init_engines()-ში)
 SessionLocal = sessionmaker(
     autocommit=False,
+    autoflush=False
+)
+
+# ✅ Async Session Factory - async endpoint-ებისთვის, event loop-ის დაბლოკვის გარეშე
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
     autoflush=False,
-    bind=engine
+    expire_on_commit=False
 )
 
+
+def _to_async_url(url: str) -> str:
+    """postgresql:// ან postgresql+psycopg2:// -> postgresql+asyncpg://"""
+    scheme, sep, rest = url.partition("://")
+    if scheme in ("postgres", "postgresql", "postgresql+psycopg2"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+def init_engines():
+    """
+    SQLAlchemy engine-ების (sync და asyncpg) შექმნა - idempotent
+
+    Database URL მხოლოდ .env-დან (hardcoded default-ების გარეშე).
+    """
+    global engine, async_engine
+    if engine is not None:
+        return
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL must be set in .env for database connection.")
+
+    engine = create_engine(
+        DATABASE_URL,
+        pool_pre_ping=True,
+        echo=False
+    )
+    async_engine = create_async_engine(
+        os.getenv("ASYNC_DATABASE_URL") or _to_async_url(DATABASE_URL),
+        pool_pre_ping=True,
+        pool_size=int(os.getenv("ASYNC_DB_POOL_SIZE", 10)),
+        max_overflow=int(os.getenv("ASYNC_DB_MAX_OVERFLOW", 5)),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        echo=False
+    )
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+
+
+async def dispose_engines():
+    """pool-ების დახურვა shutdown-ზე"""
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        engine.dispose()
+
+
+def reset_engines_after_fork():
+    """მშობელი პროცესისგან მიღებული კავშირების მიტოვება (დახურვის გარეშე)"""
+    if engine is not None:
+        engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
+
+
+def get_pool_status() -> dict:
+    """engine-ების pool-ის მდგომარეობა (readiness probe)"""
+    if async_engine is None:
+        return {"initialized": False}
+    pool = async_engine.pool
+    return {
+        "initialized": True,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
 # ✅ Base Class
 Base = declarative_base()
 
@@ -52,6 +114,7 @@ def get_db():
     Yields:
         SessionLocal: Database session
     """
+    init_engines()
     db = SessionLocal()
     try:
         yield db  # ← FastAPI მიიღებს ამ session-ს
@@ -59,6 +122,39 @@ def get_db():
         db.close()  # ← request-ის შემდეგ ავტომატურად დაიხურება
 
 
+# ✅ Async Dependency Function
+async def get_async_db():
+    """
+    Async Database Session Dependency
+    
+    FastAPI-ში გამოიყენება ასე:
+    
+    @router.get("/items")
+    async def get_items(db: AsyncSession = Depends(get_async_db)):
+        result = await db.execute(text("SELECT ..."))
+        ...
+        # sync helper-ები (Session-ზე დაწერილი) იმავე ტრანზაქციაში:
+        data = await db.run_sync(load_tour_content, table_name)
+    
+    Yields:
+        AsyncSession: Async database session
+    """
+    init_engines()
+    async with AsyncSessionLocal() as db:
+        yield db  # ← session request-ის შემდეგ ავტომატურად დაიხურება
+
+
+def new_async_session() -> AsyncSession:
+    """
+    request-ისგან დამოუკიდებელი AsyncSession (async with-ით)
+
+    ფონური ამოცანებისთვის (მაგ. snapshot-ის საერთო აგება), რომლებიც
+    request-ის დასრულების/გაუქმების შემდეგაც შეიძლება გაგრძელდეს.
+    """
+    init_engines()
+    return AsyncSessionLocal()
+
+
 # ✅ Database-ის ინიციალიზაცია (ცხრილების შექმნა)
 def init_db():
     """
@@ -67,6 +163,7 @@ def init_db():
     ეშვება მხოლოდ პირველ გაშვებაზე ან migration-ების გარეშე.
     """
     import app.models  # ყველა Model-ის import
+    init_engines()
     Base.metadata.create_all(bind=engine)
     print("✅ Database tables created successfully!")
 
@@ -77,6 +174,7 @@ def check_db_connection():
     Database-თან კავშირის შემოწმება
     """
     try:
+        init_engines()
         # Test connection
         with engine.connect() as connection:
             connection.execute("SELECT 1")
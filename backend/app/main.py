@@ -3,13 +3,49 @@ Dedaena FastAPI Application
 """
 
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import routes_dedaena, auth, admin, moderator  # ✅
-from dotenv import load_dotenv
+from app.config import validate_settings, close_pool  # ✅ .env იტვირთება აქ, ყველა სხვა მოდულამდე
+from app.database import init_engines, dispose_engines
+from app.api.endpoints import routes_dedaena, auth, admin, moderator, health, metrics  # ✅
+from app.core.audit import audit_writer
+from app.core.metrics import MetricsMiddleware, start_multiprocess, stop_multiprocess
+from app.core.progress import init_progress_schema
+from app.core.rate_limit import warn_if_not_shared
+
+
+# ✅ worker-ის startup-ზე წინასწარ ასაგები ცხრილები (მძიმით გამოყოფილი)
+DEDAENA_WARMUP_TABLES = [t for t in os.getenv("DEDAENA_WARMUP_TABLES", "gogebashvili_1_with_ids").split(",") if t]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    worker-ის სასიცოცხლო ციკლი
+
+    startup: კონფიგურაციის შემოწმება (შეცდომისას worker არ ეშვება) ->
+    DB engine-ები -> user_progress-ის სქემა (PROGRESS_ENCODING) ->
+    dedaena snapshot-ის warmup -> ready.
+    shutdown: ready=False, audit რიგის ჩაწერა, pool-ების დახურვა.
+    """
+    validate_settings()
+    warn_if_not_shared(int(os.getenv("WEB_CONCURRENCY") or 1))
+    init_engines()
+    start_multiprocess()
+    await init_progress_schema()
+    app.state.warmup_tables = DEDAENA_WARMUP_TABLES
+    await routes_dedaena.warm_dedaena_cache(DEDAENA_WARMUP_TABLES)
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        audit_writer.stop()
+        stop_multiprocess()
+        close_pool()
+        await dispose_engines()
 
-# ✅ .env ფაილის ჩატვირთვა
-load_dotenv()
 
 # FastAPI App
 app = FastAPI(
@@ -17,7 +53,9 @@ app = FastAPI(
     description="Georgian Learning Platform API",
     version="1.0.0",
     docs_url=None,
+    lifespan=lifespan,
 )
+app.state.ready = False
 
 # CORS Middleware
 origins = os.getenv("ALLOWED_ORIGINS", "").split(",")
@@ -30,6 +68,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ Metrics Middleware - latency/DB query-ები route template-ის მიხედვით (GET /metrics)
+app.add_middleware(MetricsMiddleware)
+
 
 # @app.post("/api/health")
 # def health_check():
@@ -57,6 +98,12 @@ app.include_router(moderator.router, prefix="/api/moderator", tags=["Moderator"]
 # Dedaena routes - დედაენას მონაცემები (საჯარო)
 app.include_router(routes_dedaena.router, prefix="/api/dedaena", tags=["Dedaena"])
 
+# ✅ Health routes - liveness/readiness probe-ები (/health/live, /health/ready)
+app.include_router(health.router, prefix="/health", tags=["Health"])
+
+# ✅ Metrics - Prometheus scrape endpoint (/metrics)
+app.include_router(metrics.router, tags=["Metrics"])
+
 
 # ✅ Database კავშირის პარამეტრები .env-დან
 DB_HOST = os.getenv("POSTGRES_HOST")
@@ -81,6 +128,6 @@ def root():
 
 
 @app.get("/health")
-def health():
-    """Health check endpoint"""
-    return {"status": "healthy"}
\ No newline at end of file
+def health_check():
+    """Health check endpoint (liveness; readiness - /health/ready)"""
+    return {"status": "healthy"}
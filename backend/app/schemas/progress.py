@@ -7,3 +7,14 @@ class SaveProgressRequest(BaseModel):
     found_word_ids: List[int] = []
     found_sentence_ids: List[int] = []
     found_proverb_ids: List[int] = []
+
+
+class UpdateProgressRequest(BaseModel):
+    """ინკრემენტული შენახვა: მხოლოდ ახლად ნაპოვნი / მოხსნილი ID-ები"""
+    dedaena_table: str
+    add_word_ids: List[int] = []
+    add_sentence_ids: List[int] = []
+    add_proverb_ids: List[int] = []
+    remove_word_ids: List[int] = []
+    remove_sentence_ids: List[int] = []
+    remove_proverb_ids: List[int] = []
@@ -0,0 +1,3 @@
+"""
+Load-test harness - python -m benchmarks.run --help
+"""
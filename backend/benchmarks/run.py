@@ -0,0 +1,224 @@
+"""
+Load-test runner - სცენარების კონკურენტული გაშვება, p50/p95/p99, RPS და
+baseline-თან შედარება
+
+გაშვება (backend საქაღალდიდან, პირველად: pip install -r requirements-dev.txt
+და python -m benchmarks.seed):
+    python -m benchmarks.run --start-server                      # ყველა სცენარი
+    python -m benchmarks.run --base-url http://localhost:8000 -s full_book -s progress
+    python -m benchmarks.run --start-server --save-baseline      # baseline-ის განახლება
+
+--start-server უშვებს gunicorn-ს (gunicorn_conf.py) .env-ის ბაზაზე
+(docker-compose-ის Postgres ან ლოკალური) და rate limit-ებს ზრდის, რომ
+გაიზომოს გამტარუნარიანობა და არა ლიმიტი. login_burst-ში 429/503
+("rejected") ცალკე ითვლება.
+
+რეგრესიად ითვლება: შეცდომები (4xx/5xx/კავშირი) მოთხოვნების 1%-ზე მეტი,
+p95 ან p99 baseline-ზე thresholds.latency-ზე მეტად გაზრდილი, ან RPS
+thresholds.rps-ზე მეტად შემცირებული. რეგრესიისას exit code 1.
+
+baseline-ის გარეშე სცენარი ვერ შედარდება - ასეთ შემთხვევაში runner
+გამოიტანს გაფრთხილებას და ასევე აბრუნებს exit code 1-ს (--allow-missing-baseline
+მხოლოდ გაფრთხილებას ტოვებს). baseline-ები იქმნება --save-baseline-ით
+საცნობარო გარემოში და ინახება benchmarks/baselines.json-ში. პირველი
+გაშვება (ცარიელი baselines.json, CI ან ახალი მანქანა):
+    python -m benchmarks.run --start-server --allow-missing-baseline
+    python -m benchmarks.run --start-server --save-baseline      # საცნობარო გარემოში, შემდეგ commit
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import httpx
+from benchmarks.scenarios import SCENARIOS, Recorder
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# --start-server-ისას: ლიმიტები არ უნდა ზღუდავდეს გაზომვას
+BENCH_SERVER_ENV = {
+    "AUTH_RATE_LIMIT": "1000000",
+    "AUTH_IP_RATE_LIMIT": "1000000",
+    "PROGRESS_RATE_LIMIT": "1000000",
+    "MODERATOR_RATE_LIMIT": "1000000",
+    "ACCESS_LOG": "/dev/null",
+}
+
+MAX_ERROR_RATE = 0.01  # შეცდომების წილი, რომლის ზემოთ შედეგი რეგრესიაა baseline-ის მიუხედავად
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    latencies = sorted(recorder.latencies)
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "ok": recorder.ok,
+        "rejected": recorder.rejected,
+        "errors": recorder.errors,
+    }
+
+
+async def run_scenario(name: str, options) -> dict:
+    scenario = SCENARIOS[name](options)
+    limits = httpx.Limits(max_connections=options.concurrency, max_keepalive_connections=options.concurrency)
+    async with httpx.AsyncClient(base_url=options.base_url, limits=limits, timeout=30) as client:
+        await scenario.setup(client, options.concurrency)
+        recorder = Recorder()
+        recorder.enabled = False
+        measure_from = time.perf_counter() + options.warmup
+        deadline = measure_from + options.duration
+
+        async def worker(index: int):
+            iteration = 0
+            while time.perf_counter() < deadline:
+                if not recorder.enabled and time.perf_counter() >= measure_from:
+                    recorder.enabled = True
+                await scenario.step(client, recorder, index, iteration)
+                iteration += 1
+
+        await asyncio.gather(*(worker(i) for i in range(options.concurrency)))
+        return summarize(recorder, options.duration)
+
+
+def compare(results: Dict[str, dict], baselines: dict) -> List[str]:
+    """რეგრესიების სია (ცარიელი - ყველაფერი ზღვრებშია)"""
+    thresholds = baselines.get("thresholds", {})
+    latency_limit = 1 + thresholds.get("latency", 0.2)
+    rps_limit = 1 - thresholds.get("rps", 0.15)
+    regressions = []
+    for name, result in results.items():
+        attempts = result["ok"] + result["rejected"] + result["errors"]
+        if attempts and result["errors"] / attempts > MAX_ERROR_RATE:
+            regressions.append(f"{name}: {result['errors']} errors out of {attempts} requests")
+        base = baselines.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if base.get(key) and result[key] > base[key] * latency_limit:
+                regressions.append(f"{name}: {key} {result[key]} > baseline {base[key]} × {latency_limit:.2f}")
+        if base.get("rps") and result["rps"] < base["rps"] * rps_limit:
+            regressions.append(f"{name}: rps {result['rps']} < baseline {base['rps']} × {rps_limit:.2f}")
+    return regressions
+
+
+def missing_baselines(results: Dict[str, dict], baselines: dict) -> List[str]:
+    """სცენარები, რომელთაც baseline არ აქვთ (მათი latency/RPS არ მოწმდება)"""
+    scenarios = baselines.get("scenarios", {})
+    return [name for name in results if not scenarios.get(name)]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    env = {**os.environ, **BENCH_SERVER_ENV, "BIND": f"127.0.0.1:{port}"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn_conf.py", "app.main:app"],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health/ready", timeout=2).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("server did not become ready in 60s")
+
+
+def print_results(results: Dict[str, dict], baselines: dict):
+    header = f"{'scenario':<22}{'requests':>9}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rejected':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<22}{r['requests']:>9}{r['rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['rejected']:>10}{r['errors']:>8}")
+        base = baselines.get("scenarios", {}).get(name)
+        if base:
+            print(f"{'  baseline':<22}{'':>9}{base.get('rps', '-'):>10}{base.get('p50_ms', '-'):>10}"
+                  f"{base.get('p95_ms', '-'):>10}{base.get('p99_ms', '-'):>10}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="გასაშვები სცენარი (რამდენჯერმე; default - ყველა)")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--start-server", action="store_true", help="gunicorn-ის გაშვება --port-ზე")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--table", default="gogebashvili_1_with_ids")
+    parser.add_argument("--users", type=int, default=20, help="bench_user_* რაოდენობა (benchmarks.seed)")
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    parser.add_argument("-d", "--duration", type=float, default=20, help="გაზომვის ხანგრძლივობა (წამი)")
+    parser.add_argument("--warmup", type=float, default=3, help="გაუზომავი warmup (წამი)")
+    parser.add_argument("--baseline", type=Path, default=BASELINES_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="შედეგების baseline-ად შენახვა")
+    parser.add_argument("--allow-missing-baseline", action="store_true",
+                        help="baseline-ის არქონა მხოლოდ გაფრთხილებაა (exit code 0)")
+    parser.add_argument("--json", type=Path, help="შედეგების ჩაწერა JSON ფაილში")
+    options = parser.parse_args(argv)
+
+    baselines = json.loads(options.baseline.read_text()) if options.baseline.exists() else {}
+    server = None
+    if options.start_server:
+        server = start_server(options.port)
+        options.base_url = f"http://127.0.0.1:{options.port}"
+
+    results = {}
+    try:
+        for name in options.scenario or list(SCENARIOS):
+            print(f"▶ {name}: {SCENARIOS[name].description} (c={options.concurrency}, {options.duration}s)")
+            results[name] = asyncio.run(run_scenario(name, options))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=60)
+
+    print()
+    print_results(results, baselines)
+    if options.json:
+        options.json.write_text(json.dumps(results, indent=2))
+
+    if options.save_baseline:
+        baselines.setdefault("scenarios", {}).update({
+            name: {key: r[key] for key in ("rps", "p50_ms", "p95_ms", "p99_ms")} for name, r in results.items()
+        })
+        baselines["concurrency"] = options.concurrency
+        options.baseline.write_text(json.dumps(baselines, indent=2, ensure_ascii=False) + "\n")
+        print(f"\n✅ Baseline saved: {options.baseline}")
+        return 0
+
+    regressions = compare(results, baselines)
+    for regression in regressions:
+        print(f"❌ {regression}")
+    missing = missing_baselines(results, baselines)
+    if missing:
+        print(f"⚠️ No baseline for: {', '.join(missing)} - latency/RPS not compared "
+              f"(record one with --save-baseline in the reference environment)")
+    if not regressions and not missing:
+        print("\n✅ No regressions against baseline")
+    if regressions or (missing and not options.allow_missing_baseline):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
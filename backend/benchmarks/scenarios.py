@@ -0,0 +1,149 @@
+"""
+Benchmark სცენარები
+
+თითოეულ სცენარს აქვს setup (ერთხელ, დროის აღრიცხვის გარეშე) და step
+(ერთი იტერაცია ერთ worker-ზე). step-ის ყველა HTTP მოთხოვნა იზომება
+Recorder-ით - სცენარის შედეგი ამ მოთხოვნების latency-ებია.
+"""
+
+import random
+import time
+from typing import Dict, List
+import httpx
+from benchmarks.seed import BENCH_PASSWORD, MODERATOR_USERNAME, user_names
+
+
+class Recorder:
+    """latency-ები და სტატუსები: ok (2xx/304), rejected (429/503), errors (დანარჩენი)"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.ok = 0
+        self.rejected = 0
+        self.errors = 0
+        self.enabled = True  # warmup-ის დროს False
+
+    async def request(self, client: httpx.AsyncClient, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            if self.enabled:
+                self.errors += 1
+            return None
+        if self.enabled:
+            self.latencies.append(time.perf_counter() - started)
+            if response.status_code < 400:
+                self.ok += 1
+            elif response.status_code in (429, 503):
+                self.rejected += 1
+            else:
+                self.errors += 1
+        return response
+
+
+async def login(client: httpx.AsyncClient, username: str) -> str:
+    response = await client.post("/api/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def load_book(client: httpx.AsyncClient, table: str) -> dict:
+    response = await client.get(f"/api/dedaena/{table}")
+    response.raise_for_status()
+    data = response.json()["data"]
+    if not data:
+        raise RuntimeError(f"{table} is empty - seed dedaena content first")
+    return {
+        "positions": [tour["position"] for tour in data],
+        "word_ids": [word["id"] for tour in data for word in tour.get("words") or []],
+    }
+
+
+class Scenario:
+    name = ""
+    description = ""
+
+    def __init__(self, options):
+        self.options = options
+
+    async def setup(self, client: httpx.AsyncClient, workers: int):
+        pass
+
+    async def step(self, client: httpx.AsyncClient, recorder: Recorder, worker: int, iteration: int):
+        raise NotImplementedError
+
+
+class FullBook(Scenario):
+    name = "full_book"
+    description = "GET /api/dedaena/{table} (snapshot, gzip)"
+
+    async def step(self, client, recorder, worker, iteration):
+        await recorder.request(client, "GET", f"/api/dedaena/{self.options.table}",
+                               headers={"Accept-Encoding": "gzip"})
+
+
+class PositionStep(Scenario):
+    name = "position_step"
+    description = "GET /api/dedaena/{table}/position/{n}, ტურების თანმიმდევრობით"
+
+    async def setup(self, client, workers):
+        self.positions = (await load_book(client, self.options.table))["positions"]
+
+    async def step(self, client, recorder, worker, iteration):
+        position = self.positions[(worker + iteration) % len(self.positions)]
+        await recorder.request(client, "GET", f"/api/dedaena/{self.options.table}/position/{position}")
+
+
+class Progress(Scenario):
+    name = "progress"
+    description = "POST /progress/update + GET /progress/{table}, worker-ზე ერთი მომხმარებელი"
+
+    async def setup(self, client, workers):
+        self.word_ids = (await load_book(client, self.options.table))["word_ids"] or [1]
+        names = user_names(self.options.users)
+        self.tokens: Dict[int, str] = {}
+        for worker in range(workers):
+            self.tokens[worker] = await login(client, names[worker % len(names)])
+
+    async def step(self, client, recorder, worker, iteration):
+        headers = {"Authorization": f"Bearer {self.tokens[worker]}"}
+        found = random.sample(self.word_ids, min(3, len(self.word_ids)))
+        await recorder.request(client, "POST", "/api/dedaena/progress/update", headers=headers, json={
+            "dedaena_table": self.options.table,
+            "add_word_ids": found,
+        })
+        await recorder.request(client, "GET", f"/api/dedaena/progress/{self.options.table}", headers=headers)
+
+
+class LoginBurst(Scenario):
+    name = "login_burst"
+    description = "POST /api/auth/login (bcrypt worker pool, auth rate limit)"
+
+    async def setup(self, client, workers):
+        self.names = user_names(self.options.users)
+
+    async def step(self, client, recorder, worker, iteration):
+        await recorder.request(client, "POST", "/api/auth/login", json={
+            "username": self.names[(worker + iteration) % len(self.names)],
+            "password": BENCH_PASSWORD,
+        })
+
+
+class ModeratorAddDelete(Scenario):
+    name = "moderator_add_delete"
+    description = "PATCH .../word/add და .../word/delete (handle_dynamic_content_action)"
+
+    async def setup(self, client, workers):
+        self.position = (await load_book(client, self.options.table))["positions"][0]
+        self.token = await login(client, MODERATOR_USERNAME)
+
+    async def step(self, client, recorder, worker, iteration):
+        headers = {"Authorization": f"Bearer {self.token}"}
+        url = f"/api/moderator/dedaena/{self.options.table}/word"
+        body = {"position": self.position, "content": f"bench-{worker}-{iteration}-{random.getrandbits(32)}"}
+        await recorder.request(client, "PATCH", f"{url}/add", headers=headers, json=body)
+        await recorder.request(client, "PATCH", f"{url}/delete", headers=headers, json=body)
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (FullBook, PositionStep, Progress, LoginBurst, ModeratorAddDelete)}
@@ -0,0 +1,66 @@
+"""
+Benchmark-ის მომხმარებლების შექმნა (idempotent)
+
+bench_user_0 ... bench_user_{N-1} (ჩვეულებრივი) და bench_moderator,
+ყველა ერთი პაროლით (BENCH_PASSWORD). არსებულ მომხმარებელს პაროლი და
+როლი უახლდება. დედაენის შიგთავსი უნდა არსებობდეს ბაზაში
+(ან შეიქმნას scripts-ით).
+
+გაშვება (backend საქაღალდიდან):
+    python -m benchmarks.seed --users 20
+"""
+
+import argparse
+import os
+from app.config import get_db_connection
+from app.core.security import get_password_hash
+
+BENCH_PASSWORD = os.getenv("BENCH_PASSWORD", "bench-password")
+MODERATOR_USERNAME = "bench_moderator"
+
+
+def user_names(count: int):
+    return [f"bench_user_{i}" for i in range(count)]
+
+
+def seed_users(count: int):
+    hashed = get_password_hash(BENCH_PASSWORD)  # ერთი ჰეში ყველასთვის - bcrypt ნელია
+    users = [(name, False) for name in user_names(count)] + [(MODERATOR_USERNAME, True)]
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cur:
+            for username, is_moder in users:
+                cur.execute(
+                    """
+                    UPDATE users
+                    SET password = %s, is_moder = %s, is_active = TRUE
+                    WHERE username = %s
+                    """,
+                    (hashed, is_moder, username)
+                )
+                if cur.rowcount == 0:
+                    cur.execute(
+                        """
+                        INSERT INTO users (username, email, password, is_active, is_moder)
+                        VALUES (%s, %s, %s, TRUE, %s)
+                        """,
+                        (username, f"{username}@bench.local", hashed, is_moder)
+                    )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    print(f"✅ Benchmark users ready: {count} users + {MODERATOR_USERNAME}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+    seed_users(args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Gunicorn Configuration - production გაშვება რამდენიმე uvicorn worker-ით
+
+გაშვება (backend საქაღალდიდან):
+    gunicorn -c gunicorn_conf.py app.main:app
+
+- worker-ების რაოდენობა: WEB_CONCURRENCY, ან ხელმისაწვდომი CPU-ები
+  (affinity და cgroup-ის cpu.max-ის გათვალისწინებით), მაქს. MAX_WORKERS
+- თითოეული worker იმპორტავს აპლიკაციას fork-ის შემდეგ (PRELOAD_APP=false),
+  ამიტომ DB pool-ები, ქეშები და audit writer worker-ს ეკუთვნის;
+  PRELOAD_APP=true-ზე post_fork აუქმებს მშობლისგან მიღებულ კავშირებს
+- worker ტრაფიკს იღებს startup-ის (dedaena snapshot-ის warmup) შემდეგ
+- SIGTERM: ახალი კავშირები აღარ მიიღება, მიმდინარე request-ები
+  სრულდება GRACEFUL_TIMEOUT წამში, შემდეგ shutdown (audit რიგის ჩაწერა)
+
+- მეტრიკები: METRICS_MULTIPROC_DIR (default - დროებითი საქაღალდე) -
+  /metrics ყველა worker-ის ჯამს აბრუნებს; გარდაცვლილი worker-ის
+  counter-ები child_exit-ში archive-ში გადადის
+- rate limit: RATE_LIMIT_SQLITE_PATH (default - დროებითი ფაილი) - ლიმიტები
+  ყველა worker-ისთვის საერთოა (RATE_LIMIT_REDIS_URL-ის გარეშეც);
+  ცარიელი მნიშვნელობა (RATE_LIMIT_SQLITE_PATH=) თიშავს
+
+ყველა worker-ს საკუთარი DB pool აქვს: კავშირების მაქსიმუმი ≈
+workers × (ASYNC_DB_POOL_SIZE + ASYNC_DB_MAX_OVERFLOW + DB_POOL_MAX_SIZE).
+"""
+
+import math
+import os
+import sys
+import tempfile
+from app.core import metrics_multiprocess
+
+
+def _available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # კონტეინერის CPU quota (cgroup v2)
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# worker-ები env-ს მშობლისგან იღებენ - ყველა ერთ საქაღალდეში წერს
+os.environ.setdefault("METRICS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "dedaena-metrics"))
+os.environ.setdefault("RATE_LIMIT_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "dedaena-rate-limits.sqlite3"))
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", 0)) or min(_available_cpus(), int(os.getenv("MAX_WORKERS", 8)))
+worker_class = "uvicorn.workers.UvicornWorker"
+# worker-ების რაოდენობა app-ისთვის (rate limit-ის startup შემოწმება)
+os.environ.setdefault("WEB_CONCURRENCY", str(workers))
+preload_app = os.getenv("PRELOAD_APP", "false").lower() == "true"
+
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("KEEPALIVE", 5))
+
+accesslog = os.getenv("ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """მშობლისგან მიღებული კავშირების გაუქმება (მხოლოდ PRELOAD_APP=true-ისას)"""
+    if "app.config" in sys.modules:
+        sys.modules["app.config"].reset_pool_after_fork()
+    if "app.database" in sys.modules:
+        sys.modules["app.database"].reset_engines_after_fork()
+    server.log.info(f"Worker {worker.pid} initialized")
+
+
+def child_exit(server, worker):
+    """გარდაცვლილი worker-ის მეტრიკების archive-ში გადატანა"""
+    metrics_multiprocess.mark_process_dead(worker.pid)
+
+
+def _reset_rate_limits():
+    """წინა გაშვების rate limit მრიცხველების წაშლა"""
+    path = os.getenv("RATE_LIMIT_SQLITE_PATH")
+    if not path:
+        return
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def on_starting(server):
+    metrics_multiprocess.reset_directory()
+    _reset_rate_limits()
+    server.log.info(f"Starting {workers} workers on {bind}")
@@ -0,0 +1,7 @@
+-- Audit logs keyset pagination
+-- GET /api/admin/audit/logs ალაგებს (timestamp DESC, id DESC)-ით და
+-- შემდეგ გვერდს იღებს (timestamp, id) < cursor პირობით.
+-- CONCURRENTLY - ცხრილი ინდექსის აგებისას არ იბლოკება (ტრანზაქციის გარეთ გაუშვით).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_audit_logs_timestamp_id
+    ON audit_logs (timestamp DESC, id DESC);
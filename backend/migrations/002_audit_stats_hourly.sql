@@ -0,0 +1,13 @@
+-- Audit statistics rollup
+-- საათობრივი მრიცხველები action/table_name-ის მიხედვით. ივსება audit writer-ის
+-- მიერ audit_logs-ში ჩაწერის იმავე ტრანზაქციაში; GET /api/admin/audit/stats
+-- კითხულობს მხოლოდ ამ ცხრილს.
+-- არსებული ლოგებისთვის: python -m scripts.rebuild_audit_rollups
+
+CREATE TABLE IF NOT EXISTS audit_stats_hourly (
+    bucket      TIMESTAMP NOT NULL,
+    action      TEXT      NOT NULL,
+    table_name  TEXT      NOT NULL,
+    count       BIGINT    NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, action, table_name)
+);
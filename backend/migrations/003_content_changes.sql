@@ -0,0 +1,16 @@
+-- Content change log (delta sync)
+-- ყოველი მოდერატორის ცვლილება იმავე ტრანზაქციაში წერს რიგს: რომელი ცხრილის
+-- რომელი ჩანაწერი შეიცვალა. version არის კონტენტის მონოტონური ვერსია;
+-- GET /api/dedaena/{table_name}/sync?since=N აბრუნებს მხოლოდ N-ის შემდეგ
+-- შეცვლილ ტურებს და ისტორიებს.
+--   source    - words / sentences / proverbs / toreads / stories ან ტურების ცხრილი
+--   record_id - ჩანაწერის id (ტურებისთვის position)
+--   op        - upsert / delete
+
+CREATE TABLE IF NOT EXISTS content_changes (
+    version     BIGSERIAL PRIMARY KEY,
+    source      TEXT      NOT NULL,
+    record_id   INTEGER   NOT NULL,
+    op          TEXT      NOT NULL CHECK (op IN ('upsert', 'delete')),
+    changed_at  TIMESTAMP NOT NULL DEFAULT NOW()
+);
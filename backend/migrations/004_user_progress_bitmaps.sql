@@ -0,0 +1,11 @@
+-- User progress bitmap encoding
+-- PROGRESS_ENCODING=bitmap-ისას ნაპოვნი ელემენტები ინახება კომპაქტურ
+-- bytea სვეტებში (app/core/progress_bitmap.py), *_ids მასივები კი NULL-დება.
+-- ჩატვირთვა ორივე ფორმატს კითხულობს; bitmap-ს უპირატესობა აქვს.
+-- არსებული რიგების კონვერტაცია: python -m scripts.convert_progress_encoding bitmap
+
+ALTER TABLE user_progress
+    ADD COLUMN IF NOT EXISTS found_word_bitmap     BYTEA,
+    ADD COLUMN IF NOT EXISTS found_sentence_bitmap BYTEA,
+    ADD COLUMN IF NOT EXISTS found_proverb_bitmap  BYTEA;
+
@@ -0,0 +1,23 @@
+-- Content hash lookup
+-- words/sentences/proverbs/toreads-ის ტექსტით ძებნა (toggle_playable, delete
+-- content-ით, დუბლიკატი ტურში add-ისას) content_hash-ის ინდექსით ხდება და
+-- არა seq scan-ით თავისუფალ ტექსტურ სვეტზე. content_hash - ნორმალიზებული
+-- ტექსტის md5 (app/core/content_hash.py), ითვლება აპლიკაციაში INSERT/UPDATE-ზე.
+-- *_content_hash_pending - backfill-მდე დარჩენილი რიგები (შემდეგ ცარიელია).
+-- არსებული რიგები: python -m scripts.backfill_content_hash
+-- CONCURRENTLY - ცხრილები ინდექსის აგებისას არ იბლოკება (ტრანზაქციის გარეთ გაუშვით).
+
+ALTER TABLE words     ADD COLUMN IF NOT EXISTS content_hash BYTEA;
+ALTER TABLE sentences ADD COLUMN IF NOT EXISTS content_hash BYTEA;
+ALTER TABLE proverbs  ADD COLUMN IF NOT EXISTS content_hash BYTEA;
+ALTER TABLE toreads   ADD COLUMN IF NOT EXISTS content_hash BYTEA;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_words_content_hash     ON words (content_hash);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sentences_content_hash ON sentences (content_hash);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_proverbs_content_hash  ON proverbs (content_hash);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_toreads_content_hash   ON toreads (content_hash);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_words_content_hash_pending     ON words (id)     WHERE content_hash IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sentences_content_hash_pending ON sentences (id) WHERE content_hash IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_proverbs_content_hash_pending  ON proverbs (id)  WHERE content_hash IS NULL;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_toreads_content_hash_pending   ON toreads (id)   WHERE content_hash IS NULL;
@@ -1,5 +1,7 @@
 """
-Dedaena API Server Startup
+Dedaena API Server Startup (development, auto-reload)
+
+production: gunicorn -c gunicorn_conf.py app.main:app
 """
 
 import uvicorn
@@ -0,0 +1,107 @@
+"""
+content_hash-ის შევსება არსებულ words/sentences/proverbs/toreads რიგებში
+
+რიგები მუშავდება batch-ებად (თითო batch - ცალკე ტრანზაქცია) partial
+ინდექსით (WHERE content_hash IS NULL), ამიტომ სკრიპტის გაშვება შეიძლება
+აპლიკაციის მუშაობისას და შეწყვეტის შემდეგ თავიდან. --rehash - ყველა
+რიგის თავიდან დათვლა (ნორმალიზაციის შეცვლის შემდეგ).
+
+batch-ის რიგები FOR UPDATE-ით იბლოკება: მოდერატორის მიერ დაბლოკილ რიგს
+სკრიპტი ელოდება და არ ტოვებს (keyset-ის კურსორი მასთან აღარ დაბრუნდებოდა).
+ბოლოს მოწმდება, ხომ არ დარჩა შეუვსებელი რიგი (მაგ. ძველი ვერსიის
+აპლიკაციის ჩანაწერი) - ასეთ შემთხვევაში exit code 1 და გაშვება თავიდან.
+
+გაშვება (backend საქაღალდიდან, migrations/005-ის შემდეგ):
+    python -m scripts.backfill_content_hash [--table sentences] [--batch-size 5000]
+"""
+
+import argparse
+import sys
+import time
+import psycopg2
+from psycopg2.extras import execute_values
+from app.config import get_db_connection
+from app.core.content_hash import CONTENT_TABLES, content_hash
+
+
+def backfill_batch(conn, table: str, after: int, batch_size: int, rehash: bool):
+    """
+    ერთი batch-ის შევსება id-ის keyset-ით
+
+    Returns:
+        (დამუშავებული რიგები, ბოლო id)
+    """
+    column = CONTENT_TABLES[table]
+    pending_sql = "TRUE" if rehash else "content_hash IS NULL"
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT id, {column}
+            FROM {table}
+            WHERE {pending_sql} AND id > %s
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE;
+        """, (after, batch_size))
+        rows = cur.fetchall()
+        if not rows:
+            return 0, after
+        execute_values(cur, f"""
+            UPDATE {table} AS t
+            SET content_hash = v.content_hash
+            FROM (VALUES %s) AS v(id, content_hash)
+            WHERE t.id = v.id
+        """, [(row_id, psycopg2.Binary(content_hash(content)) if content is not None else None)
+              for row_id, content in rows],
+            template="(%s, %s::bytea)", page_size=batch_size)
+    conn.commit()
+    return len(rows), rows[-1][0]
+
+
+def count_pending(conn, table: str) -> int:
+    """შეუვსებელი რიგები (content-ით, content_hash-ის გარეშე)"""
+    column = CONTENT_TABLES[table]
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM {table} WHERE content_hash IS NULL AND {column} IS NOT NULL;")
+        pending = cur.fetchone()[0]
+    conn.commit()
+    return pending
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="content_hash backfill")
+    parser.add_argument("--table", action="append", choices=sorted(CONTENT_TABLES),
+                        help="ცხრილი (რამდენჯერმე; default - ყველა)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--rehash", action="store_true", help="უკვე შევსებული რიგების თავიდან დათვლა")
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    remaining = {}
+    try:
+        for table in args.table or list(CONTENT_TABLES):
+            started = time.perf_counter()
+            total = 0
+            after = 0
+            while True:
+                filled, after = backfill_batch(conn, table, after, args.batch_size, args.rehash)
+                if not filled:
+                    break
+                total += filled
+                print(f"   ... {table}: {total} rows")
+            print(f"✅ {table}.content_hash: {total} rows in {time.perf_counter() - started:.1f}s")
+            pending = count_pending(conn, table)
+            if pending:
+                remaining[table] = pending
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    for table, pending in remaining.items():
+        print(f"❌ {table}: {pending} rows still without content_hash - run the backfill again")
+    return 1 if remaining else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
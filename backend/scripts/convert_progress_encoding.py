@@ -0,0 +1,113 @@
+"""
+user_progress-ის რიგების კონვერტაცია array <-> bitmap ფორმატებს შორის
+
+    bitmap - *_ids მასივები -> *_bitmap სვეტები (მასივები NULL-დება)
+    array  - *_bitmap სვეტები -> *_ids მასივები (PROGRESS_ENCODING=array-ზე დაბრუნებამდე)
+
+რიგები მუშავდება batch-ებად (თითო batch - ცალკე ტრანზაქცია), ამიტომ
+სკრიპტის გაშვება შეიძლება აპლიკაციის მუშაობისას და შეწყვეტის შემდეგ
+თავიდან. დასრულების შემდეგ რეკომენდებულია VACUUM (ANALYZE) user_progress.
+
+გაშვება (backend საქაღალდიდან, migrations/004-ის შემდეგ):
+    python -m scripts.convert_progress_encoding bitmap [--batch-size 1000]
+"""
+
+import argparse
+import time
+import psycopg2
+from psycopg2.extras import execute_values
+from app.config import get_db_connection
+from app.core import progress_bitmap
+
+ARRAY_COLUMNS = ("found_word_ids", "found_sentence_ids", "found_proverb_ids")
+BITMAP_COLUMNS = ("found_word_bitmap", "found_sentence_bitmap", "found_proverb_bitmap")
+
+
+def _to_bitmap(row):
+    return tuple(psycopg2.Binary(progress_bitmap.encode(ids or [])) for ids in row)
+
+
+def _to_array(row):
+    # bitmap-ის არარსებობისას - არსებული მასივი (ნაწილობრივ კონვერტირებული რიგი)
+    bitmaps, arrays = row[:3], row[3:]
+    return tuple(
+        progress_bitmap.decode(bitmap) if bitmap is not None else list(array or [])
+        for bitmap, array in zip(bitmaps, arrays)
+    )
+
+
+def convert_batch(conn, target: str, after: tuple, batch_size: int):
+    """
+    ერთი batch-ის კონვერტაცია (user_id, dedaena_table) keyset-ით
+
+    Returns:
+        (დამუშავებული რიგები, ბოლო გასაღები)
+    """
+    if target == "bitmap":
+        pending_sql = " AND ".join(f"{column} IS NULL" for column in BITMAP_COLUMNS)
+        source_columns = ARRAY_COLUMNS
+        convert, template = _to_bitmap, "(%s, %s, %s::bytea, %s::bytea, %s::bytea)"
+        set_sql = ", ".join(
+            [f"{column} = v.{column}" for column in BITMAP_COLUMNS]
+            + [f"{column} = NULL" for column in ARRAY_COLUMNS]
+        )
+        value_columns = BITMAP_COLUMNS
+    else:
+        pending_sql = " OR ".join(f"{column} IS NOT NULL" for column in BITMAP_COLUMNS)
+        source_columns = BITMAP_COLUMNS + ARRAY_COLUMNS
+        convert, template = _to_array, "(%s, %s, %s::int[], %s::int[], %s::int[])"
+        set_sql = ", ".join(
+            [f"{column} = v.{column}" for column in ARRAY_COLUMNS]
+            + [f"{column} = NULL" for column in BITMAP_COLUMNS]
+        )
+        value_columns = ARRAY_COLUMNS
+
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT user_id, dedaena_table, {", ".join(source_columns)}
+            FROM user_progress
+            WHERE ({pending_sql}) AND (user_id, dedaena_table) > (%s, %s)
+            ORDER BY user_id, dedaena_table
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED;
+        """, (*after, batch_size))
+        rows = cur.fetchall()
+        if not rows:
+            return 0, after
+        execute_values(cur, f"""
+            UPDATE user_progress AS p
+            SET {set_sql}
+            FROM (VALUES %s) AS v(user_id, dedaena_table, {", ".join(value_columns)})
+            WHERE p.user_id = v.user_id AND p.dedaena_table = v.dedaena_table
+        """, [(row[0], row[1], *convert(row[2:])) for row in rows], template=template, page_size=batch_size)
+    conn.commit()
+    return len(rows), (rows[-1][0], rows[-1][1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="user_progress array <-> bitmap conversion")
+    parser.add_argument("target", choices=["bitmap", "array"])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    total = 0
+    after = (-1, "")
+    conn = get_db_connection()
+    try:
+        while True:
+            converted, after = convert_batch(conn, args.target, after, args.batch_size)
+            if not converted:
+                break
+            total += converted
+            print(f"   ... {total} rows")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    print(f"✅ user_progress -> {args.target}: {total} rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
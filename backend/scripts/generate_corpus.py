@@ -0,0 +1,347 @@
+"""
+სინთეზური კორპუსი - გოგებაშვილის ცხრილის მსგავსი დიდი წიგნი COPY-ით
+
+ქმნის ახალ დედაენის ცხრილს (--table, სტრუქტურა --template-იდან) და
+ავსებს words, sentences, proverbs, toreads, stories, users, user_progress
+და audit_logs ცხრილებს. ტურების *_ids მასივები და stories.sentences_ids
+ახლად ჩასმულ ID-ებზე მიუთითებს.
+
+- დეტერმინისტული: ერთი --seed -> ერთი და იგივე შიგთავსი (ID-ები
+  ცხრილების sequence-ის მიმდინარე მნიშვნელობიდან იწყება)
+- ქართული ანბანი, ასოების სიხშირე Zipf-ის მიხედვით; ტური N-ის სიტყვები
+  შეიცავს ტურის ასოს და მხოლოდ მანამდე ნასწავლ ასოებს; სიტყვების,
+  წინადადებების და ანდაზების რაოდენობა ტურზე - დახრილი განაწილებით
+- ID-ების ბლოკი იჯავშნება sequence-ში (setval), ამიტომ აპლიკაციის
+  პარალელური ჩასმები არ კონფლიქტობს; ჩატვირთვა - COPY FROM STDIN
+- audit_logs-ის შემდეგ audit_stats_hourly თავიდან იგება
+
+არსებული ცხრილები (words, sentences, ...) მხოლოდ ივსება - სინთეზური
+შიგთავსი რეალურის გვერდით ხვდება, ამიტომ გაუშვით სატესტო ბაზაზე.
+
+გაშვება (backend საქაღალდიდან):
+    python -m scripts.generate_corpus --table gogebashvili_synth --tours 2000 \\
+        --words 2000000 --sentences 1000000 --seed 42
+"""
+
+import argparse
+import io
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Sequence
+from app.config import get_db_connection
+from app.core import progress_bitmap
+from app.core.content_hash import content_hash
+from app.core.audit import rebuild_audit_rollups
+from app.core.progress import PROGRESS_ENCODING
+from app.core.security import get_password_hash
+
+GEORGIAN = [chr(code) for code in range(0x10D0, 0x10F1)]  # ა ... ჰ (33 ასო)
+WORD_LENGTHS = range(2, 13)
+WORD_LENGTH_WEIGHTS = [4, 8, 12, 14, 14, 12, 10, 8, 6, 4, 3]
+SENTENCE_ENDINGS = [".", ".", ".", ".", "!", "?"]
+PLAYABLE_RATIO = 0.95
+COPY_CHUNK_ROWS = 50000
+AUDIT_ACTIONS = ["CREATE", "UPDATE", "DELETE", "TOGGLE_PLAYABLE"]
+AUDIT_DAYS = 90
+SYNTH_PASSWORD = "synth-password"
+PROGRESS_MAX_FOUND = 2000  # ნაპოვნი სიტყვები ერთ მომხმარებელზე (მაქს.)
+
+
+# ✅ COPY text format
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (list, tuple)):
+        return "{" + ",".join(str(v) for v in value) + "}"
+    if isinstance(value, bytes):
+        return "\\\\x" + value.hex()
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def copy_rows(cur, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+    """rows-ის ჩატვირთვა COPY-ით COPY_CHUNK_ROWS-იან ნაწილებად"""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    total = 0
+    buffer = io.StringIO()
+    pending = 0
+    for row in rows:
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+        pending += 1
+        if pending >= COPY_CHUNK_ROWS:
+            buffer.seek(0)
+            cur.copy_expert(sql, buffer)
+            total += pending
+            buffer, pending = io.StringIO(), 0
+    if pending:
+        buffer.seek(0)
+        cur.copy_expert(sql, buffer)
+        total += pending
+    return total
+
+
+def reserve_ids(conn, table: str, count: int) -> int:
+    """count ცალი თანმიმდევრული ID-ის დაჯავშნა table-ის sequence-ში; აბრუნებს პირველს"""
+    if count == 0:
+        return 0
+    with conn.cursor() as cur:
+        cur.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+        cur.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+        sequence = cur.fetchone()[0]
+        if sequence is None:
+            raise RuntimeError(f"{table}.id has no sequence")
+        cur.execute(f"SELECT GREATEST((SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), nextval(%s))", (sequence,))
+        start = cur.fetchone()[0]
+        cur.execute("SELECT setval(%s, %s)", (sequence, start + count - 1))
+    conn.commit()
+    return start
+
+
+class Corpus:
+    """დეტერმინისტული გენერატორი (ყველა შემთხვევითობა ერთი Random-იდან)"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        ranks = list(range(len(GEORGIAN)))
+        self.rng.shuffle(ranks)
+        self.letter_weights = [1 / (rank + 1) ** 0.8 for rank in ranks]
+
+    def counts(self, tours: int, total: int, shape: float) -> List[int]:
+        """total-ის განაწილება ტურებზე (gamma, shape < 1 - ბევრი ცარიელი ტური)"""
+        if total == 0:
+            return [0] * tours
+        raw = [self.rng.gammavariate(shape, 1.0) for _ in range(tours)]
+        scale = total / sum(raw)
+        counts = [int(value * scale) for value in raw]
+        for i in self.rng.sample(range(tours), min(tours, total - sum(counts))):
+            counts[i] += 1
+        return counts
+
+    def word(self, letter: str, learned: int) -> str:
+        length = self.rng.choices(WORD_LENGTHS, WORD_LENGTH_WEIGHTS)[0]
+        letters = self.rng.choices(GEORGIAN[:learned], self.letter_weights[:learned], k=length)
+        letters[self.rng.randrange(length)] = letter
+        return "".join(letters)
+
+    def sentence(self, vocabulary: List[str], tour_start: int, tour_end: int, length: int) -> str:
+        """სიტყვები ნასწავლი ლექსიკიდან, ნახევარი - მიმდინარე ტურიდან"""
+        words = []
+        for _ in range(length):
+            if tour_end > tour_start and self.rng.random() < 0.5:
+                words.append(vocabulary[self.rng.randrange(tour_start, tour_end)])
+            else:
+                words.append(vocabulary[self.rng.randrange(tour_end)])
+        return " ".join(words) + self.rng.choice(SENTENCE_ENDINGS)
+
+    def playable(self) -> bool:
+        return self.rng.random() < PLAYABLE_RATIO
+
+
+def generate(conn, options):
+    corpus = Corpus(options.seed)
+    rng = corpus.rng
+    tours = options.tours
+    word_counts = [max(1, n) for n in corpus.counts(tours, options.words, 2.0)]
+    sentence_counts = corpus.counts(tours, options.sentences, 2.0)
+    proverb_counts = corpus.counts(tours, options.proverbs, 0.5)
+    toread_counts = corpus.counts(tours, options.toreads, 0.5)
+
+    word_start = reserve_ids(conn, "words", sum(word_counts))
+    sentence_start = reserve_ids(conn, "sentences", sum(sentence_counts))
+    proverb_start = reserve_ids(conn, "proverbs", sum(proverb_counts))
+    toread_start = reserve_ids(conn, "toreads", sum(toread_counts))
+
+    vocabulary: List[str] = []
+    sentences: List[str] = []
+    words_rows, sentence_rows, proverb_rows, toread_rows, tour_rows = [], [], [], [], []
+    word_tour_ends: List[int] = []  # ტურის ბოლო სიტყვის ინდექსი (progress-ისთვის)
+
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {options.table} (LIKE {options.template} INCLUDING ALL)")
+        cur.execute(f"TRUNCATE {options.table}")
+
+        for position in range(1, tours + 1):
+            index = position - 1
+            letter = GEORGIAN[index % len(GEORGIAN)]
+            learned = min(len(GEORGIAN), position)
+            tour_start = len(vocabulary)
+
+            ids = {"words": [], "sentences": [], "proverbs": [], "toreads": []}
+            texts = {"words": [], "sentences": [], "proverbs": [], "toreads": []}
+            for _ in range(word_counts[index]):
+                word = corpus.word(letter, learned)
+                row_id = word_start + len(vocabulary)
+                vocabulary.append(word)
+                words_rows.append((row_id, word, content_hash(word), corpus.playable()))
+                ids["words"].append(row_id)
+                texts["words"].append(word)
+            word_tour_ends.append(len(vocabulary))
+
+            for _ in range(sentence_counts[index]):
+                sentence = corpus.sentence(vocabulary, tour_start, len(vocabulary), rng.randint(3, 12))
+                row_id = sentence_start + len(sentences)
+                sentences.append(sentence)
+                sentence_rows.append((row_id, sentence, content_hash(sentence), corpus.playable()))
+                ids["sentences"].append(row_id)
+                texts["sentences"].append(sentence)
+
+            for _ in range(proverb_counts[index]):
+                proverb = corpus.sentence(vocabulary, tour_start, len(vocabulary), rng.randint(4, 10))
+                row_id = proverb_start + len(proverb_rows)
+                proverb_rows.append((row_id, proverb, content_hash(proverb), corpus.playable()))
+                ids["proverbs"].append(row_id)
+                texts["proverbs"].append(proverb)
+
+            for _ in range(toread_counts[index]):
+                toread = " ".join(
+                    corpus.sentence(vocabulary, tour_start, len(vocabulary), rng.randint(3, 12))
+                    for _ in range(rng.randint(3, 15))
+                )
+                row_id = toread_start + len(toread_rows)
+                toread_rows.append((row_id, toread, content_hash(toread), corpus.playable()))
+                ids["toreads"].append(row_id)
+                texts["toreads"].append(toread)
+
+            tour_rows.append((
+                position, position, letter,
+                ids["words"], ids["sentences"], ids["proverbs"], ids["toreads"],
+                json.dumps(texts["words"], ensure_ascii=False),
+                json.dumps(texts["sentences"], ensure_ascii=False),
+                json.dumps(texts["proverbs"], ensure_ascii=False),
+                "\n\n".join(texts["toreads"]),
+                len(texts["words"]), len(texts["sentences"]),
+                bool(texts["proverbs"]), bool(texts["toreads"]),
+            ))
+
+        # ✅ ჩატვირთვა (ერთი ტრანზაქცია - შეცდომისას არაფერი რჩება)
+        loaded = {
+            "words": copy_rows(cur, "words", ("id", "word", "content_hash", "is_playable"), words_rows),
+            "sentences": copy_rows(cur, "sentences", ("id", "sentence", "content_hash", "is_playable"), sentence_rows),
+            "proverbs": copy_rows(cur, "proverbs", ("id", "proverb", "content_hash", "is_playable"), proverb_rows),
+            "toreads": copy_rows(cur, "toreads", ("id", "toread", "content_hash", "is_playable"), toread_rows),
+            options.table: copy_rows(cur, options.table, (
+                "id", "position", "letter", "words_ids", "sentences_ids", "proverbs_ids", "toreads_ids",
+                "words", "sentences", "proverbs", "reading",
+                "word_count", "sentence_count", "has_proverbs", "has_reading",
+            ), tour_rows),
+        }
+        del words_rows, proverb_rows, toread_rows, tour_rows
+
+        # ✅ ისტორიები - გრძელი, არსებული წინადადებების თანმიმდევრობით
+        story_rows = []
+        for number in range(options.stories if sentences else 0):
+            length = min(len(sentences), max(20, int(rng.lognormvariate(4.4, 0.6))))
+            first = rng.randrange(len(sentences) - length + 1)
+            story_ids = [sentence_start + i for i in range(first, first + length)]
+            story_rows.append((
+                f"ისტორია {number + 1}", " ".join(sentences[first:first + length]),
+                "story", "synthetic", story_ids, corpus.playable(),
+            ))
+        loaded["stories"] = copy_rows(
+            cur, "stories", ("title", "story", "story_type", "source", "sentences_ids", "is_playable"), story_rows
+        )
+        del story_rows, sentences
+    conn.commit()
+
+    # ✅ მომხმარებლები, პროგრესი და audit
+    user_start = reserve_ids(conn, "users", options.users)
+    hashed = get_password_hash(SYNTH_PASSWORD)
+    user_names = [f"synth_{options.seed}_{i}" for i in range(options.users)]
+    with conn.cursor() as cur:
+        loaded["users"] = copy_rows(cur, "users", ("id", "username", "email", "password", "is_active"), (
+            (user_start + i, name, f"{name}@synth.local", hashed, True) for i, name in enumerate(user_names)
+        ))
+
+        def progress_rows():
+            for i in range(min(options.progress_rows, options.users)):
+                # უმეტესობა წიგნის დასაწყისშია (ექსპონენციალური განაწილება)
+                reached = min(tours, 1 + int(rng.expovariate(20 / tours)))
+                reached_words = word_tour_ends[reached - 1]
+                found_count = min(PROGRESS_MAX_FOUND, int(reached_words * 0.7))
+                found = sorted(word_start + w for w in rng.sample(range(reached_words), found_count))
+                if PROGRESS_ENCODING == "bitmap":
+                    yield (user_start + i, options.table, None, progress_bitmap.encode(found), datetime.now())
+                else:
+                    yield (user_start + i, options.table, found, None, datetime.now())
+
+        loaded["user_progress"] = copy_rows(
+            cur, "user_progress",
+            ("user_id", "dedaena_table", "found_word_ids", "found_word_bitmap", "updated_at"),
+            progress_rows()
+        )
+
+        now = datetime.now()
+        total_words = len(vocabulary)
+
+        def audit_rows():
+            for _ in range(options.audit_rows):
+                i = rng.randrange(options.users) if options.users else 0
+                action = rng.choice(AUDIT_ACTIONS)
+                yield (
+                    user_start + i if options.users else None,
+                    user_names[i] if options.users else "synth",
+                    action, "words",
+                    word_start + rng.randrange(total_words) if total_words else None,
+                    None if action == "CREATE" else vocabulary[rng.randrange(total_words)] if total_words else None,
+                    None if action == "DELETE" else vocabulary[rng.randrange(total_words)] if total_words else None,
+                    f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}",
+                    now - timedelta(seconds=rng.randrange(AUDIT_DAYS * 86400)),
+                )
+
+        loaded["audit_logs"] = copy_rows(cur, "audit_logs", (
+            "user_id", "username", "action", "table_name", "record_id",
+            "old_value", "new_value", "ip_address", "timestamp",
+        ), audit_rows())
+    conn.commit()
+
+    if loaded["audit_logs"]:
+        rebuild_audit_rollups(conn)
+    with conn.cursor() as cur:
+        for table in loaded:
+            cur.execute(f"ANALYZE {table}")
+    conn.commit()
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", default="gogebashvili_synth", help="ახალი დედაენის ცხრილი (თავიდან ივსება)")
+    parser.add_argument("--template", default="gogebashvili_1_with_ids", help="ცხრილი, რომლის სტრუქტურაც კოპირდება")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tours", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=1000000)
+    parser.add_argument("--sentences", type=int, default=500000)
+    parser.add_argument("--proverbs", type=int, default=20000)
+    parser.add_argument("--toreads", type=int, default=10000)
+    parser.add_argument("--stories", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--progress-rows", type=int, default=20000, help="user_progress რიგები (<= --users)")
+    parser.add_argument("--audit-rows", type=int, default=1000000)
+    options = parser.parse_args()
+    if options.table == options.template:
+        parser.error("--table must differ from --template (the table is truncated)")
+    if options.tours < 1 or options.words < options.tours:
+        parser.error("--tours must be >= 1 and --words >= --tours")
+
+    started = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        loaded = generate(conn, options)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    for table, rows in loaded.items():
+        print(f"   {table}: {rows} rows")
+    print(f"✅ Synthetic corpus '{options.table}' (seed {options.seed}) loaded in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
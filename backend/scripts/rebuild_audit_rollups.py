@@ -0,0 +1,30 @@
+"""
+audit_stats_hourly rollup-ის თავიდან აგება audit_logs-დან
+
+გამოიყენება migrations/002_audit_stats_hourly.sql-ის შემდეგ არსებული
+ლოგების backfill-ისთვის, ან თუ მრიცხველები რაიმე მიზეზით აცდა.
+
+გაშვება (backend საქაღალდიდან):
+    python -m scripts.rebuild_audit_rollups
+"""
+
+import time
+from app.config import get_db_connection
+from app.core.audit import rebuild_audit_rollups
+
+
+def main():
+    started = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        rows = rebuild_audit_rollups(conn)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    print(f"✅ audit_stats_hourly rebuilt: {rows} rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+საჯარო დედაენის route-ების SQL query-ების ბიუჯეტი (query_budget)
+
+query-ების რაოდენობა არ უნდა იზრდებოდეს ტურების/position-ების რაოდენობასთან
+ერთად (N+1), ხოლო ქეშირებული snapshot-ი ბაზას თითქმის არ ეხება - მხოლოდ
+კონტენტის version-ის შემოწმება (SnapshotCache.refresh_version).
+"""
+
+import pytest
+from app.core.instrumentation import query_budget
+from app.core.snapshot_cache import dedaena_cache
+from app.core.tour_content import CONTENT_COLUMNS
+from tests.conftest import TEST_DEDAENA_TABLE
+
+BOOK_URL = f"/api/dedaena/{TEST_DEDAENA_TABLE}"
+
+# version შემოწმება + current_version + ტურები + თითო query შიგთავსის ცხრილზე + ისტორიები
+FULL_BOOK_BUILD_QUERIES = 3 + len(CONTENT_COLUMNS) + 1
+
+
+@pytest.fixture
+def cold_cache():
+    """ყველა snapshot-ის გაუქმება - ტესტი აგებას ზომავს"""
+    dedaena_cache.invalidate()
+    yield
+    dedaena_cache.invalidate()
+
+
+def test_full_book_build_query_budget(client, cold_cache):
+    with query_budget(FULL_BOOK_BUILD_QUERIES):
+        response = client.get(BOOK_URL)
+    assert response.status_code == 200
+
+
+def test_full_book_cached_query_budget(client):
+    client.get(BOOK_URL)
+    with query_budget(1):
+        response = client.get(BOOK_URL)
+    assert response.status_code == 200
+
+
+def test_position_query_budget(client, cold_cache, dedaena_positions):
+    # letter index + version შემოწმება + position-ის რიგი
+    with query_budget(3):
+        response = client.get(f"{BOOK_URL}/position/{dedaena_positions[0]}")
+    assert response.status_code == 200
+    with query_budget(2):
+        response = client.get(f"{BOOK_URL}/position/{dedaena_positions[0]}")
+    assert response.status_code == 200
+
+
+def test_batch_positions_query_budget(client, cold_cache, dedaena_positions):
+    # ყველა position ერთი query-ით - ბიუჯეტი იგივეა, რაც ერთი position-ისთვის
+    positions = ",".join(str(p) for p in dedaena_positions)
+    with query_budget(3):
+        response = client.get(f"{BOOK_URL}/positions", params={"positions": positions})
+    assert response.status_code == 200
+    assert [item["position"] for item in response.json()["data"]] == sorted(dedaena_positions)
+
+
+@pytest.mark.parametrize("extra", [[], [10 ** 9]])
+def test_batch_positions_with_missing_are_cached(client, cold_cache, dedaena_positions, extra):
+    # არარსებული position-ები იმავე ბიუჯეტში და იმავე snapshot_response-ით (ETag/304)
+    positions = ",".join(str(p) for p in dedaena_positions[:2] + extra + [10 ** 9 + 1])
+    with query_budget(3):
+        response = client.get(f"{BOOK_URL}/positions", params={"positions": positions})
+    assert response.status_code == 200
+    assert response.json()["missing"] == sorted(extra + [10 ** 9 + 1])
+    assert response.json()["count"] == 2
+    etag = response.headers["etag"]
+    with query_budget(2):
+        response = client.get(f"{BOOK_URL}/positions", params={"positions": positions},
+                              headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_batch_positions_all_missing(client, cold_cache):
+    response = client.get(f"{BOOK_URL}/positions", params={"positions": "1000000001"})
+    assert response.status_code == 200
+    assert response.json() == {"table": TEST_DEDAENA_TABLE, "count": 0, "data": [], "missing": [1000000001]}
+    response = client.get(f"{BOOK_URL}/positions", params={"positions": "1000000001"},
+                          headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
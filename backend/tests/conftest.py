@@ -0,0 +1,56 @@
+"""
+Pytest კონფიგურაცია
+
+DB-ზე დამოკიდებული ტესტები (client fixture) საჭიროებს DATABASE_URL-ით
+მისაწვდომ Postgres-ს მიგრაციებით და კონტენტით (მაგ. scripts.generate_corpus);
+მის გარეშე ისინი გამოტოვებულია.
+
+გაშვება (backend საქაღალდიდან):
+    python -m pytest -q
+"""
+
+import os
+import psycopg2
+import pytest
+
+TEST_DEDAENA_TABLE = os.getenv("TEST_DEDAENA_TABLE", "gogebashvili_1_with_ids")
+
+
+def _database_available(database_url: str) -> bool:
+    try:
+        psycopg2.connect(database_url, connect_timeout=2).close()
+    except psycopg2.Error:
+        return False
+    return True
+
+
+@pytest.fixture(scope="session")
+def database_url():
+    from app.config import DATABASE_URL  # .env-ის ჩატვირთვის შემდეგ
+    if not DATABASE_URL or not _database_available(DATABASE_URL):
+        pytest.skip("Postgres is not available (DATABASE_URL)")
+    return DATABASE_URL
+
+
+@pytest.fixture(scope="session")
+def client(database_url):
+    """TestClient lifespan-ით (startup warmup-ის ჩათვლით)"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def dedaena_positions(database_url):
+    """სატესტო ცხრილის პირველი 5 position"""
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT position FROM {TEST_DEDAENA_TABLE} ORDER BY position LIMIT 5")
+            positions = [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+    if not positions:
+        pytest.skip(f"{TEST_DEDAENA_TABLE} is empty")
+    return positions
@@ -0,0 +1,61 @@
+"""app.config - pooled psycopg2 კავშირების transaction სემანტიკა (საჭიროებს Postgres-ს)"""
+
+import psycopg2
+import pytest
+from app import config
+from app.config import ConnectionPool, pooled_connection
+
+
+@pytest.fixture
+def pool(database_url, monkeypatch):
+    pool = ConnectionPool(1, 2, 5, 30, dsn=database_url)
+    monkeypatch.setattr(config, "_pool", pool)
+    with psycopg2.connect(database_url) as conn, conn.cursor() as cur:
+        cur.execute("CREATE TABLE IF NOT EXISTS test_pool_writes (value TEXT)")
+        cur.execute("TRUNCATE test_pool_writes")
+    yield pool
+    pool.closeall()
+    with psycopg2.connect(database_url) as conn, conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS test_pool_writes")
+
+
+def _values(database_url):
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT value FROM test_pool_writes ORDER BY value")
+            return [row[0] for row in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def test_with_block_commits_write(pool, database_url):
+    conn = pool.getconn()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute("INSERT INTO test_pool_writes VALUES ('committed')")
+    finally:
+        conn.close()
+    assert _values(database_url) == ["committed"]
+
+
+def test_with_block_rolls_back_on_error(pool, database_url):
+    conn = pool.getconn()
+    try:
+        with pytest.raises(RuntimeError):
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute("INSERT INTO test_pool_writes VALUES ('rolled back')")
+                raise RuntimeError("boom")
+    finally:
+        conn.close()
+    assert _values(database_url) == []
+
+
+def test_pooled_connection_commits_and_returns(pool, database_url):
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO test_pool_writes VALUES ('pooled')")
+    assert _values(database_url) == ["pooled"]
+    assert pool.stats()["in_use"] == 0
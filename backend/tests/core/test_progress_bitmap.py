@@ -0,0 +1,58 @@
+"""app.core.progress_bitmap - encode/decode round-trip და container-ების საზღვრები"""
+
+import random
+import pytest
+from app.core import progress_bitmap
+
+
+@pytest.mark.parametrize("ids", [
+    [],
+    [0],
+    [0xFFFFFFFF],
+    [5, 3, 3, 1],
+    list(range(progress_bitmap.ARRAY_MAX)),           # ბოლო array container
+    list(range(progress_bitmap.ARRAY_MAX + 1)),       # პირველი bitmap container
+    list(range(0, 1 << 16)),                          # სავსე container
+    [1, 65535, 65536, 65537, 1 << 20, (1 << 32) - 1],  # რამდენიმე container
+])
+def test_round_trip(ids):
+    data = progress_bitmap.encode(ids)
+    assert progress_bitmap.decode(data) == sorted(set(ids))
+    assert progress_bitmap.cardinality(data) == len(set(ids))
+
+
+def test_round_trip_random():
+    rng = random.Random(42)
+    ids = rng.sample(range(300000), 50000)
+    data = progress_bitmap.encode(ids)
+    assert progress_bitmap.decode(data) == sorted(ids)
+    assert progress_bitmap.cardinality(data) == len(ids)
+
+
+def test_bitmap_container_size():
+    data = progress_bitmap.encode(range(progress_bitmap.ARRAY_MAX + 1))
+    header = 3 + 4  # version + count, key + cardinality
+    assert len(data) == header + progress_bitmap.BITMAP_BYTES
+
+
+def test_empty_input_decodes():
+    assert progress_bitmap.decode(b"") == []
+    assert progress_bitmap.cardinality(b"") == 0
+
+
+def test_merge():
+    data = progress_bitmap.encode([1, 2, 3])
+    assert progress_bitmap.decode(progress_bitmap.merge(data, add=[4, 70000], remove=[2])) == [1, 3, 4, 70000]
+
+
+@pytest.mark.parametrize("bad_id", [-1, 1 << 32])
+def test_out_of_range(bad_id):
+    with pytest.raises(ValueError):
+        progress_bitmap.encode([bad_id])
+
+
+def test_unsupported_version():
+    data = bytearray(progress_bitmap.encode([1]))
+    data[0] = progress_bitmap.VERSION + 1
+    with pytest.raises(ValueError):
+        progress_bitmap.decode(bytes(data))
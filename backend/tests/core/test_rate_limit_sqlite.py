@@ -0,0 +1,26 @@
+"""app.core.rate_limit.SQLiteBackend - საერთო მრიცხველები რამდენიმე პროცესისთვის"""
+
+import asyncio
+import multiprocessing
+from app.core.rate_limit import SQLiteBackend
+
+
+def _hits(path: str, count: int) -> int:
+    backend = SQLiteBackend(path)
+    return sum(backend._hit("ip:1", 10, 3600)[0] for _ in range(count))
+
+
+def test_limit_within_window(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "limits.sqlite3"))
+    results = [asyncio.run(backend.hit("ip:1", 3, 3600)) for _ in range(5)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False, False]
+    assert all(0 < retry_after <= 3600 for _, retry_after in results)
+    # სხვა key-ს ცალკე მრიცხველი აქვს
+    assert asyncio.run(backend.hit("ip:2", 3, 3600))[0]
+
+
+def test_limit_shared_between_processes(tmp_path):
+    path = str(tmp_path / "limits.sqlite3")
+    with multiprocessing.get_context("spawn").Pool(2) as pool:
+        allowed = pool.starmap(_hits, [(path, 10), (path, 10)])
+    assert sum(allowed) == 10
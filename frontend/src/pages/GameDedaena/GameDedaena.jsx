@@ -10,7 +10,7 @@ import SentenceCreator from "../../components/SentenceCreator/SentenceCreator";
 import StatsPanel from "../../components/StatsPanel/StatsPanel";
 import InstructionsModal from "../../components/InstructionsModal/InstructionsModal";
 import TourI from "../../components/tourI/TourI";
-import { saveProgress, loadProgress } from "../../services/api";
+import { updateProgress, loadProgress } from "../../services/api";
 import { isAuthenticated, getToken } from "../../services/auth";
 
 const version_data = { name: "იაკობ გოგებაშვილი", dedaena_table: "gogebashvili_1_with_ids" };
@@ -549,23 +549,37 @@ function GameDedaena() {
             const token = getToken();
             // სიტყვების ID-ების შეგროვება (normalized word → word obj ID)
             const normalizeWord = (v) => String(v || "").trim().replace(/[-–—]/g, '');
-            const wordIds = [];
-            dedaenaData.forEach(pos => {
-              const found = foundWordsByPosition[pos.position] || [];
-              (pos.words || []).forEach(w => {
-                if (found.includes(normalizeWord(w.word))) wordIds.push(w.id);
+            const collectIds = (wordsByPosition, sentenceIdsByPosition, proverbIdsByPosition) => {
+              const wordIds = [];
+              dedaenaData.forEach(pos => {
+                const found = wordsByPosition[pos.position] || [];
+                (pos.words || []).forEach(w => {
+                  if (found.includes(normalizeWord(w.word))) wordIds.push(w.id);
+                });
               });
-            });
-            // წინადადებების ID-ების flatten
-            const sentenceIds = Object.values(foundSentenceIdsByPosition).flat();
-            // ანდაზების ID-ების flatten
-            const proverbIds = Object.values(viewedProverbIdsByPosition).flat();
-
-            await saveProgress(token, {
+              return {
+                words: wordIds,
+                // წინადადებების და ანდაზების ID-ების flatten
+                sentences: Object.values(sentenceIdsByPosition).flat(),
+                proverbs: Object.values(proverbIdsByPosition).flat(),
+              };
+            };
+            const current = collectIds(foundWordsByPosition, foundSentenceIdsByPosition, viewedProverbIdsByPosition);
+            const saved = collectIds(savedProgress.words, savedProgress.sentenceIds, savedProgress.proverbIds);
+            const diff = (a, b) => {
+              const bSet = new Set(b);
+              return [...new Set(a)].filter(id => !bSet.has(id));
+            };
+
+            // ✅ მხოლოდ ცვლილება ბოლო შენახვის შემდეგ (merge სერვერზე)
+            await updateProgress(token, {
               dedaena_table: version_data.dedaena_table,
-              found_word_ids: wordIds,
-              found_sentence_ids: sentenceIds,
-              found_proverb_ids: proverbIds,
+              add_word_ids: diff(current.words, saved.words),
+              add_sentence_ids: diff(current.sentences, saved.sentences),
+              add_proverb_ids: diff(current.proverbs, saved.proverbs),
+              remove_word_ids: diff(saved.words, current.words),
+              remove_sentence_ids: diff(saved.sentences, current.sentences),
+              remove_proverb_ids: diff(saved.proverbs, current.proverbs),
             });
             // save-ის შემდეგ snapshot განახლდეს
             setSavedProgress({
@@ -52,6 +52,14 @@ export async function saveProgress(token, data) {
   return response.data;
 }
 
+// ინკრემენტული შენახვა: მხოლოდ ახლად ნაპოვნი / მოხსნილი ID-ები
+export async function updateProgress(token, data) {
+  const response = await api.post('/dedaena/progress/update', data, {
+    headers: { Authorization: `Bearer ${token}` }
+  });
+  return response.data;
+}
+
 export async function loadProgress(token, tableName) {
   const response = await api.get(`/dedaena/progress/${tableName}`, {
     headers: { Authorization: `Bearer ${token}` }
@@ -38,13 +38,55 @@ export const buildWordsMap = (dedaenaData) => {
   return wordsMap;
 };
 
+// ასო -> ტური ინდექსი (dedaenaData-ს თითოეულ მასივზე ერთხელ იგება)
+// ტექსტის ტური = ყველაზე მაღალი position იმ ტურებიდან, რომელთა ასოც ტექსტში გვხვდება
+const letterIndexCache = new WeakMap();
+
+const getLetterIndex = (dedaenaData) => {
+  let index = letterIndexCache.get(dedaenaData);
+  if (!index) {
+    const charTours = new Map();   // ერთსიმბოლოიანი ასო -> ტური (მაქს. position)
+    const multiCharTours = [];     // მრავალსიმბოლოიანი ასოები (position-ის კლებით)
+    dedaenaData.forEach(tour => {
+      if (!tour.letter) return;
+      if (tour.letter.length === 1) {
+        const current = charTours.get(tour.letter);
+        if (!current || tour.position > current.position) charTours.set(tour.letter, tour);
+      } else {
+        multiCharTours.push(tour);
+      }
+    });
+    multiCharTours.sort((a, b) => b.position - a.position);
+    index = { charTours, multiCharTours };
+    letterIndexCache.set(dedaenaData, index);
+  }
+  return index;
+};
+
+const findTourForText = (text, dedaenaData) => {
+  const { charTours, multiCharTours } = getLetterIndex(dedaenaData);
+  let best = null;
+  for (const ch of text) {
+    const tour = charTours.get(ch);
+    if (tour && (!best || tour.position > best.position)) best = tour;
+  }
+  for (const tour of multiCharTours) {
+    if (best && tour.position <= best.position) break;
+    if (text.includes(tour.letter)) {
+      best = tour;
+      break;
+    }
+  }
+  return best;
+};
+
 // სიტყვის ტურის გამოცნობა
 export const detectWordTour = (word, allWordsMap, dedaenaData) => {
   const normalized = normalizeWord(word);
   if (!normalized) return null;
 
   const existingTours = allWordsMap.get(normalized)?.tours || new Set();
-  const estimatedTour = dedaenaData.slice().reverse().find(tour => word.includes(tour.letter));
+  const estimatedTour = findTourForText(word, dedaenaData);
 
   return {
     word: normalized,
@@ -70,7 +112,7 @@ export const analyzeSentence = (sentence, allWordsMap, dedaenaData) => {
 export const detectTourForText = (text, dedaenaData) => {
   if (!text || !text.trim()) return null;
   const content = text.trim();
-  const estimatedTour = dedaenaData.slice().reverse().find(tour => content.includes(tour.letter));
+  const estimatedTour = findTourForText(content, dedaenaData);
   if (!estimatedTour) return null;
   return {
     position: estimatedTour.position,